@@ -0,0 +1,193 @@
+import argparse
+import csv
+import json
+import sys
+import time
+import numpy as np
+import ensemble
+import random_walk
+import streaming
+from occupancy import OccupancyCounter
+from random_generator import CongruencialLineal
+
+# Este módulo no debe importar view, timer, tkinter, matplotlib ni plotly: se usa en servidores sin pantalla
+
+BATCH_MAX_STEPS = 10 ** 7  # Límite por defecto de pasos al buscar una posición objetivo
+JOB_FIELDS = ("dim", "steps", "target", "source", "seed", "walkers", "max_steps")  # Campos de un trabajo
+
+
+def read_jobs(path):
+    """
+        Lee una lista de trabajos desde un archivo JSON o CSV.
+
+        El JSON es una lista de objetos (o un objeto con la clave "jobs"). El CSV tiene una fila por
+        trabajo con las columnas de JOB_FIELDS; las coordenadas se separan con ";" (por ejemplo "3;-2").
+
+        Args:
+            path (str): Ruta del archivo; "-" para leer JSON desde la entrada estándar.
+
+        Returns:
+            list: Trabajos normalizados con normalize_job.
+    """
+    if path == "-":
+        raw = json.load(sys.stdin)
+    elif path.lower().endswith(".csv"):
+        with open(path, newline="") as file:
+            raw = [{key: value for key, value in row.items() if value not in (None, "")}
+                   for row in csv.DictReader(file)]
+    else:
+        with open(path) as file:
+            raw = json.load(file)
+    if isinstance(raw, dict):
+        raw = raw.get("jobs", [])
+    return [normalize_job(job, index) for index, job in enumerate(raw)]
+
+
+def _coordinates(value, dim, name):
+    if isinstance(value, str):
+        value = [int(part) for part in value.replace(",", ";").split(";") if part.strip()]
+    coordinates = [int(part) for part in np.array(value).reshape(-1)]
+    if len(coordinates) != dim:
+        raise ValueError(f"{name} debe tener {dim} coordenadas: {value}")
+    return coordinates
+
+
+def normalize_job(job, index=0):
+    """
+        Valida un trabajo y completa los valores por defecto.
+
+        Args:
+            job (dict): Trabajo con "dim" y "steps" o "target"; opcionalmente "source", "seed",
+                "walkers" y "max_steps".
+            index (int): Posición del trabajo en la lista, usada como identificador por defecto.
+
+        Returns:
+            dict: Trabajo con todos los campos de JOB_FIELDS más "id".
+    """
+    unknown = set(job) - set(JOB_FIELDS) - {"id"}
+    if unknown:
+        raise ValueError(f"Trabajo {index}: campos desconocidos {sorted(unknown)}")
+    if "dim" not in job or int(job["dim"]) not in (1, 2, 3):
+        raise ValueError(f"Trabajo {index}: dim debe ser 1, 2 o 3")
+    dim = int(job["dim"])
+    if ("steps" in job) == ("target" in job):
+        raise ValueError(f"Trabajo {index}: se requiere exactamente uno de steps o target")
+    normalized = {
+        "id": job.get("id", index),
+        "dim": dim,
+        "steps": int(job["steps"]) if "steps" in job else None,
+        "target": _coordinates(job["target"], dim, "target") if "target" in job else None,
+        "source": _coordinates(job.get("source", [0] * dim), dim, "source"),
+        "seed": int(job.get("seed", random_walk.seed)),
+        "walkers": int(job.get("walkers", 1)),
+        "max_steps": int(job.get("max_steps", BATCH_MAX_STEPS)),
+    }
+    if normalized["walkers"] < 1 or (normalized["steps"] is not None and normalized["steps"] < 0):
+        raise ValueError(f"Trabajo {index}: walkers debe ser positivo y steps no negativo")
+    return normalized
+
+
+def run_job(job):
+    """
+        Ejecuta un trabajo con el generador CongruencialLineal(a, c, m, seed) de random_walk.
+
+        Con steps se simula la caminata (o el conjunto de caminatas si walkers > 1) por bloques sin
+        guardar la trayectoria; con target se busca el tiempo de llegada de cada caminante, limitado
+        a max_steps pasos.
+
+        Args:
+            job (dict): Trabajo normalizado con normalize_job.
+
+        Returns:
+            dict: Resultados compactos del trabajo, incluyendo los pasos simulados y el tiempo empleado.
+    """
+    start = time.perf_counter()
+    generator = CongruencialLineal(random_walk.a, random_walk.c, random_walk.m, job["seed"])
+    dim, source = job["dim"], job["source"]
+    result = {"id": job["id"], "dim": dim, "source": source, "seed": job["seed"], "walkers": job["walkers"]}
+
+    if job["steps"] is not None and job["walkers"] == 1:
+        extrema = streaming.RunningExtrema()
+        occupancy = OccupancyCounter(dim)
+        endpoint = None
+        for chunk in streaming.iter_walk(dim, source, steps=job["steps"], stream=generator):
+            extrema.update(chunk)
+            occupancy.update(chunk)
+            endpoint = chunk[-1]
+        site, visits = occupancy.most_visited()
+        result.update(steps=job["steps"], simulated_steps=job["steps"], endpoint=endpoint.tolist(),
+                      minimum=extrema.minimum.tolist(), maximum=extrema.maximum.tolist(),
+                      distinct_sites=occupancy.distinct_sites(), most_visited=site.tolist(), most_visits=visits)
+    elif job["steps"] is not None:
+        stats = ensemble.simulate_ensemble(job["walkers"], job["steps"], dim, source, "stats", generator)
+        msd = np.asarray(stats["msd"])
+        result.update(steps=job["steps"], simulated_steps=job["walkers"] * job["steps"],
+                      mean_endpoint=np.asarray(stats["mean_endpoint"]).tolist(),
+                      msd=float(msd[-1]) if msd.ndim > 0 and len(msd) > 0 else float(msd),
+                      return_fraction=float(stats["return_fraction"]))
+    else:
+        times = []
+        simulated = 0
+        for _ in range(job["walkers"]):
+            hitting_time, _ = random_walk.first_passage(dim, source, job["target"], generator, job["max_steps"],
+                                                        return_path=False)
+            times.append(hitting_time)
+            simulated += hitting_time if hitting_time is not None else job["max_steps"]
+        hits = [value for value in times if value is not None]
+        result.update(target=job["target"], max_steps=job["max_steps"], simulated_steps=simulated,
+                      hitting_times=times, hit_fraction=len(hits) / len(times),
+                      mean_hitting_time=float(np.mean(hits)) if hits else None)
+
+    result["seconds"] = time.perf_counter() - start
+    return result
+
+
+def run_jobs(jobs):
+    """
+        Ejecuta una lista de trabajos en orden.
+
+        Args:
+            jobs (list): Trabajos normalizados.
+
+        Returns:
+            dict: {"jobs": resultados de cada trabajo, "summary": totales de la ejecución}.
+    """
+    start = time.perf_counter()
+    results = [run_job(job) for job in jobs]
+    seconds = time.perf_counter() - start
+    steps = sum(result["simulated_steps"] for result in results)
+    summary = {"jobs": len(results), "simulated_steps": steps, "seconds": seconds,
+               "steps_per_second": steps / seconds if seconds > 0 else None}
+    return {"jobs": results, "summary": summary}
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Ejecuta caminatas aleatorias por lotes sin interfaz gráfica.")
+    parser.add_argument("jobs", help="Archivo JSON o CSV con la lista de trabajos (\"-\" para JSON por stdin)")
+    parser.add_argument("-o", "--output", default="-", help="Archivo JSON de resultados (\"-\" para stdout)")
+    parser.add_argument("--summary-only", action="store_true", help="Escribir solo el resumen de la ejecución")
+    parser.add_argument("--jit", action="store_true", help="Usar los núcleos compilados con numba (si está instalado)")
+    args = parser.parse_args(argv)
+    random_walk.USE_JIT = args.jit
+
+    try:
+        jobs = read_jobs(args.jobs)
+    except (OSError, ValueError) as error:
+        parser.error(str(error))
+    report = run_jobs(jobs)
+    if args.summary_only:
+        report = {"summary": report["summary"]}
+
+    if args.output == "-":
+        json.dump(report, sys.stdout)
+        sys.stdout.write("\n")
+    else:
+        with open(args.output, "w") as file:
+            json.dump(report, file)
+    print(f"{report['summary']['jobs']} trabajos, {report['summary']['simulated_steps']} pasos en "
+          f"{report['summary']['seconds']:.3f} s", file=sys.stderr)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,213 @@
+import argparse
+import json
+import os
+import sys
+import time
+import tracemalloc
+import decimation
+import occupancy
+import random_walk
+from random_generator import CongruencialLineal
+
+BENCHMARK_SEED = 42  # Semilla de todos los casos, para que sean reproducibles
+BENCHMARK_REPEAT = 3  # Repeticiones por caso; se conserva la más rápida
+BENCHMARK_MAX_STEPS = 10 ** 7  # Mayor número de pasos por defecto (--max-steps 100000000 para llegar a 10^8)
+BENCHMARK_MIN_SECONDS = 0.05  # Duración mínima de una medición; los casos breves se repiten en bucle
+BENCHMARK_TOLERANCE = 0.25  # Pérdida relativa de rendimiento (o aumento de memoria) tolerada
+BASELINE_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "benchmark_baseline.json")
+GO_TO_MAX_STEPS = 10 ** 7  # Límite de pasos de las búsquedas de posición objetivo
+
+
+def _stream():
+    return random_walk.create_stream(BENCHMARK_SEED)
+
+
+def _generator_scalar(n):
+    generator = CongruencialLineal(random_walk.a, random_walk.c, random_walk.m, BENCHMARK_SEED)
+    for _ in range(n):
+        generator.generate_number()
+    return n
+
+
+def _generator_block(n):
+    CongruencialLineal(random_walk.a, random_walk.c, random_walk.m, BENCHMARK_SEED).generate_block(n)
+    return n
+
+
+def _random_walk(dim, steps):
+    walk = (random_walk.random_walk_1d, random_walk.random_walk_2d, random_walk.random_walk_3d)[dim - 1]
+    walk(steps, 0 if dim == 1 else (0,) * dim, _stream())
+    return steps
+
+
+def _go_to(dim, target):
+    go_to = (random_walk.go_to_1d, random_walk.go_to_2d, random_walk.go_to_3d)[dim - 1]
+    source = 0 if dim == 1 else (0,) * dim
+    path = go_to(source, target if dim > 1 else target[0], max_steps=GO_TO_MAX_STEPS, stream=_stream())
+    return len(path if dim == 1 else path[0]) - 1
+
+
+def _probability(dim, steps):
+    calculate = (random_walk.calculate_1d_probability, random_walk.calculate_2d_probability,
+                 random_walk.calculate_3d_probability)[dim - 1]
+    source = 0 if dim == 1 else [0] * dim
+    destination = 2 if dim == 1 else [2] + [0] * (dim - 1)
+    calculate(steps, source, destination)
+    return 1
+
+
+def _plot_preparation(dim, steps):
+    # Las funciones de view.py crean ventanas de Tk; aquí se mide la reducción de datos que hacen
+    positions = random_walk.walk_positions(steps, dim, (0,) * dim, _stream())
+
+    def run():
+        if dim == 1:
+            decimation.m4_decimate(positions[:, 0], 1000)
+            occupancy.occupancy_1d(positions[:, 0])
+        else:
+            decimation.spatial_decimate(positions, 500 if dim == 2 else 200)
+        return steps
+    return run
+
+
+def benchmark_cases(max_steps=BENCHMARK_MAX_STEPS):
+    """
+        Construye la lista de casos de rendimiento.
+
+        Args:
+            max_steps (int): Mayor número de pasos de las caminatas.
+
+        Returns:
+            list: Tuplas (nombre, unidad, preparación) donde preparación devuelve la función a medir,
+            que a su vez devuelve el número de unidades procesadas.
+    """
+    cases = [
+        ("generator_scalar_1e5", "números", lambda: lambda: _generator_scalar(10 ** 5)),
+        ("generator_block_1e7", "números", lambda: lambda: _generator_block(10 ** 7)),
+    ]
+    for dim in (1, 2, 3):
+        for exponent in range(4, 9):
+            if 10 ** exponent <= max_steps:
+                cases.append((f"random_walk_{dim}d_1e{exponent}", "pasos",
+                              lambda dim=dim, steps=10 ** exponent: lambda: _random_walk(dim, steps)))
+    # Objetivos que la semilla BENCHMARK_SEED alcanza en unos 1e4, 1e5 y 1e6 pasos; con menos pasos el
+    # caso mide solo el costo fijo de la llamada
+    targets = {1: [(161,), (-135,), (1344,)], 2: [(67, 0), (14, 0), (1325, 0)],
+               3: [(20, -165, 28), (-200, -301, -418), (423, -1031, -2)]}
+    for dim, dim_targets in targets.items():
+        for target in dim_targets:
+            cases.append((f"go_to_{dim}d_distance_{sum(map(abs, target))}", "pasos",
+                          lambda dim=dim, target=target: lambda: _go_to(dim, target)))
+    for dim, steps in ((1, 10 ** 4), (1, 10 ** 6), (2, 10 ** 6), (3, 10 ** 7)):
+        cases.append((f"probability_{dim}d_1e{len(str(steps)) - 1}", "llamadas",
+                      lambda dim=dim, steps=steps: lambda: _probability(dim, steps)))
+    for dim in (1, 2, 3):
+        steps = min(10 ** 7, max_steps)
+        cases.append((f"plot_preparation_{dim}d_1e{len(str(steps)) - 1}", "pasos",
+                      lambda dim=dim, steps=steps: _plot_preparation(dim, steps)))
+    return cases
+
+
+def run_case(prepare, repeat=BENCHMARK_REPEAT):
+    """
+        Mide un caso: el menor tiempo de repeat mediciones y el pico de memoria de una ejecución más.
+
+        Antes de medir el caso se ejecuta una vez sin cronometrar, para no contar cargas diferidas
+        (módulos, tablas de log(n!)) como parte del rendimiento. Cada medición ejecuta el caso las
+        veces necesarias para durar al menos BENCHMARK_MIN_SECONDS.
+
+        Args:
+            prepare (callable): Preparación del caso; devuelve la función a medir.
+            repeat (int): Número de ejecuciones cronometradas.
+
+        Returns:
+            dict: "seconds", "units" (unidades procesadas), "throughput" y "peak_bytes".
+    """
+    run = prepare()
+    run()  # Calentamiento
+    best = None
+    units = 0
+    for _ in range(repeat):
+        calls = 0
+        total_units = 0
+        start = time.perf_counter()
+        while True:
+            total_units += run()
+            calls += 1
+            seconds = time.perf_counter() - start
+            if seconds >= BENCHMARK_MIN_SECONDS:
+                break
+        if best is None or seconds / calls < best:
+            best, units = seconds / calls, total_units / calls
+    # La memoria se mide aparte porque tracemalloc hace más lentas las reservas
+    tracemalloc.start()
+    try:
+        run()
+        peak = tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+    return {"seconds": best, "units": units, "throughput": units / best if best > 0 else None, "peak_bytes": peak}
+
+
+def compare(results, baseline, tolerance=BENCHMARK_TOLERANCE):
+    """
+        Busca regresiones respecto a una línea base.
+
+        Args:
+            results (dict): Resultados de run_case por nombre de caso.
+            baseline (dict): Resultados de referencia con el mismo formato.
+            tolerance (float): Variación relativa tolerada.
+
+        Returns:
+            list: Mensajes de los casos con menor rendimiento o más memoria que la línea base.
+    """
+    regressions = []
+    for name, result in results.items():
+        reference = baseline.get(name)
+        if reference is None:
+            continue
+        if reference["throughput"] and result["throughput"] < reference["throughput"] * (1 - tolerance):
+            regressions.append(f"{name}: rendimiento {result['throughput']:.4g} < {reference['throughput']:.4g}")
+        if reference["peak_bytes"] and result["peak_bytes"] > reference["peak_bytes"] * (1 + tolerance):
+            regressions.append(f"{name}: memoria {result['peak_bytes']} > {reference['peak_bytes']} bytes")
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Mide el rendimiento del generador, las caminatas y las gráficas.")
+    parser.add_argument("-k", "--filter", default="", help="Ejecutar solo los casos cuyo nombre contiene este texto")
+    parser.add_argument("--max-steps", type=int, default=BENCHMARK_MAX_STEPS, help="Mayor número de pasos")
+    parser.add_argument("--repeat", type=int, default=BENCHMARK_REPEAT, help="Repeticiones por caso")
+    parser.add_argument("--baseline", default=BASELINE_FILE, help="Línea base con la que comparar")
+    parser.add_argument("--tolerance", type=float, default=BENCHMARK_TOLERANCE, help="Variación relativa tolerada")
+    parser.add_argument("--save", help="Guardar los resultados como JSON (por ejemplo para renovar la línea base)")
+    args = parser.parse_args(argv)
+
+    baseline = {}
+    if args.baseline and os.path.exists(args.baseline):
+        with open(args.baseline) as file:
+            baseline = json.load(file)
+
+    results = {}
+    for name, unit, prepare in benchmark_cases(args.max_steps):
+        if args.filter not in name:
+            continue
+        result = run_case(prepare, args.repeat)
+        results[name] = result
+        reference = baseline.get(name, {}).get("throughput")
+        ratio = f"  x{result['throughput'] / reference:.2f}" if reference else ""
+        print(f"{name:32s} {result['seconds']:9.4f} s  {result['throughput']:12.4g} {unit}/s  "
+              f"{result['peak_bytes'] / 2 ** 20:9.1f} MiB{ratio}", flush=True)
+
+    if args.save:
+        with open(args.save, "w") as file:
+            json.dump(results, file, indent=2, sort_keys=True)
+
+    regressions = compare(results, baseline, args.tolerance)
+    for message in regressions:
+        print(f"REGRESIÓN {message}")
+    return 1 if regressions else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,73 @@
+import numpy as np
+
+SPATIAL_MAX_POINTS = 200_000  # Puntos máximos que deja spatial_decimate
+
+
+def m4_decimate(values, buckets, offset=0):
+    """
+        Reduce una serie a lo sumo a 4 puntos por cubeta: el primero, el mínimo, el máximo y el último.
+
+        Con una cubeta por píxel el trazo resultante es idéntico al de la serie completa.
+
+        Args:
+            values (numpy.ndarray): Serie a reducir (por ejemplo la caminata 1D).
+            buckets (int): Número de cubetas, del orden del ancho de la gráfica en píxeles.
+            offset (int): Índice del primer valor, para reducir solo un tramo visible.
+
+        Returns:
+            tuple: (índices, valores) de los puntos conservados, en orden.
+    """
+    values = np.asarray(values)
+    n = len(values)
+    if n <= 4 * buckets:
+        return np.arange(offset, offset + n), values
+    size = -(-n // buckets)
+    full = n // size
+    blocks = values[:full * size].reshape(full, size)
+    starts = np.arange(full) * size
+    selected = [starts, starts + blocks.argmin(axis=1), starts + blocks.argmax(axis=1), starts + size - 1]
+    if full * size < n:
+        rest = values[full * size:]
+        first = full * size
+        selected.append(np.array([first, first + rest.argmin(), first + rest.argmax(), n - 1]))
+    indices = np.unique(np.concatenate(selected))
+    return indices + offset, values[indices]
+
+
+def spatial_decimate(points, resolution, bounds=None, max_points=SPATIAL_MAX_POINTS):
+    """
+        Reduce una trayectoria 2D/3D conservando solo los puntos en que cambia de celda.
+
+        El espacio se divide en resolution celdas por eje; mientras la trayectoria permanezca en la
+        misma celda sus puntos se descartan, así que el trazo no cambia a esa resolución. Siempre se
+        conservan el primer y el último punto y los extremos de cada eje. Si quedan más de max_points
+        puntos, las celdas se agrandan al doble hasta cumplir el límite, que incluye a esos puntos
+        (solo se supera si max_points < 2 + 2 * dim).
+
+        Args:
+            points (numpy.ndarray): Posiciones de forma (n, dim).
+            resolution (int): Celdas por eje, del orden del tamaño de la gráfica en píxeles.
+            bounds (tuple): (mínimos, máximos) de la región visible; None para usar toda la trayectoria.
+            max_points (int): Número máximo de puntos conservados.
+
+        Returns:
+            numpy.ndarray: Índices de los puntos conservados, en orden.
+    """
+    points = np.asarray(points)
+    n = len(points)
+    if n <= 2:
+        return np.arange(n)
+    low, high = (points.min(axis=0), points.max(axis=0)) if bounds is None else bounds
+    low = np.asarray(low, dtype=np.float64)
+    high = np.asarray(high, dtype=np.float64)
+    extremes = np.concatenate([[0, n - 1], points.argmin(axis=0), points.argmax(axis=0)])
+    cell = np.maximum((high - low) / resolution, np.finfo(np.float64).tiny)
+    # Los puntos fuera de la región visible se agrupan en las celdas del borde
+    cells = np.floor((np.clip(points, low, high) - low) / cell).astype(np.int64)
+    while True:
+        changes = np.flatnonzero(np.any(cells[1:] != cells[:-1], axis=1)) + 1
+        kept = np.unique(np.concatenate([extremes, changes]))
+        if len(kept) <= max_points or len(changes) == 0:
+            return kept
+        # El número de cambios es aproximadamente inversamente proporcional al tamaño de celda
+        cells //= 2 ** max(1, int(np.ceil(np.log2(len(kept) / max_points))))
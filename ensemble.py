@@ -0,0 +1,157 @@
+import numpy as np
+import random_walk
+from random_generator import (CongruencialLineal, affine_power, check_period, generator_lock, lcg_states,
+                              states_to_numbers)
+
+ENSEMBLE_OUTPUTS = ("endpoints", "paths", "stats")  # Resultados disponibles en simulate_ensemble
+ENSEMBLE_CHUNK_ELEMENTS = 2 ** 22  # Movimientos simultáneos en memoria (caminantes x pasos) por bloque
+
+
+def walker_start_states(generator, n_walkers, steps):
+    """
+        Calcula el estado inicial de cada caminante de un conjunto.
+
+        El caminante w consume los movimientos w * steps + 1, ..., (w + 1) * steps de la secuencia del
+        generador, por lo que las subsecuencias no se solapan mientras n_walkers * steps no supere el
+        periodo del generador (lcg_period).
+
+        Args:
+            generator (CongruencialLineal): Generador base (no se modifica).
+            n_walkers (int): Número de caminantes.
+            steps (int): Pasos por caminante.
+
+        Returns:
+            numpy.ndarray: Estado del generador al inicio de cada caminante.
+    """
+    jump_a, jump_c = affine_power(generator.a, generator.c, generator.m, steps)
+    following = lcg_states(jump_a, jump_c, generator.m, generator.xn % generator.m, max(n_walkers - 1, 0))
+    starts = np.empty(shape=n_walkers, dtype=following.dtype)
+    if n_walkers > 0:
+        starts[0] = generator.xn % generator.m
+        starts[1:] = following
+    return starts
+
+
+def iter_ensemble(n_walkers, steps, dim, source, generator=None):
+    """
+        Recorre un conjunto de caminatas por bloques de pasos, avanzando todos los caminantes a la vez.
+
+        Los movimientos de todo el conjunto se reservan al llamar a la función, así que el generador
+        queda avanzado n_walkers * steps pasos aunque no se consuman todos los bloques.
+
+        Args:
+            n_walkers (int): Número de caminantes.
+            steps (int): Número de pasos de cada caminata.
+            dim (int | StepTable): Dimensión de las caminatas o tabla de pasos.
+            source (tuple): Posición inicial común con dim coordenadas.
+            generator (CongruencialLineal): Generador base (None para usar la semilla global).
+
+        Returns:
+            iterator: Tuplas (start, walk) donde walk es un arreglo int64 (n_walkers, n, dim) con las
+            posiciones de los pasos start + 1, ..., start + n; cada bloque tiene a lo sumo
+            ENSEMBLE_CHUNK_ELEMENTS movimientos.
+    """
+    base = reserve_walkers(n_walkers, steps, generator)
+    return _ensemble_chunks(base, n_walkers, steps, random_walk.step_table(dim), source)
+
+
+def reserve_walkers(n_walkers, steps, generator=None):
+    """
+        Valida un conjunto y reserva en el generador los movimientos de todos sus caminantes.
+
+        Args:
+            n_walkers (int): Número de caminantes (al menos uno).
+            steps (int): Pasos por caminante.
+            generator (CongruencialLineal): Generador base (None para usar la semilla global).
+
+        Returns:
+            CongruencialLineal: Copia del generador en el estado previo a la reserva; el generador
+            original queda avanzado n_walkers * steps pasos.
+    """
+    if n_walkers < 1:
+        raise ValueError("El conjunto debe tener al menos un caminante")
+    if generator is None:
+        generator = random_walk.legacy_generator()
+    with generator_lock(generator):
+        check_period(generator, n_walkers * steps)
+        base = CongruencialLineal(generator.a, generator.c, generator.m, generator.xn)
+        generator.jump(n_walkers * steps)
+    return base
+
+
+def _ensemble_chunks(base, n_walkers, steps, table, source):
+    a, c, m = base.a, base.c, base.m
+    states = walker_start_states(base, n_walkers, steps)
+    positions = np.tile(np.array(source, dtype=np.int64).reshape(table.dim), (n_walkers, 1))
+    chunk = max(1, ENSEMBLE_CHUNK_ELEMENTS // max(n_walkers, 1))
+    for start in range(0, steps, chunk):
+        length = min(chunk, steps - start)
+        block = lcg_states(a, c, m, states, length)
+        states = block[:, -1]
+        codes = table.codes(states_to_numbers(block, m))
+        walk = np.cumsum(table.deltas[codes], axis=1, dtype=np.int64)
+        walk += positions[:, np.newaxis, :]
+        positions = walk[:, -1, :]
+        yield start, walk
+
+
+def simulate_ensemble(n_walkers, steps, dim, source, output="endpoints", generator=None):
+    """
+        Simula un conjunto de caminatas aleatorias independientes avanzando todos los caminantes a la vez.
+
+        Los movimientos se procesan en bloques de (caminantes x pasos) acotados por
+        ENSEMBLE_CHUNK_ELEMENTS, de modo que salvo con output="paths" nunca se guarda la
+        trayectoria completa de todos los caminantes.
+
+        Args:
+            n_walkers (int): Número de caminantes.
+            steps (int): Número de pasos de cada caminata.
+            dim (int | StepTable): Dimensión de las caminatas o tabla de pasos.
+            source (tuple): Posición inicial común con dim coordenadas.
+            output (str): "endpoints" para las posiciones finales, "paths" para las trayectorias
+                completas o "stats" para estadísticas resumidas.
+            generator (CongruencialLineal): Generador base. Si es None se usa la semilla global de
+                random_walk, igual que generate_moves. Al terminar queda avanzado n_walkers * steps pasos.
+
+        Returns:
+            numpy.ndarray | dict: Según output, un arreglo int64 (n_walkers, dim) con las posiciones
+            finales, un arreglo int64 (n_walkers, steps + 1, dim) con las trayectorias, o un
+            diccionario con "mean_endpoint", "msd" (desplazamiento cuadrático medio por paso) y
+            "return_fraction" (fracción de caminantes que volvieron al origen).
+    """
+    if output not in ENSEMBLE_OUTPUTS:
+        raise ValueError(f"Resultado desconocido: {output}")
+    chunks = iter_ensemble(n_walkers, steps, dim, source, generator)
+    table = random_walk.step_table(dim)
+    origin = np.array(source, dtype=np.int64).reshape(table.dim)
+    positions = np.tile(origin, (n_walkers, 1))
+
+    paths = None
+    msd = None
+    returns = None
+    if output == "paths":
+        paths = np.empty(shape=(n_walkers, steps + 1, table.dim), dtype=np.int64)
+        paths[:, 0] = origin
+    elif output == "stats":
+        from observables import EnsembleMSD, EnsembleReturns  # observables importa este módulo
+        msd = EnsembleMSD(n_walkers, steps, origin)
+        returns = EnsembleReturns(n_walkers, origin)
+
+    for start, walk in chunks:
+        length = walk.shape[1]
+        positions = walk[:, -1, :]
+        if paths is not None:
+            paths[:, start + 1:start + length + 1] = walk
+        elif msd is not None:
+            msd.update(walk, start)
+            returns.update(walk, start)
+
+    if paths is not None:
+        return paths
+    if msd is not None:
+        return {
+            "mean_endpoint": positions.mean(axis=0),
+            "msd": msd.result(),
+            "return_fraction": (returns.result()[0] > 0).mean(),
+        }
+    return positions
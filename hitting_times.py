@@ -0,0 +1,179 @@
+import numpy as np
+import random_walk
+from ensemble import reserve_walkers, walker_start_states
+from profiling import span
+from random_generator import lcg_states, states_to_numbers
+
+HITTING_CHUNK_ELEMENTS = 2 ** 22  # Movimientos simultáneos en memoria (caminantes activos x pasos) por bloque
+HITTING_MAX_BINS = 1000  # Número máximo de intervalos de los histogramas por defecto
+NOT_HIT = -1  # Valor de la matriz de primeros pasos para los objetivos no alcanzados
+
+
+def _target_index(targets, width):
+    targets = np.array(targets, dtype=np.int64).reshape(-1, width)
+    low = targets.min(axis=0) if len(targets) > 0 else np.zeros(shape=width, dtype=np.int64)
+    shape = targets.max(axis=0) - low + 1 if len(targets) > 0 else np.ones(shape=width, dtype=np.int64)
+    keys = np.ravel_multi_index(tuple((targets - low).T), tuple(shape))
+    # Los objetivos repetidos comparten columna; inverse recupera el orden original
+    unique_keys, first, inverse = np.unique(keys, return_index=True, return_inverse=True)
+    return targets[first], low, shape, unique_keys, inverse.reshape(-1)
+
+
+def first_hit_matrix(n_walkers, steps, dim, source, targets, generator=None, stop_event=None):
+    """
+        Calcula el primer paso en que cada caminante visita cada posición objetivo.
+
+        Los caminantes avanzan a la vez por bloques, como en ensemble.simulate_ensemble y con los
+        mismos movimientos: el caminante w consume los movimientos w * steps + 1, ..., (w + 1) * steps.
+        Las posiciones se convierten en claves enteras dentro de la caja que contiene a los objetivos
+        y se buscan entre las claves ordenadas de los objetivos, así que una sola pasada sustituye a
+        n_walkers x len(targets) búsquedas go_to. Los caminantes que ya visitaron todos los objetivos
+        dejan de simularse.
+
+        Args:
+            n_walkers (int): Número de caminantes.
+            steps (int): Número máximo de pasos de cada caminante.
+            dim (int | StepTable): Dimensión de las caminatas o tabla de pasos.
+            source (tuple): Posición inicial común con dim coordenadas.
+            targets (list): Posiciones objetivo, cada una con dim coordenadas.
+            generator (CongruencialLineal): Generador base. Si es None se usa la semilla global de
+                random_walk. Al terminar queda avanzado n_walkers * steps pasos.
+            stop_event (threading.Event): Evento de cancelación, se revisa entre bloques.
+
+        Returns:
+            numpy.ndarray: Matriz int64 (n_walkers, len(targets)) con el primer paso en que cada
+            caminante visita cada objetivo (0 si es el origen, NOT_HIT si no lo alcanza), o None si
+            se canceló el cálculo.
+    """
+    base = reserve_walkers(n_walkers, steps, generator)
+    a, c, m = base.a, base.c, base.m
+    table = random_walk.step_table(dim)
+    targets, low, shape, sorted_keys, inverse = _target_index(targets, table.dim)
+    n_targets = len(targets)
+    origin = np.array(source, dtype=np.int64).reshape(table.dim)
+    first_hits = np.full(shape=(n_walkers, n_targets), fill_value=NOT_HIT, dtype=np.int64)
+    first_hits[:, np.all(targets == origin, axis=1)] = 0
+
+    states = walker_start_states(base, n_walkers, steps)
+    positions = np.tile(origin, (n_walkers, 1))
+    active = np.flatnonzero((first_hits == NOT_HIT).any(axis=1))
+    start = 0
+    with span("hitting_times") as stage:
+        while start < steps and len(active) > 0:
+            if stop_event is not None and stop_event.is_set():
+                return None
+            length = min(steps - start, max(1, HITTING_CHUNK_ELEMENTS // len(active)))
+            block = lcg_states(a, c, m, states[active], length)
+            states[active] = block[:, -1]
+            codes = table.codes(states_to_numbers(block, m))
+            walk = np.cumsum(table.deltas[codes], axis=1, dtype=np.int64)
+            walk += positions[active, np.newaxis, :]
+            positions[active] = walk[:, -1, :]
+            stage.add(len(active) * length, block.nbytes + codes.nbytes + walk.nbytes)
+
+            # Pertenencia vectorizada: caja de los objetivos y búsqueda de la clave
+            relative = walk - low
+            # Vistas como enteros sin signo, las coordenadas negativas quedan fuera con una sola comparación
+            inside = np.all(relative.view(np.uint64) < shape.astype(np.uint64), axis=2)
+            walker_index, step_index = np.nonzero(inside)
+            if len(walker_index) > 0:
+                keys = np.ravel_multi_index(tuple(relative[walker_index, step_index].T), tuple(shape))
+                slot = np.minimum(np.searchsorted(sorted_keys, keys), n_targets - 1)
+                member = sorted_keys[slot] == keys
+                walkers = active[walker_index[member]]
+                hit_targets = slot[member]
+                hit_steps = start + step_index[member] + 1
+                # np.nonzero recorre cada caminante en orden de pasos: la primera aparición es la primera visita
+                _, first = np.unique(walkers * n_targets + hit_targets, return_index=True)
+                walkers, hit_targets, hit_steps = walkers[first], hit_targets[first], hit_steps[first]
+                new = first_hits[walkers, hit_targets] == NOT_HIT
+                first_hits[walkers[new], hit_targets[new]] = hit_steps[new]
+
+            start += length
+            active = active[(first_hits[active] == NOT_HIT).any(axis=1)]
+    return first_hits[:, inverse]
+
+
+def hit_within(first_hits, n):
+    """
+        Estima la probabilidad de visitar cada objetivo en a lo sumo n pasos.
+
+        Args:
+            first_hits (numpy.ndarray): Matriz calculada con first_hit_matrix.
+            n (int | list): Número de pasos, o varios.
+
+        Returns:
+            numpy.ndarray: Fracción de caminantes con primer paso <= n, de forma (objetivos,) o
+            (objetivos, len(n)).
+    """
+    n_walkers, n_targets = first_hits.shape
+    limits = np.asarray(n)
+    times = np.sort(np.where(first_hits == NOT_HIT, np.iinfo(np.int64).max, first_hits), axis=0)
+    counts = np.empty(shape=(n_targets,) + limits.shape, dtype=np.int64)
+    for target in range(n_targets):
+        counts[target] = np.searchsorted(times[:, target], limits, side="right")
+    return counts / n_walkers if n_walkers > 0 else counts.astype(np.float64)
+
+
+def hitting_histograms(first_hits, steps, bins=None):
+    """
+        Agrupa los primeros pasos de cada objetivo en un histograma.
+
+        Args:
+            first_hits (numpy.ndarray): Matriz calculada con first_hit_matrix.
+            steps (int): Número máximo de pasos usado en la simulación.
+            bins (int): Número de intervalos (por defecto un paso por intervalo, hasta HITTING_MAX_BINS).
+
+        Returns:
+            tuple: (bordes de los intervalos, matriz int64 (objetivos, bins) con el número de
+            caminantes cuyo primer paso cae en cada intervalo).
+    """
+    if bins is None:
+        bins = min(steps + 1, HITTING_MAX_BINS)
+    edges = np.linspace(0, steps + 1, bins + 1)
+    n_targets = first_hits.shape[1]
+    histograms = np.zeros(shape=(n_targets, bins), dtype=np.int64)
+    for target in range(n_targets):
+        times = first_hits[:, target]
+        times = times[times != NOT_HIT]
+        bin_index = np.minimum(np.searchsorted(edges, times, side="right") - 1, bins - 1)
+        histograms[target] = np.bincount(bin_index, minlength=bins)
+    return edges, histograms
+
+
+def estimate_hitting_times(n_walkers, steps, dim, source, targets, generator=None, bins=None, stop_event=None):
+    """
+        Estima en una sola pasada las distribuciones de tiempos de llegada a varios objetivos.
+
+        Args:
+            n_walkers (int): Número de caminantes.
+            steps (int): Número máximo de pasos de cada caminante.
+            dim (int | StepTable): Dimensión de las caminatas o tabla de pasos.
+            source (tuple): Posición inicial común con dim coordenadas.
+            targets (list): Posiciones objetivo, cada una con dim coordenadas.
+            generator (CongruencialLineal): Generador base (None para usar la semilla global).
+            bins (int): Número de intervalos de los histogramas.
+            stop_event (threading.Event): Evento de cancelación.
+
+        Returns:
+            dict: "first_hits" (matriz de first_hit_matrix), "hit_fraction" y "mean_hitting_time"
+            (de los caminantes que llegaron, NaN si ninguno) por objetivo, "edges" y "histograms"
+            (de hitting_histograms) y "hit_within" (probabilidad de llegar en a lo sumo cada borde
+            derecho de los intervalos), o None si se canceló el cálculo.
+    """
+    first_hits = first_hit_matrix(n_walkers, steps, dim, source, targets, generator, stop_event)
+    if first_hits is None:
+        return None
+    edges, histograms = hitting_histograms(first_hits, steps, bins)
+    hit = first_hits != NOT_HIT
+    hits = hit.sum(axis=0)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        mean = np.where(hit, first_hits, 0).sum(axis=0) / hits
+    return {
+        "first_hits": first_hits,
+        "hit_fraction": hits / n_walkers if n_walkers > 0 else np.zeros(shape=len(hits)),
+        "mean_hitting_time": mean,
+        "edges": edges,
+        "histograms": histograms,
+        "hit_within": hit_within(first_hits, np.ceil(edges[1:]).astype(np.int64) - 1),
+    }
@@ -0,0 +1,84 @@
+import argparse
+import os
+import subprocess
+import sys
+
+# Tiempo máximo de importación (milisegundos, importación acumulada) de los módulos sin interfaz
+IMPORT_BUDGETS_MS = {
+    "random_walk": 250,
+    "ensemble": 250,
+    "streaming": 250,
+    "walk_cache": 300,
+    "batch": 300,
+}
+HEAVY_MODULES = ("scipy", "decimal", "fractions", "tkinter", "matplotlib", "plotly")  # No deben cargarse al simular
+IMPORT_RUNS = 3  # Repeticiones por módulo; se toma la más rápida
+
+
+def measure_import(module, runs=IMPORT_RUNS):
+    """
+        Mide la importación de un módulo en un intérprete nuevo con python -X importtime.
+
+        Args:
+            module (str): Nombre del módulo.
+            runs (int): Repeticiones; se conserva la más rápida para descontar la caché de disco.
+
+        Returns:
+            tuple: (milisegundos de importación acumulada, conjunto de módulos cargados).
+    """
+    directory = os.path.dirname(os.path.abspath(__file__))
+    best, loaded = None, set()
+    for _ in range(runs):
+        output = subprocess.run([sys.executable, "-X", "importtime", "-c", f"import {module}"], cwd=directory,
+                                capture_output=True, text=True, check=True).stderr
+        total = None
+        names = set()
+        for line in output.splitlines():
+            if not line.startswith("import time:") or "|" not in line:
+                continue
+            _, cumulative, name = line[len("import time:"):].split("|")
+            if not cumulative.strip().isdigit():
+                continue  # Encabezado
+            names.add(name.strip().split(".")[0])
+            if name.rstrip() == f" {module}":
+                total = int(cumulative) / 1000
+        if total is not None and (best is None or total < best):
+            best, loaded = total, names
+    return best, loaded
+
+
+def check_budgets(budgets=IMPORT_BUDGETS_MS, scale=1.0):
+    """
+        Compara la importación de cada módulo con su presupuesto.
+
+        Args:
+            budgets (dict): Milisegundos permitidos por módulo.
+            scale (float): Factor aplicado a los presupuestos (por ejemplo para máquinas lentas).
+
+        Returns:
+            list: (módulo, milisegundos, presupuesto, módulos pesados cargados, aprobado) por módulo.
+    """
+    results = []
+    for module, budget in budgets.items():
+        milliseconds, loaded = measure_import(module)
+        heavy = sorted(name for name in HEAVY_MODULES if name in loaded)
+        passed = milliseconds is not None and milliseconds <= budget * scale and not heavy
+        results.append((module, milliseconds, budget * scale, heavy, passed))
+    return results
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Verifica el presupuesto de tiempo de importación.")
+    parser.add_argument("--scale", type=float, default=1.0, help="Factor para todos los presupuestos")
+    args = parser.parse_args(argv)
+
+    results = check_budgets(scale=args.scale)
+    for module, milliseconds, budget, heavy, passed in results:
+        status = "ok" if passed else "EXCEDIDO"
+        extra = f" (carga {', '.join(heavy)})" if heavy else ""
+        print(f"{module:12s} {milliseconds:8.1f} ms / {budget:6.0f} ms  {status}{extra}")
+    return 0 if all(result[-1] for result in results) else 1
+
+
+if __name__ == '__main__':
+    sys.exit(main())
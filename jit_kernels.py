@@ -0,0 +1,176 @@
+import importlib.util
+import numpy as np
+import random_walk
+from profiling import span
+from random_generator import generator_lock
+
+HAS_NUMBA = importlib.util.find_spec("numba") is not None  # numba se importa al compilar por primera vez
+JIT_MAX_MODULUS = 2 ** 31  # Con m <= 2**31 el producto a * x + c cabe en int64
+JIT_CHUNK = 2 ** 20  # Pasos por llamada al núcleo de first_passage entre revisiones de stop_event
+
+_compiled = None  # Núcleos compilados (walk_codes, first_passage)
+
+
+def _walk_codes_kernel(a, c, m, state, thresholds, codes):
+    # Misma recurrencia que CongruencialLineal.generate_xn y mismo redondeo que generate_number
+    denominator = float(m - 1)
+    mask = m - 1
+    power_of_two = (m & mask) == 0
+    for i in range(len(codes)):
+        state = a * state + c
+        state = state & mask if power_of_two else state % m
+        move = state / denominator
+        code = 0
+        # Igual que numpy.searchsorted(thresholds, move, side='left')
+        while code < len(thresholds) and thresholds[code] < move:
+            code += 1
+        codes[i] = code
+    return state
+
+
+def _first_passage_kernel(a, c, m, state, thresholds, deltas, position, target, codes):
+    denominator = float(m - 1)
+    mask = m - 1
+    power_of_two = (m & mask) == 0
+    for i in range(len(codes)):
+        state = a * state + c
+        state = state & mask if power_of_two else state % m
+        move = state / denominator
+        code = 0
+        while code < len(thresholds) and thresholds[code] < move:
+            code += 1
+        codes[i] = code
+        hit = True
+        for axis in range(len(position)):
+            position[axis] += deltas[code, axis]
+            if position[axis] != target[axis]:
+                hit = False
+        if hit:
+            return i + 1, True, state
+    return len(codes), False, state
+
+
+def _kernels():
+    global _compiled
+    if _compiled is None:
+        import numba
+        with span("jit_compile"):
+            _compiled = (numba.njit(cache=True, nogil=True)(_walk_codes_kernel),
+                         numba.njit(cache=True, nogil=True)(_first_passage_kernel))
+    return _compiled
+
+
+def jit_supported(generator):
+    """
+        Indica si los núcleos compilados pueden usarse con un generador.
+
+        Args:
+            generator (CongruencialLineal): Generador de movimientos.
+
+        Returns:
+            bool: True si numba está instalado y m <= JIT_MAX_MODULUS.
+    """
+    return HAS_NUMBA and 0 < generator.m <= JIT_MAX_MODULUS
+
+
+def walk_codes(generator, steps, dim):
+    """
+        Genera los códigos de dirección de steps pasos en un solo bucle compilado.
+
+        Sin numba (o con un módulo demasiado grande) se usa el motor de numpy; ambos dan los mismos
+        códigos y dejan el generador en el mismo estado.
+
+        Args:
+            generator (CongruencialLineal): Generador de movimientos; se avanza steps pasos.
+            steps (int): Número de pasos.
+            dim (int | StepTable): Dimensión de la caminata o tabla de pasos.
+
+        Returns:
+            numpy.ndarray: Códigos int8 iguales a moves_to_codes(generator.generate_block(steps), dim).
+    """
+    if not jit_supported(generator):
+        return random_walk.moves_to_codes(generator.generate_block(steps), dim)
+    walk_kernel, _ = _kernels()
+    thresholds = np.asarray(random_walk.step_table(dim).thresholds, dtype=np.float64)
+    codes = np.empty(shape=steps, dtype=np.int8)
+    with generator_lock(generator), span("jit_walk", steps, codes.nbytes):
+        if steps > 0:
+            generator.xn = int(walk_kernel(generator.a % generator.m, generator.c % generator.m, generator.m,
+                                           generator.xn % generator.m, thresholds, codes))
+    return codes
+
+
+def walk_positions(steps, dim, source, stream=None):
+    """
+        Igual que random_walk.walk_positions, generando los códigos con walk_codes.
+
+        Args:
+            steps (int): Número de pasos en la caminata.
+            dim (int | StepTable): Dimensión de la caminata o tabla de pasos.
+            source (tuple): Posición inicial con dim coordenadas.
+            stream (RandomStream): Flujo de movimientos (None para usar la semilla global).
+
+        Returns:
+            numpy.ndarray: Posiciones int64 de forma (steps + 1, dim).
+    """
+    generator = stream if stream is not None else random_walk.legacy_generator()
+    return random_walk.codes_to_positions(walk_codes(generator, steps, dim), dim, source)
+
+
+def first_passage_codes(dim, source, target_position, generator, max_steps=None, stop_event=None,
+                        return_path=True, progress=None, stage=None):
+    """
+        Búsqueda del primer paso con el núcleo compilado, paso a paso y con salida inmediata.
+
+        Tiene el mismo contrato que random_walk._first_passage: el generador queda avanzado
+        exactamente los pasos recorridos. Debe llamarse con el cerrojo del generador tomado y solo si
+        jit_supported(generator).
+
+        Args:
+            dim (int | StepTable): Dimensión de la caminata o tabla de pasos.
+            source (tuple): Posición inicial con dim coordenadas.
+            target_position (tuple): Posición objetivo con dim coordenadas.
+            generator (CongruencialLineal): Generador de movimientos.
+            max_steps (int): Número máximo de pasos (None para no limitar).
+            stop_event (threading.Event): Evento de cancelación, se revisa cada JIT_CHUNK pasos.
+            return_path (bool): Si es False no se conservan los códigos.
+            progress (callable): Recibe las posiciones de cada bloque recorrido (None para omitirla).
+            stage (profiling.Span): Medición en la que se suman los pasos recorridos.
+
+        Returns:
+            tuple: (tiempo de llegada o None, códigos int8 de la trayectoria o None).
+    """
+    _, passage_kernel = _kernels()
+    table = random_walk.step_table(dim)
+    thresholds = np.asarray(table.thresholds, dtype=np.float64)
+    deltas = table.deltas.astype(np.int64)
+    position = np.array(source, dtype=np.int64).reshape(table.dim)
+    target = np.array(target_position, dtype=np.int64).reshape(table.dim)
+    a, c, m = generator.a % generator.m, generator.c % generator.m, generator.m
+    chunks = [np.empty(shape=0, dtype=np.int8)] if return_path else None
+    hitting_time = 0 if np.array_equal(position, target) else None
+    steps_done = 0
+    buffer = np.empty(shape=JIT_CHUNK, dtype=np.int8)
+
+    while hitting_time is None:
+        if max_steps is not None and steps_done >= max_steps:
+            break
+        if stop_event is not None and stop_event.is_set():
+            break
+        size = JIT_CHUNK if max_steps is None else min(JIT_CHUNK, max_steps - steps_done)
+        start_position = position.copy()
+        used, hit, state = passage_kernel(a, c, m, generator.xn % m, thresholds, deltas, position, target,
+                                          buffer[:size])
+        generator.xn = int(state)
+        codes = buffer[:used].copy()
+        if hit:
+            hitting_time = steps_done + used
+        steps_done += used
+        if return_path:
+            chunks.append(codes)
+        if stage is not None:
+            stage.add(used)
+        if progress is not None:
+            progress(random_walk.codes_to_positions(codes, dim, start_position)[1:])
+
+    return hitting_time, np.concatenate(chunks) if return_path else None
@@ -0,0 +1,217 @@
+import argparse
+import math
+import sys
+import time
+import numpy as np
+import random_walk
+from random_generator import CongruencialLineal, states_to_numbers
+
+# scipy se importa al calcular los valores p para que importar el módulo no lo cargue
+
+LCG_TEST_SAMPLES = 10 ** 7  # Números generados por defecto
+LCG_TEST_BLOCK = 6 * 2 ** 20  # Números por bloque; múltiplo de 2 y de 3 para que pares y tríos no crucen bloques
+LCG_TEST_BINS = 100  # Intervalos de la prueba chi-cuadrado de uniformidad
+LCG_TEST_MAX_LAG = 8  # Mayor retardo de la prueba de autocorrelación
+LCG_TEST_LOW_BITS = 0  # Bits menos significativos del estado examinados (a lo sumo 8; 0 los omite)
+LCG_TEST_ALPHA = 1e-3  # Nivel de significación con el que se marca una prueba como fallida
+LCG_TEST_MIN_SAMPLES = 1000  # Números mínimos para que todas las pruebas tengan datos
+LOW_BIT_PREFIX = "low_bit_"  # Prefijo de las pruebas de bits bajos, informativas y fuera del código de salida
+
+
+def _chi2_p_value(statistic, dof):
+    from scipy.special import chdtrc
+    return float(chdtrc(dof, statistic))
+
+
+def _normal_p_value(z):
+    # Valor p bilateral de la normal estándar
+    return math.erfc(abs(z) / math.sqrt(2))
+
+
+def _chi2(counts, expected):
+    expected = expected * counts.sum() / expected.sum()
+    statistic = float(((counts - expected) ** 2 / expected).sum())
+    return statistic, _chi2_p_value(statistic, len(counts) - 1)
+
+
+class _BatteryState:
+    def __init__(self, low_bits, max_lag):
+        self.samples = 0
+        self.bins = np.zeros(shape=LCG_TEST_BINS, dtype=np.int64)
+        self.pairs = np.zeros(shape=16, dtype=np.int64)  # Direcciones 2D de dos números consecutivos
+        self.triples = np.zeros(shape=216, dtype=np.int64)  # Direcciones 3D de tres números consecutivos
+        self.high = 0  # Números >= 0.5, para la prueba de rachas
+        self.runs = 0
+        self.last_high = None
+        self.total = 0.0
+        self.squares = 0.0
+        self.products = np.zeros(shape=max_lag)
+        self.tail = np.empty(shape=0)  # Últimos max_lag números del bloque anterior
+        self.low_bits = low_bits
+        # El bit k de un LCG módulo 2**g tiene periodo 2**(k + 1): se compara cada bit con el de ese retardo
+        self.low_matches = np.zeros(shape=low_bits, dtype=np.int64)
+        self.low_compared = np.zeros(shape=low_bits, dtype=np.int64)
+        self.low_tail = np.empty(shape=0, dtype=np.int64)  # Últimos bits bajos del bloque anterior
+        # Una sola búsqueda con los umbrales 2D y 3D juntos; las tablas traducen el índice a cada código
+        self.thresholds = np.union1d(random_walk.step_table(2).thresholds, random_walk.step_table(3).thresholds)
+        self.codes_2d = np.searchsorted(random_walk.step_table(2).thresholds, self.thresholds, side="left")
+        self.codes_2d = np.append(self.codes_2d, len(random_walk.step_table(2).thresholds)).astype(np.int64)
+        self.codes_3d = np.searchsorted(random_walk.step_table(3).thresholds, self.thresholds, side="left")
+        self.codes_3d = np.append(self.codes_3d, len(random_walk.step_table(3).thresholds)).astype(np.int64)
+
+    def update(self, numbers, states=None):
+        self.samples += len(numbers)
+        self.bins += np.bincount(np.minimum((numbers * LCG_TEST_BINS).astype(np.int64), LCG_TEST_BINS - 1),
+                                 minlength=LCG_TEST_BINS)
+
+        # Las pruebas serial usan los mismos umbrales que las caminatas 2D y 3D
+        index = np.searchsorted(self.thresholds, numbers, side="left")
+        codes = self.codes_2d[index[:len(index) // 2 * 2]].reshape(-1, 2)
+        self.pairs += np.bincount(codes[:, 0] * 4 + codes[:, 1], minlength=16)
+        codes = self.codes_3d[index[:len(index) // 3 * 3]].reshape(-1, 3)
+        self.triples += np.bincount((codes[:, 0] * 6 + codes[:, 1]) * 6 + codes[:, 2], minlength=216)
+
+        high = numbers >= 0.5
+        self.high += int(np.count_nonzero(high))
+        self.runs += int(np.count_nonzero(high[1:] != high[:-1]))
+        self.runs += 1 if self.last_high is None else int(high[0] != self.last_high)
+        self.last_high = high[-1]
+
+        self.total += float(numbers.sum())
+        self.squares += float(np.dot(numbers, numbers))
+        window = np.concatenate([self.tail, numbers])
+        previous = len(self.tail)
+        for lag in range(1, len(self.products) + 1):
+            first = max(lag, previous)
+            self.products[lag - 1] += float(np.dot(window[first:], window[first - lag:len(window) - lag]))
+        self.tail = window[-len(self.products):] if len(self.products) else self.tail
+
+        if self.low_bits and states is not None:
+            low = np.concatenate([self.low_tail, (states & ((1 << self.low_bits) - 1)).astype(np.int64)])
+            previous = len(self.low_tail)
+            for bit in range(self.low_bits):
+                lag = 2 << bit
+                first = max(lag, previous)
+                if first >= len(low):
+                    continue
+                same = ((low[first:] ^ low[first - lag:len(low) - lag]) >> bit) & 1 == 0
+                self.low_matches[bit] += int(np.count_nonzero(same))
+                self.low_compared[bit] += len(same)
+            self.low_tail = low[-(1 << self.low_bits):]
+
+    def results(self):
+        n = self.samples
+        results = {}
+        statistic, p_value = _chi2(self.bins, np.ones(shape=LCG_TEST_BINS))
+        results["uniformity"] = {"statistic": statistic, "p_value": p_value}
+        for name, count, table, counts in (("serial_pairs_2d", 2, 2, self.pairs),
+                                           ("serial_triples_3d", 3, 3, self.triples)):
+            probabilities = random_walk.step_table(table).probabilities
+            expected = probabilities
+            for _ in range(count - 1):
+                expected = np.multiply.outer(expected, probabilities)
+            statistic, p_value = _chi2(counts, expected.reshape(-1))
+            results[name] = {"statistic": statistic, "p_value": p_value}
+
+        # Prueba de rachas de Wald-Wolfowitz por encima y por debajo de 0.5
+        high, low = self.high, n - self.high
+        mean = 2 * high * low / n + 1 if n else 0.0
+        variance = (mean - 1) * (mean - 2) / (n - 1) if n > 1 else 0.0
+        z = (self.runs - mean) / math.sqrt(variance) if variance > 0 else math.inf
+        results["runs"] = {"statistic": z, "p_value": _normal_p_value(z)}
+
+        average = self.total / n
+        spread = self.squares / n - average ** 2
+        for lag, product in enumerate(self.products, start=1):
+            correlation = (product / (n - lag) - average ** 2) / spread if spread > 0 else math.inf
+            z = correlation * math.sqrt(n - lag)
+            results[f"autocorrelation_lag_{lag}"] = {"statistic": correlation, "p_value": _normal_p_value(z)}
+
+        for bit in range(self.low_bits):
+            # Con bits independientes coinciden la mitad de las veces; un bit periódico coincide siempre
+            compared = self.low_compared[bit]
+            if compared == 0:
+                continue
+            z = (self.low_matches[bit] - compared / 2) / math.sqrt(compared / 4)
+            results[f"{LOW_BIT_PREFIX}{bit}_period"] = {"statistic": self.low_matches[bit] / compared,
+                                                        "p_value": _normal_p_value(z)}
+        return results
+
+
+def run_battery(generator, samples=LCG_TEST_SAMPLES, low_bits=LCG_TEST_LOW_BITS, max_lag=LCG_TEST_MAX_LAG,
+                alpha=LCG_TEST_ALPHA):
+    """
+        Aplica la batería de pruebas estadísticas a los números de un generador, por bloques.
+
+        Las pruebas son chi-cuadrado de uniformidad, serial de pares y tríos con los umbrales de las
+        caminatas 2D y 3D (16 y 216 celdas), rachas por encima y por debajo de 0.5 y autocorrelación
+        hasta max_lag. Con low_bits > 0, y si el generador tiene generate_xn_block y m, se compara
+        además cada bit k menos significativo del estado con el de 2 ** (k + 1) pasos antes, el
+        periodo de ese bit en un LCG módulo potencia de dos; estas pruebas llevan el prefijo
+        LOW_BIT_PREFIX y son informativas, porque los movimientos usan los bits altos. La memoria no
+        depende de samples.
+
+        Args:
+            generator: Generador con generate_block(n) (por ejemplo CongruencialLineal); se avanza
+                samples pasos.
+            samples (int): Cantidad de números a examinar (al menos LCG_TEST_MIN_SAMPLES y más de
+                max_lag + 1).
+            low_bits (int): Bits menos significativos examinados (0 para omitir la prueba).
+            max_lag (int): Mayor retardo de la autocorrelación.
+            alpha (float): Nivel de significación.
+
+        Returns:
+            dict: Por prueba, "statistic", "p_value" y "passed" (p_value >= alpha).
+    """
+    if not 0 <= low_bits <= 8:
+        raise ValueError("low_bits debe estar entre 0 y 8")
+    if samples < max(LCG_TEST_MIN_SAMPLES, max_lag + 2):
+        raise ValueError(f"Se necesitan al menos {max(LCG_TEST_MIN_SAMPLES, max_lag + 2)} números")
+    state = _BatteryState(low_bits, max_lag)
+    states_available = low_bits > 0 and hasattr(generator, "generate_xn_block") and hasattr(generator, "m")
+    for start in range(0, samples, LCG_TEST_BLOCK):
+        length = min(LCG_TEST_BLOCK, samples - start)
+        if states_available:
+            states = generator.generate_xn_block(length)
+            state.update(states_to_numbers(states, generator.m), states)
+        else:
+            state.update(np.asarray(generator.generate_block(length), dtype=np.float64))
+    results = state.results()
+    for result in results.values():
+        result["passed"] = result["p_value"] >= alpha
+    return results
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Pruebas estadísticas del generador congruencial lineal.")
+    parser.add_argument("-n", "--samples", type=int, default=LCG_TEST_SAMPLES, help="Números a examinar")
+    parser.add_argument("-a", type=int, default=random_walk.a, help="Factor multiplicativo")
+    parser.add_argument("-c", type=int, default=random_walk.c, help="Término aditivo")
+    parser.add_argument("-m", type=int, default=random_walk.m, help="Módulo")
+    parser.add_argument("--seed", type=int, default=random_walk.seed, help="Semilla")
+    parser.add_argument("--alpha", type=float, default=LCG_TEST_ALPHA, help="Nivel de significación")
+    parser.add_argument("--low-bits", type=int, default=LCG_TEST_LOW_BITS,
+                        help="Bits menos significativos examinados (informativo, no cambia el código de salida)")
+    args = parser.parse_args(argv)
+
+    start = time.perf_counter()
+    try:
+        results = run_battery(CongruencialLineal(args.a, args.c, args.m, args.seed), args.samples, args.low_bits,
+                              alpha=args.alpha)
+    except ValueError as error:
+        parser.error(str(error))
+    seconds = time.perf_counter() - start
+    battery = {name: result for name, result in results.items() if not name.startswith(LOW_BIT_PREFIX)}
+    low_bits = {name: result for name, result in results.items() if name.startswith(LOW_BIT_PREFIX)}
+    for title, group in ((None, battery), ("Bits menos significativos (informativo):", low_bits)):
+        if title is not None and group:
+            print(title)
+        for name, result in group.items():
+            status = "ok" if result["passed"] else "FALLA"
+            print(f"{name:28s} {result['statistic']:14.6g}  p = {result['p_value']:.4g}  {status}")
+    print(f"{args.samples} números en {seconds:.2f} s", file=sys.stderr)
+    return 0 if all(result["passed"] for result in battery.values()) else 1
+
+
+if __name__ == '__main__':
+    sys.exit(main())
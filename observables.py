@@ -0,0 +1,399 @@
+import numpy as np
+import ensemble
+import random_walk
+import streaming
+from hitting_times import NOT_HIT
+from occupancy import SPARSE_MIN_BATCH, OccupancyCounter
+from streaming import MSDAccumulator, RunningExtrema
+
+# Acumuladores de una sola pasada. Todos tienen update(chunk), merge(other) y result(); las sumas son
+# enteras, así que combinar resultados parciales de otros tramos o procesos da el mismo valor exacto.
+# Los de una caminata (MSDAccumulator, RunningExtrema, OccupancyCounter, ReturnCounter, MaxExcursion)
+# reciben bloques (n, dim) en orden; los de un conjunto (EnsembleMSD, EnsembleReturns, EnsembleSites)
+# reciben bloques (caminantes, n, dim) de iter_ensemble junto con su paso inicial.
+
+OBSERVABLE_LAGS = (1, 10, 100, 1000)  # Retardos por defecto del desplazamiento cuadrático medio
+
+
+class ReturnCounter:
+    def __init__(self, origin, start=0):
+        """
+        Constructor de la clase ReturnCounter: regresos al origen de una caminata.
+
+        Args:
+            origin (tuple): Posición de origen con dim coordenadas.
+            start (int): Paso de la primera posición que recibirá update; la posición del paso 0 no
+                cuenta como regreso. Un tramo posterior de la caminata se acumula con su propio start
+                y se combina con merge.
+        """
+        self.origin = np.array(origin, dtype=np.int64).reshape(-1)
+        self.time = start  # Paso de la próxima posición
+        self.returns = 0
+        self.first_return = None
+
+    def update(self, chunk):
+        chunk = np.asarray(chunk, dtype=np.int64).reshape(-1, len(self.origin))
+        hits = np.flatnonzero(np.all(chunk == self.origin, axis=1)) + self.time
+        hits = hits[hits > 0]
+        if len(hits) > 0:
+            self.returns += len(hits)
+            if self.first_return is None:
+                self.first_return = int(hits[0])
+        self.time += len(chunk)
+
+    def merge(self, other):
+        """
+        Combina el acumulador de otro tramo de la misma caminata (en cualquier orden).
+
+        Args:
+            other (ReturnCounter): Acumulador con el mismo origen.
+        """
+        self.returns += other.returns
+        if other.first_return is not None:
+            self.first_return = other.first_return if self.first_return is None else \
+                min(self.first_return, other.first_return)
+        self.time = max(self.time, other.time)
+
+    def result(self):
+        """
+        Returns:
+            tuple: (número de regresos al origen, paso del primero o None).
+        """
+        return self.returns, self.first_return
+
+
+class MaxExcursion:
+    def __init__(self, origin):
+        """
+        Constructor de la clase MaxExcursion: mayor distancia euclídea al origen alcanzada.
+
+        Args:
+            origin (tuple): Posición de origen con dim coordenadas.
+        """
+        self.origin = np.array(origin, dtype=np.int64).reshape(-1)
+        self.squared = -1  # Mayor distancia al cuadrado (entera)
+        self.position = None
+
+    def update(self, chunk):
+        chunk = np.asarray(chunk, dtype=np.int64).reshape(-1, len(self.origin))
+        if len(chunk) == 0:
+            return
+        squared = ((chunk - self.origin) ** 2).sum(axis=1)
+        best = int(np.argmax(squared))
+        if squared[best] > self.squared:
+            self.squared = int(squared[best])
+            self.position = chunk[best].copy()
+
+    def merge(self, other):
+        """
+        Combina el acumulador de otro tramo o de otras caminatas con el mismo origen.
+
+        Args:
+            other (MaxExcursion): Acumulador a combinar.
+        """
+        if other.squared > self.squared:
+            self.squared, self.position = other.squared, other.position
+
+    def result(self):
+        """
+        Returns:
+            tuple: (mayor distancia al origen, posición donde se alcanzó), o (0.0, None) sin datos.
+        """
+        if self.position is None:
+            return 0.0, None
+        return float(np.sqrt(self.squared)), self.position
+
+
+class EnsembleMSD:
+    def __init__(self, n_walkers, steps, origin):
+        """
+        Constructor de la clase EnsembleMSD: desplazamiento cuadrático medio respecto al origen en
+        cada paso, promediado sobre los caminantes de un conjunto.
+
+        Args:
+            n_walkers (int): Número de caminantes.
+            steps (int): Número de pasos de las caminatas.
+            origin (tuple): Posición inicial común con dim coordenadas.
+        """
+        self.origin = np.array(origin, dtype=np.int64).reshape(-1)
+        self.sums = np.zeros(shape=steps + 1, dtype=np.int64)
+        self.counts = np.zeros(shape=steps + 1, dtype=np.int64)
+        # Paso 0: todos los caminantes están en el origen. Al combinar tramos de los mismos
+        # caminantes se cuenta más de una vez, pero su suma es 0 y el promedio no cambia
+        self.counts[0] = n_walkers
+
+    def update(self, chunk, start=0):
+        """
+        Acumula un bloque de posiciones de varios caminantes.
+
+        Args:
+            chunk (numpy.ndarray): Posiciones (caminantes, n, dim) de los pasos start + 1, ..., start + n,
+                como las devuelve ensemble.iter_ensemble.
+            start (int): Paso anterior al primero del bloque.
+        """
+        chunk = np.asarray(chunk, dtype=np.int64)
+        length = chunk.shape[1]
+        self.sums[start + 1:start + length + 1] += ((chunk - self.origin) ** 2).sum(axis=(0, 2))
+        self.counts[start + 1:start + length + 1] += chunk.shape[0]
+
+    def merge(self, other):
+        """
+        Combina el acumulador de otros caminantes (o de otros pasos de los mismos caminantes).
+
+        Args:
+            other (EnsembleMSD): Acumulador con los mismos pasos y origen.
+        """
+        self.sums += other.sums
+        self.counts += other.counts
+
+    def result(self):
+        """
+        Returns:
+            numpy.ndarray: Desplazamiento cuadrático medio de cada paso (nan en los pasos sin datos).
+        """
+        with np.errstate(invalid="ignore", divide="ignore"):
+            return self.sums / self.counts
+
+
+class EnsembleReturns:
+    def __init__(self, n_walkers, origin):
+        """
+        Constructor de la clase EnsembleReturns: regresos al origen de cada caminante de un conjunto.
+
+        Args:
+            n_walkers (int): Número de caminantes.
+            origin (tuple): Posición inicial común con dim coordenadas.
+        """
+        self.origin = np.array(origin, dtype=np.int64).reshape(-1)
+        self.returns = np.zeros(shape=n_walkers, dtype=np.int64)
+        self.first_return = np.full(shape=n_walkers, fill_value=NOT_HIT, dtype=np.int64)
+
+    def update(self, chunk, start=0):
+        """
+        Acumula un bloque de posiciones de todos los caminantes.
+
+        Args:
+            chunk (numpy.ndarray): Posiciones (caminantes, n, dim) de los pasos start + 1, ..., start + n.
+            start (int): Paso anterior al primero del bloque.
+        """
+        at_origin = np.all(np.asarray(chunk, dtype=np.int64) == self.origin, axis=2)
+        self.returns += at_origin.sum(axis=1)
+        new = (self.first_return == NOT_HIT) & at_origin.any(axis=1)
+        self.first_return[new] = start + 1 + np.argmax(at_origin[new], axis=1)
+
+    def merge(self, other):
+        """
+        Combina el acumulador de otros pasos de los mismos caminantes.
+
+        Args:
+            other (EnsembleReturns): Acumulador con los mismos caminantes y origen.
+        """
+        self.returns += other.returns
+        both = (self.first_return != NOT_HIT) & (other.first_return != NOT_HIT)
+        self.first_return = np.where(both, np.minimum(self.first_return, other.first_return),
+                                     np.maximum(self.first_return, other.first_return))
+
+    def result(self):
+        """
+        Returns:
+            tuple: (regresos al origen de cada caminante, paso del primero o NOT_HIT).
+        """
+        return self.returns, self.first_return
+
+
+class EnsembleSites:
+    def __init__(self, n_walkers, steps, origin):
+        """
+        Constructor de la clase EnsembleSites: sitios distintos visitados por cada caminante de un
+        conjunto. Cada visita se guarda como la clave entera del par (caminante, desplazamiento),
+        que cabe en int64 mientras n_walkers * (2 * steps + 1) ** dim lo permita; si no, se usan las
+        filas (caminante, posición) como claves binarias, más lentas de ordenar.
+
+        Args:
+            n_walkers (int): Número de caminantes.
+            steps (int): Número de pasos de las caminatas.
+            origin (tuple): Posición inicial común con dim coordenadas.
+        """
+        self.n_walkers = n_walkers
+        self.origin = np.array(origin, dtype=np.int64).reshape(-1)
+        self.side = 2 * steps + 1  # Valores posibles de cada coordenada del desplazamiento
+        self.packed = n_walkers * float(self.side) ** len(self.origin) < 2 ** 62
+        self.keys = self._keys(np.tile(self.origin, (n_walkers, 1, 1)))
+        self.pending = []  # Claves aún no combinadas, como en OccupancyCounter
+        self.pending_size = 0
+
+    def _keys(self, chunk):
+        walkers = np.repeat(np.arange(self.n_walkers, dtype=np.int64), chunk.shape[1])
+        displacement = chunk.reshape(-1, len(self.origin)) - self.origin
+        if self.packed:
+            keys = walkers
+            for axis in range(len(self.origin)):
+                keys = keys * self.side + displacement[:, axis] + self.side // 2
+            return np.unique(keys)
+        rows = np.ascontiguousarray(np.column_stack([walkers, displacement]))
+        return np.unique(rows.view(np.dtype((np.void, rows.dtype.itemsize * rows.shape[1]))).reshape(-1))
+
+    def update(self, chunk, start=0):
+        """
+        Acumula un bloque de posiciones de todos los caminantes.
+
+        Args:
+            chunk (numpy.ndarray): Posiciones (caminantes, n, dim) de los pasos start + 1, ..., start + n.
+            start (int): Paso anterior al primero del bloque.
+        """
+        chunk = np.asarray(chunk, dtype=np.int64)
+        self.pending.append(self._keys(chunk))
+        self.pending_size += chunk.shape[0] * chunk.shape[1]
+        if self.pending_size >= max(len(self.keys), SPARSE_MIN_BATCH):
+            self._merge()
+
+    def _merge(self):
+        if self.pending:
+            self.keys = np.unique(np.concatenate([self.keys] + self.pending))
+            self.pending = []
+            self.pending_size = 0
+
+    def merge(self, other):
+        """
+        Combina el acumulador de otros pasos de los mismos caminantes.
+
+        Args:
+            other (EnsembleSites): Acumulador con los mismos caminantes, pasos y origen.
+        """
+        other._merge()
+        self.pending.append(other.keys)
+        self.pending_size += len(other.keys)
+        self._merge()
+
+    def result(self):
+        """
+        Returns:
+            numpy.ndarray: Número de sitios distintos visitados por cada caminante (incluido el origen).
+        """
+        self._merge()
+        if self.packed:
+            walkers = self.keys // self.side ** len(self.origin)
+        else:
+            walkers = self.keys.view(np.int64).reshape(len(self.keys), -1)[:, 0]
+        return np.bincount(walkers, minlength=self.n_walkers)
+
+
+def walk_accumulators(dim, source, lags=OBSERVABLE_LAGS, start=0):
+    """
+        Crea los acumuladores de las observables de una caminata.
+
+        Args:
+            dim (int | StepTable): Dimensión de la caminata o tabla de pasos.
+            source (tuple): Posición inicial con dim coordenadas (el origen de la caminata completa,
+                también para los tramos posteriores).
+            lags (list): Retardos del desplazamiento cuadrático medio.
+            start (int): Paso de la primera posición que recibirán; un tramo que empieza en la
+                posición del paso k se acumula con start=k para que sus regresos al origen cuenten.
+
+        Returns:
+            dict: Acumuladores por nombre; los de otro tramo se combinan con merge, nombre a nombre.
+    """
+    return {
+        "msd": MSDAccumulator(lags),
+        "extrema": RunningExtrema(),
+        "occupancy": OccupancyCounter(random_walk.step_table(dim).dim),
+        "returns": ReturnCounter(source, start),
+        "excursion": MaxExcursion(source),
+    }
+
+
+def summarize(accumulators):
+    """
+        Convierte los acumuladores de walk_accumulators en resultados.
+
+        Args:
+            accumulators (dict): Acumuladores creados con walk_accumulators.
+
+        Returns:
+            dict: "msd" (por retardo), "minimum" y "maximum" por eje, "distinct_sites", "returns",
+            "first_return", "max_excursion" y "max_excursion_position".
+    """
+    minimum, maximum = accumulators["extrema"].result()
+    returns, first_return = accumulators["returns"].result()
+    excursion, position = accumulators["excursion"].result()
+    msd = accumulators["msd"]
+    return {
+        "msd": dict(zip(msd.lags.tolist(), msd.result().tolist())),
+        "minimum": minimum,
+        "maximum": maximum,
+        "distinct_sites": accumulators["occupancy"].distinct_sites(),
+        "returns": returns,
+        "first_return": first_return,
+        "max_excursion": excursion,
+        "max_excursion_position": position,
+    }
+
+
+def walk_observables(steps, dim, source, stream=None, lags=OBSERVABLE_LAGS, chunk_size=streaming.STREAM_CHUNK_SIZE):
+    """
+        Calcula en una pasada las observables de una caminata sin guardar la trayectoria.
+
+        Args:
+            steps (int): Número de pasos en la caminata.
+            dim (int | StepTable): Dimensión de la caminata o tabla de pasos.
+            source (tuple): Posición inicial con dim coordenadas.
+            stream (RandomStream): Flujo de movimientos (None para usar la semilla global).
+            lags (list): Retardos del desplazamiento cuadrático medio.
+            chunk_size (int): Pasos por bloque.
+
+        Returns:
+            dict: Resultados de summarize.
+    """
+    accumulators = walk_accumulators(dim, source, lags)
+    streaming.reduce_walk(streaming.iter_walk(dim, source, chunk_size, steps, stream), accumulators.values())
+    return summarize(accumulators)
+
+
+def ensemble_observables(n_walkers, steps, dim, source, generator=None):
+    """
+        Calcula en una pasada las observables de un conjunto de caminatas.
+
+        Args:
+            n_walkers (int): Número de caminantes.
+            steps (int): Número de pasos de cada caminata.
+            dim (int | StepTable): Dimensión de las caminatas o tabla de pasos.
+            source (tuple): Posición inicial común con dim coordenadas.
+            generator (CongruencialLineal): Generador base (None para usar la semilla global).
+
+        Returns:
+            dict: "msd" (desplazamiento cuadrático medio de cada paso), "minimum" y "maximum" por eje,
+            "max_excursion" y "max_excursion_position" sobre todos los caminantes; por caminante,
+            "distinct_sites", "returns" y "first_return" (NOT_HIT si no regresa), y sus resúmenes
+            "mean_distinct_sites", "mean_returns" y "return_fraction".
+    """
+    width = random_walk.step_table(dim).dim
+    msd = EnsembleMSD(n_walkers, steps, source)
+    extrema = RunningExtrema()
+    excursion = MaxExcursion(source)
+    returns = EnsembleReturns(n_walkers, source)
+    sites = EnsembleSites(n_walkers, steps, source)
+    extrema.update(np.array(source, dtype=np.int64).reshape(1, width))
+    for start, walk in ensemble.iter_ensemble(n_walkers, steps, dim, source, generator):
+        msd.update(walk, start)
+        returns.update(walk, start)
+        sites.update(walk, start)
+        flat = walk.reshape(-1, width)
+        extrema.update(flat)
+        excursion.update(flat)
+    minimum, maximum = extrema.result()
+    distance, position = excursion.result()
+    return_counts, first_return = returns.result()
+    distinct_sites = sites.result()
+    return {
+        "msd": msd.result(),
+        "minimum": minimum,
+        "maximum": maximum,
+        "max_excursion": distance,
+        "max_excursion_position": position,
+        "distinct_sites": distinct_sites,
+        "mean_distinct_sites": distinct_sites.mean(),
+        "returns": return_counts,
+        "mean_returns": return_counts.mean(),
+        "first_return": first_return,
+        "return_fraction": (first_return != NOT_HIT).mean(),
+    }
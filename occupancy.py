@@ -0,0 +1,219 @@
+import numpy as np
+
+DENSE_MAX_SITES = 2 ** 24  # Sitios máximos de la malla densa antes de pasar al conteo disperso
+SPARSE_MIN_BATCH = 2 ** 20  # Posiciones acumuladas antes de combinar en el conteo disperso
+DENSE_SLACK = 0.5  # Margen extra, relativo al nuevo tamaño, en cada lado que crece de la malla densa
+
+
+def occupancy_1d(path):
+    """
+        Cuenta las visitas a cada sitio de una caminata 1D en tiempo lineal con numpy.bincount.
+
+        Equivale a numpy.unique(path, return_counts=True) sin ordenar la trayectoria.
+
+        Args:
+            path (numpy.ndarray): Posiciones enteras de la caminata (pueden venir como float64).
+
+        Returns:
+            tuple: (sitios visitados en orden creciente, número de visitas de cada uno).
+    """
+    path = np.asarray(path).astype(np.int64)
+    if len(path) == 0:
+        return path, np.empty(shape=0, dtype=np.int64)
+    low = path.min()
+    counts = np.bincount(path - low)
+    sites = np.flatnonzero(counts)
+    return sites + low, counts[sites]
+
+
+class OccupancyCounter:
+    def __init__(self, dim, max_dense_sites=DENSE_MAX_SITES):
+        """
+        Constructor de la clase OccupancyCounter: visitas a cada sitio de una caminata, acumuladas por
+        bloques. Mientras la caja envolvente tenga a lo sumo max_dense_sites sitios se usa una malla
+        densa; si crece más (caminatas 3D largas) se pasa a un conteo disperso de claves enteras
+        ordenadas. Cada bloque cuesta O(len(chunk)) y no O(tamaño de la malla): solo se suman los
+        sitios del bloque, y la malla crece con margen para que las copias al ampliarla se amorticen.
+
+        Args:
+            dim (int): Dimensión de la caminata.
+            max_dense_sites (int): Tamaño máximo de la malla densa.
+        """
+        self.dim = dim
+        self.max_dense_sites = max_dense_sites
+        self.total = 0
+        self.counts = None  # Malla densa
+        self.origin = None  # Coordenadas del sitio counts[0, ..., 0]
+        self.low = None  # Caja envolvente exacta de los sitios visitados (la malla puede ser mayor)
+        self.high = None
+        self.keys = None  # Claves ordenadas del conteo disperso
+        self.key_counts = None
+        self.pending = []  # Bloques aún no combinados en el conteo disperso
+        self.pending_size = 0
+        self.bits = 63 // dim  # Bits por coordenada en las claves dispersas
+
+    def update(self, chunk):
+        chunk = np.asarray(chunk, dtype=np.int64).reshape(-1, self.dim)
+        if len(chunk) == 0:
+            return
+        self.total += len(chunk)
+        if self.keys is None:
+            if self._fits_dense(chunk.min(axis=0), chunk.max(axis=0)):
+                flat = np.ravel_multi_index(tuple((chunk - self.origin).T), self.counts.shape)
+                self._add_flat(flat)
+                return
+            self._to_sparse()
+        self.pending.append(chunk)
+        self.pending_size += len(chunk)
+        # Combinar solo cuando lo pendiente es comparable a lo ya contado mantiene el costo amortizado
+        if self.pending_size >= max(len(self.keys), SPARSE_MIN_BATCH):
+            self._merge()
+
+    def _fits_dense(self, low, high):
+        # Amplía la malla para cubrir [low, high] si la caja visitada sigue cabiendo en la malla densa
+        if self.low is not None:
+            low = np.minimum(low, self.low)
+            high = np.maximum(high, self.high)
+        if np.prod(high - low + 1, dtype=np.float64) > self.max_dense_sites:
+            return False
+        self.low, self.high = low, high
+        self._grow(low, high)
+        return True
+
+    def _grow(self, low, high):
+        if self.counts is not None and np.all(low >= self.origin) and \
+                np.all(high < self.origin + self.counts.shape):
+            return
+        start, end = low, high + 1
+        if self.counts is not None:
+            # Los lados que crecen reciben un margen proporcional al nuevo tamaño, si cabe en la malla
+            slack = ((end - start) * DENSE_SLACK).astype(np.int64)
+            start = np.where(low < self.origin, low - slack, self.origin)
+            end = np.where(high >= self.origin + self.counts.shape, high + 1 + slack,
+                           self.origin + self.counts.shape)
+            if np.prod(end - start, dtype=np.float64) > self.max_dense_sites:
+                start, end = np.minimum(low, self.origin), np.maximum(high + 1, self.origin + self.counts.shape)
+        grown = np.zeros(shape=tuple(end - start), dtype=np.int64)
+        if self.counts is not None:
+            offset = self.origin - start
+            grown[tuple(slice(o, o + s) for o, s in zip(offset, self.counts.shape))] = self.counts
+        self.counts = grown
+        self.origin = start
+
+    def _add_flat(self, flat, counts=None):
+        # Suma visitas a índices planos de la malla sin recorrerla entera
+        cells = self.counts.reshape(-1)
+        if counts is not None:
+            cells[flat] += counts  # Índices sin repetir
+            return
+        first, last = int(flat.min()), int(flat.max())
+        if last - first < 4 * len(flat):
+            cells[first:last + 1] += np.bincount(flat - first, minlength=last - first + 1)
+        else:
+            keys, key_counts = np.unique(flat, return_counts=True)
+            cells[keys] += key_counts
+
+    def _encode(self, positions):
+        shifted = positions + (1 << (self.bits - 1))
+        if np.any(shifted < 0) or np.any(shifted >= 1 << self.bits):
+            raise ValueError("Coordenadas fuera del rango del conteo disperso")
+        keys = np.zeros(shape=len(positions), dtype=np.int64)
+        for axis in range(self.dim):
+            keys = (keys << self.bits) | shifted[:, axis]
+        return keys
+
+    def _decode(self, keys):
+        positions = np.empty(shape=(len(keys), self.dim), dtype=np.int64)
+        mask = (1 << self.bits) - 1
+        for axis in reversed(range(self.dim)):
+            positions[:, axis] = (keys & mask) - (1 << (self.bits - 1))
+            keys = keys >> self.bits
+        return positions
+
+    def _to_sparse(self):
+        self.keys = np.empty(shape=0, dtype=np.int64)
+        self.key_counts = np.empty(shape=0, dtype=np.int64)
+        if self.counts is not None:
+            flat = np.flatnonzero(self.counts)
+            sites = np.column_stack(np.unravel_index(flat, self.counts.shape)) + self.origin
+            self.keys = self._encode(sites)  # Ordenadas, igual que los índices planos
+            self.key_counts = self.counts.reshape(-1)[flat]
+            self.counts = None
+
+    def _merge(self):
+        if not self.pending:
+            return
+        new_keys, new_counts = np.unique(self._encode(np.concatenate(self.pending)), return_counts=True)
+        self.pending = []
+        self.pending_size = 0
+        self._add_keys(new_keys, new_counts)
+
+    def _add_keys(self, new_keys, new_counts):
+        keys = np.concatenate([self.keys, new_keys])
+        keys, inverse = np.unique(keys, return_inverse=True)
+        counts = np.zeros(shape=len(keys), dtype=np.int64)
+        np.add.at(counts, inverse.reshape(-1), np.concatenate([self.key_counts, new_counts]))
+        self.keys, self.key_counts = keys, counts
+
+    def merge(self, other):
+        """
+        Suma las visitas de otro contador, por ejemplo de otro tramo de la caminata o de otro proceso.
+
+        Args:
+            other (OccupancyCounter): Contador de la misma dimensión.
+        """
+        sites, counts = other.sites()
+        if len(sites) == 0:
+            return
+        self.total += other.total
+        if self.keys is None:
+            if self._fits_dense(sites.min(axis=0), sites.max(axis=0)):
+                flat = np.ravel_multi_index(tuple((sites - self.origin).T), self.counts.shape)
+                self._add_flat(flat, counts)  # Los sitios de other no se repiten
+                return
+            self._to_sparse()
+        self._merge()
+        self._add_keys(self._encode(sites), counts)
+
+    def sites(self):
+        """
+        Returns:
+            tuple: (coordenadas de forma (k, dim) de los sitios visitados, visitas de cada uno).
+        """
+        if self.keys is not None:
+            self._merge()
+            return self._decode(self.keys), self.key_counts.copy()
+        if self.counts is None:
+            return np.empty(shape=(0, self.dim), dtype=np.int64), np.empty(shape=0, dtype=np.int64)
+        flat = np.flatnonzero(self.counts)
+        sites = np.column_stack(np.unravel_index(flat, self.counts.shape)) + self.origin
+        return sites, self.counts.reshape(-1)[flat]
+
+    def distinct_sites(self):
+        """
+        Returns:
+            int: Número de sitios distintos visitados.
+        """
+        if self.keys is not None:
+            self._merge()
+            return len(self.keys)
+        return 0 if self.counts is None else int(np.count_nonzero(self.counts))
+
+    def most_visited(self):
+        """
+        Returns:
+            tuple: (coordenadas del sitio más visitado, número de visitas), o (None, 0) sin visitas.
+        """
+        if self.keys is not None:
+            self._merge()
+            if len(self.keys) == 0:
+                return None, 0
+            best = int(np.argmax(self.key_counts))
+            return self._decode(self.keys[best:best + 1])[0], int(self.key_counts[best])
+        if self.counts is None:
+            return None, 0
+        best = np.unravel_index(int(np.argmax(self.counts)), self.counts.shape)
+        return np.array(best) + self.origin, int(self.counts[best])
+
+    def result(self):
+        return self.sites()
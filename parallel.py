@@ -0,0 +1,274 @@
+import os
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import shared_memory
+import numpy as np
+import random_walk
+from ensemble import reserve_walkers, simulate_ensemble
+from random_generator import CongruencialLineal, generator_lock
+
+PARALLEL_SEGMENT = 2 ** 22  # Pasos máximos que procesa cada tarea de un proceso
+
+
+# Funciones auxiliares para compartir arreglos entre procesos sin serializarlos
+def _create_shared(shape, dtype):
+    nbytes = max(1, int(np.prod(shape)) * np.dtype(dtype).itemsize)
+    shm = shared_memory.SharedMemory(create=True, size=nbytes)
+    return shm, np.ndarray(shape, dtype=dtype, buffer=shm.buf)
+
+
+def _release_shared(shm, array):
+    result = np.array(array)  # Copia el resultado antes de liberar el bloque compartido
+    del array
+    shm.close()
+    shm.unlink()
+    return result
+
+
+def _attach_shared(name, shape, dtype):
+    shm = shared_memory.SharedMemory(name=name)
+    return shm, np.ndarray(shape, dtype=dtype, buffer=shm.buf)
+
+
+def _generator_at(params, offset):
+    a, c, m, state = params
+    generator = CongruencialLineal(a, c, m, state)
+    generator.jump(offset)
+    return generator
+
+
+def _segments(total, workers, max_length):
+    """
+        Divide el intervalo [0, total) en segmentos contiguos de igual tamaño.
+
+        Args:
+            total (int): Longitud del intervalo.
+            workers (int): Número de procesos (se generan al menos tantos segmentos).
+            max_length (int): Longitud máxima de cada segmento.
+
+        Returns:
+            list: Pares (inicio, longitud) de cada segmento.
+    """
+    if total == 0:
+        return []
+    count = max(workers, -(-total // max_length))
+    length = -(-total // count)
+    return [(start, min(length, total - start)) for start in range(0, total, length)]
+
+
+def _default_workers(workers):
+    return workers if workers is not None else os.cpu_count() or 1
+
+
+# Tareas ejecutadas en los procesos del pool
+def _ensemble_task(params, n_walkers, offset, count, steps, dim, source, name):
+    generator = _generator_at(params, offset * steps)
+    shm, endpoints = _attach_shared(name, (n_walkers, random_walk.step_table(dim).dim), np.int64)
+    try:
+        endpoints[offset:offset + count] = simulate_ensemble(count, steps, dim, source, "endpoints", generator)
+    finally:
+        del endpoints
+        shm.close()
+
+
+def _walk_segment_task(params, steps, start, length, dim, name):
+    moves = _generator_at(params, start).generate_block(length)
+    table = random_walk.step_table(dim)
+    codes = table.codes(moves)
+    shm, positions = _attach_shared(name, (steps + 1, table.dim), np.int64)
+    segment = None  # Así el finally no falla si la vista no llegó a crearse
+    try:
+        segment = positions[start + 1:start + length + 1]
+        np.cumsum(table.deltas[codes], axis=0, dtype=np.int64, out=segment)
+        return segment[-1].copy()
+    finally:
+        del segment, positions
+        shm.close()
+
+
+def _walk_offset_task(steps, start, length, dim, offset, name):
+    shm, positions = _attach_shared(name, (steps + 1, random_walk.step_table(dim).dim), np.int64)
+    try:
+        positions[start + 1:start + length + 1] += offset
+    finally:
+        del positions
+        shm.close()
+
+
+def _search_codes_task(params, total, start, length, dim, name):
+    moves = _generator_at(params, start).generate_block(length)
+    shm, codes = _attach_shared(name, (total,), np.int8)
+    segment = None  # Así el finally no falla si la vista no llegó a crearse
+    try:
+        segment = codes[start:start + length]
+        table = random_walk.step_table(dim)
+        segment[:] = table.codes(moves)
+        return table.deltas[segment].sum(axis=0, dtype=np.int64)
+    finally:
+        del segment, codes
+        shm.close()
+
+
+def _search_hits_task(total, start, length, dim, position, target, name):
+    shm, codes = _attach_shared(name, (total,), np.int8)
+    try:
+        positions = random_walk.codes_to_positions(codes[start:start + length], dim, position)[1:]
+        hits = np.flatnonzero(np.all(positions == target, axis=1))
+        return int(hits[0]) if len(hits) > 0 else -1
+    finally:
+        del codes
+        shm.close()
+
+
+def parallel_ensemble(n_walkers, steps, dim, source, workers=None, generator=None):
+    """
+        Simula un conjunto de caminatas repartiendo los caminantes entre procesos.
+
+        Cada proceso salta directamente a la subsecuencia de sus caminantes, por lo que el resultado
+        es idéntico al de simulate_ensemble sin importar el número de procesos.
+
+        Args:
+            n_walkers (int): Número de caminantes.
+            steps (int): Número de pasos de cada caminata.
+            dim (int): Dimensión de las caminatas (1, 2 o 3).
+            source (tuple): Posición inicial común con dim coordenadas.
+            workers (int): Número de procesos (por defecto os.cpu_count()).
+            generator (CongruencialLineal): Generador base, con el mismo significado que en simulate_ensemble.
+
+        Returns:
+            numpy.ndarray: Posiciones finales int64 de forma (n_walkers, dim).
+    """
+    workers = _default_workers(workers)
+    base = reserve_walkers(n_walkers, steps, generator)
+    params = (base.a, base.c, base.m, base.xn)
+    walkers_per_task = max(1, PARALLEL_SEGMENT // max(steps, 1))
+    shm, endpoints = _create_shared((n_walkers, random_walk.step_table(dim).dim), np.int64)
+    try:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            futures = [pool.submit(_ensemble_task, params, n_walkers, offset, count, steps, dim, source, shm.name)
+                       for offset, count in _segments(n_walkers, workers, walkers_per_task)]
+            for future in futures:
+                future.result()
+    finally:
+        endpoints = _release_shared(shm, endpoints)
+    return endpoints
+
+
+def parallel_walk_positions(steps, dim, source, workers=None, generator=None):
+    """
+        Realiza una caminata aleatoria larga repartiendo tramos de pasos entre procesos.
+
+        Cada proceso salta al inicio de su tramo y acumula sus desplazamientos en memoria compartida;
+        después se suma a cada tramo la posición final de los anteriores. El resultado es idéntico al
+        de walk_positions sin importar el número de procesos.
+
+        Args:
+            steps (int): Número de pasos en la caminata.
+            dim (int | StepTable): Dimensión de la caminata o tabla de pasos.
+            source (tuple): Posición inicial con dim coordenadas.
+            workers (int): Número de procesos (por defecto os.cpu_count()).
+            generator (CongruencialLineal): Generador de movimientos. Si es None se usa la semilla
+                global de random_walk, igual que generate_moves.
+
+        Returns:
+            numpy.ndarray: Posiciones int64 de forma (steps + 1, dim).
+    """
+    workers = _default_workers(workers)
+    if generator is None:
+        generator = random_walk.legacy_generator()
+
+    with generator_lock(generator):
+        params = (generator.a, generator.c, generator.m, generator.xn)
+        generator.jump(steps)
+    segments = _segments(steps, workers, PARALLEL_SEGMENT)
+    shm, positions = _create_shared((steps + 1, random_walk.step_table(dim).dim), np.int64)
+    try:
+        positions[0] = source
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            futures = [pool.submit(_walk_segment_task, params, steps, start, length, dim, shm.name)
+                       for start, length in segments]
+            offsets = np.cumsum([positions[0]] + [future.result() for future in futures], axis=0)
+            futures = [pool.submit(_walk_offset_task, steps, start, length, dim, offsets[i], shm.name)
+                       for i, (start, length) in enumerate(segments)]
+            for future in futures:
+                future.result()
+    finally:
+        positions = _release_shared(shm, positions)
+    return positions
+
+
+def parallel_first_passage(dim, source, target_position, workers=None, generator=None, max_steps=None,
+                           stop_event=None, return_path=False):
+    """
+        Busca el tiempo de llegada a una posición objetivo repartiendo la búsqueda entre procesos.
+
+        En cada ronda los procesos generan en memoria compartida los códigos de tramos consecutivos y
+        su desplazamiento total; con las posiciones iniciales de cada tramo, una segunda pasada busca
+        el primer acierto de cada uno. Las rondas crecen hasta PARALLEL_SEGMENT pasos por proceso.
+
+        Args:
+            dim (int | StepTable): Dimensión de la caminata o tabla de pasos.
+            source (tuple): Posición inicial con dim coordenadas.
+            target_position (tuple): Posición objetivo con dim coordenadas.
+            workers (int): Número de procesos (por defecto os.cpu_count()).
+            generator (CongruencialLineal): Generador de movimientos (por defecto next_step_generator).
+            max_steps (int): Número máximo de pasos a simular (None para no limitar).
+            stop_event (threading.Event): Evento de cancelación, se revisa entre rondas.
+            return_path (bool): Si es True se reconstruye la trayectoria recorrida al final.
+
+        Returns:
+            tuple: (pasos, posiciones) con el mismo significado que en first_passage.
+    """
+    workers = _default_workers(workers)
+    if generator is None:
+        generator = random_walk.next_step_generator
+    with generator_lock(generator):
+        return _parallel_first_passage(dim, source, target_position, workers, generator, max_steps, stop_event,
+                                       return_path)
+
+
+def _parallel_first_passage(dim, source, target_position, workers, generator, max_steps, stop_event, return_path):
+    params = (generator.a, generator.c, generator.m, generator.xn)
+    width = random_walk.step_table(dim).dim
+    position = np.array(source, dtype=np.int64).reshape(width)
+    target = np.array(target_position, dtype=np.int64).reshape(width)
+    hitting_time = 0 if np.array_equal(position, target) else None
+    steps_done = 0
+    segment_length = random_walk.FIRST_PASSAGE_MIN_CHUNK
+
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        while hitting_time is None:
+            if max_steps is not None and steps_done >= max_steps:
+                break
+            if stop_event is not None and stop_event.is_set():
+                break
+            total = workers * segment_length
+            if max_steps is not None:
+                total = min(total, max_steps - steps_done)
+            round_params = params[:3] + (CongruencialLineal(*params).jump(steps_done),)
+            segments = _segments(total, workers, segment_length)
+            shm, codes = _create_shared((total,), np.int8)
+            try:
+                futures = [pool.submit(_search_codes_task, round_params, total, start, length, dim, shm.name)
+                           for start, length in segments]
+                starts = np.cumsum([position] + [future.result() for future in futures], axis=0)
+                futures = [pool.submit(_search_hits_task, total, start, length, dim, starts[i], target, shm.name)
+                           for i, (start, length) in enumerate(segments)]
+                for i, future in enumerate(futures):
+                    hit = future.result()
+                    if hit >= 0 and hitting_time is None:
+                        hitting_time = steps_done + segments[i][0] + hit + 1
+            finally:
+                del codes
+                shm.close()
+                shm.unlink()
+            position = starts[-1]
+            steps_done += total
+            segment_length = min(segment_length * 2, PARALLEL_SEGMENT)
+
+    consumed = hitting_time if hitting_time is not None else steps_done
+    path = None
+    if return_path:
+        path = parallel_walk_positions(consumed, dim, source, workers, CongruencialLineal(*params))
+    generator.xn = params[3]
+    generator.jump(consumed)
+    return hitting_time, path
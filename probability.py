@@ -0,0 +1,254 @@
+import math
+import numpy as np
+
+# scipy, decimal y fractions se importan al usarse por primera vez para que simular no los cargue
+
+LOG_FACTORIAL_TABLE_MAX = 2 ** 22  # Mayor n cuyo log(n!) se guarda en la tabla
+EXACT_DECIMAL_STEPS = 10_000  # Hasta este número de pasos decimal_walk_probability usa aritmética exacta
+LATTICE_DIRECT_WORK = 5 * 10 ** 7  # Máximo de operaciones (pasos x sitios) para la convolución directa
+
+_log_factorials = np.zeros(shape=1)  # Tabla de log(n!) para n = 0, ..., len - 1
+
+
+def log_factorial(n):
+    """
+        Calcula log(n!) usando una tabla que crece bajo demanda.
+
+        Args:
+            n (int | numpy.ndarray): Entero(s) no negativo(s).
+
+        Returns:
+            numpy.ndarray: log(n!) en float64 con la forma de n.
+    """
+    global _log_factorials
+    from scipy.special import gammaln
+    n = np.asarray(n, dtype=np.int64)
+    largest = int(n.max(initial=0))
+    if largest > LOG_FACTORIAL_TABLE_MAX:
+        return gammaln(n + 1.0)
+    if largest >= len(_log_factorials):
+        size = min(max(2 * len(_log_factorials), largest + 1), LOG_FACTORIAL_TABLE_MAX + 1)
+        # Cada entrada se calcula por separado para no acumular errores de redondeo
+        _log_factorials = gammaln(np.arange(size) + 1.0)
+    return _log_factorials[n]
+
+
+def log_binomial(n, k):
+    """
+        Calcula log(C(n, k)) de forma vectorizada.
+
+        Args:
+            n (int | numpy.ndarray): Tamaño(s) del conjunto.
+            k (int | numpy.ndarray): Tamaño(s) del subconjunto, con 0 <= k <= n.
+
+        Returns:
+            numpy.ndarray: log(C(n, k)) en float64.
+    """
+    n = np.asarray(n, dtype=np.int64)
+    k = np.asarray(k, dtype=np.int64)
+    return log_factorial(n) - log_factorial(k) - log_factorial(n - k)
+
+
+def walk_distances(source, destination, dim):
+    """
+        Calcula la distancia de Manhattan entre posiciones de forma vectorizada.
+
+        Args:
+            source (int | tuple | numpy.ndarray): Posición(es) inicial(es). En 1D son enteros y en 2D/3D
+                la última dimensión del arreglo contiene las coordenadas.
+            destination (int | tuple | numpy.ndarray): Posición(es) objetivo con el mismo formato.
+            dim (int): Dimensión de la caminata.
+
+        Returns:
+            numpy.ndarray: Distancias int64.
+    """
+    difference = np.abs(np.asarray(destination, dtype=np.int64) - np.asarray(source, dtype=np.int64))
+    return difference if dim == 1 else difference.sum(axis=-1)
+
+
+def log_walk_probability(steps, source, destination, dim):
+    """
+        Calcula en espacio logarítmico la probabilidad de las fórmulas calculate_*_probability.
+
+        La probabilidad es C(n, d) * q ** d * (1 - q) ** (n - d) con q = 1 / (2 * dim), n pasos y d la
+        distancia de Manhattan, y vale 0 si n y d no tienen la misma paridad o d > n.
+
+        Args:
+            steps (int | numpy.ndarray): Número(s) de pasos.
+            source (int | tuple | numpy.ndarray): Posición(es) inicial(es), como en walk_distances.
+            destination (int | tuple | numpy.ndarray): Posición(es) objetivo, como en walk_distances.
+            dim (int): Dimensión de la caminata (1, 2 o 3).
+
+        Returns:
+            numpy.ndarray: Logaritmo natural de la probabilidad (-inf si es 0).
+    """
+    steps = np.asarray(steps, dtype=np.int64)
+    distance = walk_distances(source, destination, dim)
+    steps, distance = np.broadcast_arrays(steps, distance)
+    valid = (distance <= steps) & ((steps - distance) % 2 == 0)
+    n = np.where(valid, steps, 0)
+    d = np.where(valid, distance, 0)
+    q = 1 / (2 * dim)
+    result = log_binomial(n, d) + d * math.log(q) + (n - d) * math.log1p(-q)
+    return np.where(valid, result, -np.inf)
+
+
+def walk_probability(steps, source, destination, dim):
+    """
+        Calcula de forma vectorizada la probabilidad de las fórmulas calculate_*_probability.
+
+        Args:
+            steps (int | numpy.ndarray): Número(s) de pasos.
+            source (int | tuple | numpy.ndarray): Posición(es) inicial(es), como en walk_distances.
+            destination (int | tuple | numpy.ndarray): Posición(es) objetivo, como en walk_distances.
+            dim (int): Dimensión de la caminata (1, 2 o 3).
+
+        Returns:
+            numpy.ndarray: Probabilidades float64 (pueden ser 0 por desbordamiento inferior; para
+            valores muy pequeños usar log_walk_probability).
+    """
+    return np.exp(log_walk_probability(steps, source, destination, dim))
+
+
+def exact_walk_probability(steps, source, destination, dim):
+    """
+        Calcula la probabilidad de las fórmulas calculate_*_probability con aritmética entera exacta.
+
+        Args:
+            steps (int): Número de pasos.
+            source (int | tuple): Posición inicial.
+            destination (int | tuple): Posición objetivo.
+            dim (int): Dimensión de la caminata (1, 2 o 3).
+
+        Returns:
+            Fraction: Probabilidad exacta.
+    """
+    from fractions import Fraction
+    distance = int(walk_distances(source, destination, dim))
+    if distance > steps or (steps - distance) % 2 != 0:
+        return Fraction(0)
+    # q = 1 / (2 * dim) y 1 - q = (2 * dim - 1) / (2 * dim)
+    return Fraction(math.comb(steps, distance) * (2 * dim - 1) ** (steps - distance), (2 * dim) ** steps)
+
+
+def decimal_walk_probability(steps, source, destination, dim):
+    """
+        Calcula la probabilidad como Decimal, el formato que devuelven calculate_*_probability.
+
+        Hasta EXACT_DECIMAL_STEPS pasos se usa la fracción exacta; por encima se parte del logaritmo,
+        con error relativo del orden de |log p| * 1e-16, evitando enteros y potencias Decimal enormes.
+
+        Args:
+            steps (int): Número de pasos.
+            source (int | tuple): Posición inicial.
+            destination (int | tuple): Posición objetivo.
+            dim (int): Dimensión de la caminata (1, 2 o 3).
+
+        Returns:
+            Decimal | int: Probabilidad, o 0 si el destino no es alcanzable en ese número de pasos.
+    """
+    from decimal import Decimal
+    if steps <= EXACT_DECIMAL_STEPS:
+        exact = exact_walk_probability(steps, source, destination, dim)
+        if exact == 0:
+            return 0
+        return Decimal(exact.numerator) / Decimal(exact.denominator)
+    log_value = float(log_walk_probability(steps, source, destination, dim))
+    if log_value == -np.inf:
+        return 0
+    return Decimal(log_value).exp()
+
+
+def lattice_distribution(steps, dim, method="auto"):
+    """
+        Calcula la distribución exacta de la posición de la caminata simple tras un número de pasos.
+
+        La malla cubre los desplazamientos de -steps a steps en cada eje, con el origen en el índice
+        steps. El método "direct" aplica la plantilla de un paso (1 / (2 * dim) hacia cada vecino)
+        steps veces; el método "fft" eleva su transformada, (1 / dim) * sum(cos(2 * pi * k_i / L)),
+        a la potencia steps en una sola operación. Con "auto" se usa la convolución directa mientras
+        el trabajo no supere LATTICE_DIRECT_WORK. La malla ocupa (2 * steps + 1) ** dim flotantes.
+
+        Args:
+            steps (int): Número de pasos.
+            dim (int): Dimensión de la caminata (1, 2 o 3).
+            method (str): "auto", "direct" o "fft".
+
+        Returns:
+            numpy.ndarray: Probabilidades float64 de forma (2 * steps + 1,) * dim.
+    """
+    if method not in ("auto", "direct", "fft"):
+        raise ValueError(f"Método desconocido: {method}")
+    size = 2 * steps + 1
+    if method == "auto":
+        method = "direct" if steps * size ** dim <= LATTICE_DIRECT_WORK else "fft"
+
+    if method == "direct":
+        grid = np.zeros(shape=(size,) * dim)
+        grid[(steps,) * dim] = 1.0
+        weight = 1 / (2 * dim)
+        for _ in range(steps):
+            following = np.zeros_like(grid)
+            for axis in range(dim):
+                forward = [slice(None)] * dim
+                backward = [slice(None)] * dim
+                forward[axis] = slice(1, None)
+                backward[axis] = slice(None, -1)
+                following[tuple(forward)] += grid[tuple(backward)]
+                following[tuple(backward)] += grid[tuple(forward)]
+            grid = following * weight
+        return grid
+
+    # La caminata no se aleja más de steps sitios, así que la convolución circular no se solapa
+    frequencies = np.meshgrid(*([np.fft.fftfreq(size)] * (dim - 1) + [np.fft.rfftfreq(size)]), indexing="ij")
+    transfer = sum(np.cos(2 * np.pi * frequency) for frequency in frequencies) / dim
+    grid = np.fft.irfftn(transfer ** steps, s=(size,) * dim, axes=tuple(range(dim)))
+    grid = np.fft.fftshift(grid)
+    # Se eliminan el ruido de redondeo negativo y los sitios de paridad inalcanzable
+    parity = sum(np.indices(grid.shape)) % 2 != (steps * dim + steps) % 2
+    grid[parity] = 0.0
+    return np.clip(grid, 0.0, None)
+
+
+def lattice_probability(distribution, source, destination, dim):
+    """
+        Consulta de forma vectorizada una malla de lattice_distribution.
+
+        Args:
+            distribution (numpy.ndarray): Malla calculada por lattice_distribution.
+            source (int | tuple | numpy.ndarray): Posición inicial, como en walk_distances.
+            destination (int | tuple | numpy.ndarray): Posición(es) objetivo, como en walk_distances.
+            dim (int): Dimensión de la caminata (1, 2 o 3).
+
+        Returns:
+            numpy.ndarray: Probabilidad de cada destino (0 fuera de la malla).
+    """
+    steps = (distribution.shape[0] - 1) // 2
+    displacement = np.asarray(destination, dtype=np.int64) - np.asarray(source, dtype=np.int64)
+    if dim == 1:
+        displacement = displacement[..., np.newaxis]
+    inside = np.all(np.abs(displacement) <= steps, axis=-1)
+    index = np.where(inside[..., np.newaxis], displacement + steps, 0)
+    return np.where(inside, distribution[tuple(np.moveaxis(index, -1, 0))], 0.0)
+
+
+def lattice_histogram(endpoints, steps, source):
+    """
+        Construye la distribución empírica de posiciones finales sobre la malla de lattice_distribution.
+
+        Args:
+            endpoints (numpy.ndarray): Posiciones finales de forma (caminantes, dim), por ejemplo las de
+                ensemble.simulate_ensemble.
+            steps (int): Número de pasos de cada caminata.
+            source (tuple): Posición inicial común.
+
+        Returns:
+            numpy.ndarray: Frecuencias relativas de forma (2 * steps + 1,) * dim.
+    """
+    endpoints = np.asarray(endpoints, dtype=np.int64)
+    dim = endpoints.shape[1]
+    size = 2 * steps + 1
+    index = endpoints - np.asarray(source, dtype=np.int64) + steps
+    flat = np.ravel_multi_index(tuple(index.T), (size,) * dim)
+    counts = np.bincount(flat, minlength=size ** dim).reshape((size,) * dim)
+    return counts / max(len(endpoints), 1)
@@ -0,0 +1,189 @@
+import functools
+import json
+import threading
+import time
+from contextlib import contextmanager
+
+
+class StageRecord:
+    def __init__(self, name):
+        """
+        Constructor de la clase StageRecord: mediciones acumuladas de una etapa.
+
+        Args:
+            name (str): Nombre de la etapa.
+        """
+        self.name = name
+        self.calls = 0
+        self.seconds = 0.0
+        self.max_seconds = 0.0
+        self.steps = 0  # Pasos (o elementos) procesados, para calcular el rendimiento
+        self.nbytes = 0  # Bytes de los arreglos producidos por la etapa
+
+    def to_dict(self):
+        """
+        Returns:
+            dict: Mediciones de la etapa, incluyendo pasos por segundo.
+        """
+        return {
+            "calls": self.calls,
+            "seconds": self.seconds,
+            "max_seconds": self.max_seconds,
+            "steps": self.steps,
+            "bytes": self.nbytes,
+            "steps_per_second": self.steps / self.seconds if self.steps and self.seconds > 0 else None,
+        }
+
+
+class Span:
+    def __init__(self):
+        """
+        Constructor de la clase Span: medición en curso que recibe el bloque instrumentado.
+        """
+        self.steps = 0
+        self.nbytes = 0
+
+    def add(self, steps=0, nbytes=0):
+        """
+        Suma pasos procesados y bytes producidos a la medición.
+
+        Args:
+            steps (int): Pasos (o elementos) procesados.
+            nbytes (int): Bytes de los arreglos producidos (por ejemplo array.nbytes).
+        """
+        self.steps += steps
+        self.nbytes += nbytes
+
+
+class Profiler:
+    def __init__(self, enabled=True):
+        """
+        Constructor de la clase Profiler: tiempos, pasos y bytes producidos por etapa del proceso. Los
+        bytes se toman de los arreglos que declara cada etapa (nbytes) y no de tracemalloc, que es
+        global al proceso y no separa los hilos; el pico de memoria se mide aparte con benchmark.py.
+
+        Args:
+            enabled (bool): Si es False las mediciones no se registran.
+        """
+        self.enabled = enabled
+        self.records = {}
+        self.lock = threading.Lock()
+
+    @contextmanager
+    def span(self, name, steps=0, nbytes=0):
+        """
+        Mide el bloque de código de una etapa.
+
+        Args:
+            name (str): Nombre de la etapa.
+            steps (int): Pasos procesados; también pueden sumarse con Span.add dentro del bloque.
+            nbytes (int): Bytes de los arreglos producidos; también pueden sumarse con Span.add.
+
+        Yields:
+            Span: Medición en curso.
+        """
+        current = Span()
+        current.add(steps, nbytes)
+        if not self.enabled:
+            yield current
+            return
+        start = time.perf_counter()
+        try:
+            yield current
+        finally:
+            seconds = time.perf_counter() - start
+            self._record(name, seconds, current.steps, current.nbytes)
+
+    def profiled(self, name=None):
+        """
+        Decorador que mide cada llamada a una función como una etapa.
+
+        Args:
+            name (str): Nombre de la etapa (por defecto el de la función).
+
+        Returns:
+            callable: Decorador.
+        """
+        def decorator(function):
+            stage = name or function.__name__
+
+            @functools.wraps(function)
+            def wrapper(*args, **kwargs):
+                with self.span(stage):
+                    return function(*args, **kwargs)
+            return wrapper
+        return decorator
+
+    def _record(self, name, seconds, steps, nbytes):
+        with self.lock:
+            record = self.records.get(name)
+            if record is None:
+                record = self.records[name] = StageRecord(name)
+            record.calls += 1
+            record.seconds += seconds
+            record.max_seconds = max(record.max_seconds, seconds)
+            record.steps += steps
+            record.nbytes += nbytes
+
+    def report(self):
+        """
+        Returns:
+            dict: Mediciones de cada etapa, ordenadas por tiempo total descendente.
+        """
+        with self.lock:
+            records = sorted(self.records.values(), key=lambda record: record.seconds, reverse=True)
+            return {record.name: record.to_dict() for record in records}
+
+    def to_json(self, path=None):
+        """
+        Exporta las mediciones como JSON.
+
+        Args:
+            path (str): Archivo de destino (None para solo devolver el texto).
+
+        Returns:
+            str: Mediciones en formato JSON.
+        """
+        text = json.dumps(self.report(), indent=2)
+        if path is not None:
+            with open(path, "w") as file:
+                file.write(text)
+        return text
+
+    def summary(self, limit=None):
+        """
+        Resume las mediciones en texto, una etapa por línea.
+
+        Las etapas pueden anidarse (por ejemplo rng dentro de first_passage), así que los porcentajes
+        son relativos a la etapa más larga y no suman 100.
+
+        Args:
+            limit (int): Número máximo de etapas (None para todas).
+
+        Returns:
+            str: Resumen por etapa.
+        """
+        report = self.report()
+        longest = max((stage["seconds"] for stage in report.values()), default=0.0)
+        lines = []
+        for name, stage in list(report.items())[:limit]:
+            share = 100 * stage["seconds"] / longest if longest > 0 else 0.0
+            line = f"{name}: {stage['seconds']:.3f} s ({share:.0f}%), {stage['calls']} llamadas"
+            if stage["steps_per_second"] is not None:
+                line += f", {stage['steps_per_second'] / 1e6:.1f} M pasos/s"
+            if stage["bytes"]:
+                line += f", {stage['bytes'] / 2 ** 20:.1f} MiB"
+            lines.append(line)
+        return "\n".join(lines)
+
+    def reset(self):
+        """
+        Borra todas las mediciones.
+        """
+        with self.lock:
+            self.records.clear()
+
+
+default_profiler = Profiler()  # Perfilador compartido por el motor y la interfaz gráfica
+span = default_profiler.span
+profiled = default_profiler.profiled
@@ -1,3 +1,12 @@
+import threading
+from contextlib import nullcontext
+from functools import lru_cache
+from math import gcd
+import numpy as np
+
+SPAWN_STRIDE = 2 ** 24  # Números reservados para cada subsecuencia derivada con spawn
+
+
 class CongruencialLineal:
     def __init__(self, a, c, m, seed):
         """
@@ -32,3 +41,246 @@ class CongruencialLineal:
             float: Número pseudoaleatorio.
         """
         return self.generate_xn() / (self.m - 1)
+
+    def generate_xn_block(self, n):
+        """
+        Genera los próximos n valores de la secuencia congruencial de forma vectorizada.
+
+        Args:
+            n (int): Cantidad de valores a generar.
+
+        Returns:
+            numpy.ndarray: Los mismos valores que devolverían n llamadas a generate_xn.
+        """
+        states = lcg_states(self.a, self.c, self.m, self.xn % self.m, n)
+        if n > 0:
+            self.xn = int(states[-1])
+        return states
+
+    def generate_block(self, n):
+        """
+        Genera los próximos n números pseudoaleatorios de forma vectorizada.
+
+        Args:
+            n (int): Cantidad de números a generar.
+
+        Returns:
+            numpy.ndarray: Los mismos números (float64) que devolverían n llamadas a generate_number.
+        """
+        return states_to_numbers(self.generate_xn_block(n), self.m)
+
+    def jump(self, k):
+        """
+        Avanza el estado del generador k pasos en tiempo O(log k).
+
+        Args:
+            k (int): Cantidad de pasos a saltar (k >= 0).
+
+        Returns:
+            int: Nuevo estado del generador.
+        """
+        if k < 0:
+            raise ValueError("El salto debe ser un entero no negativo")
+        jump_a, jump_c = affine_power(self.a, self.c, self.m, k)
+        self.xn = (jump_a * self.xn + jump_c) % self.m
+        return self.xn
+
+
+class RandomStream(CongruencialLineal):
+    def __init__(self, a, c, m, seed):
+        """
+        Constructor de la clase RandomStream: un generador congruencial con su propio estado y
+        cerrojo, que puede compartirse entre hilos y derivar subsecuencias disjuntas por índice.
+
+        Args:
+            a (int): Factor multiplicativo.
+            c (int): Término aditivo.
+            m (int): Módulo.
+            seed (int): Semilla inicial.
+        """
+        super().__init__(a, c, m, seed)
+        self.seed = seed
+        self.lock = threading.RLock()
+
+    def generate_xn(self):
+        with self.lock:
+            return super().generate_xn()
+
+    def generate_xn_block(self, n):
+        with self.lock:
+            return super().generate_xn_block(n)
+
+    def jump(self, k):
+        with self.lock:
+            return super().jump(k)
+
+    def spawn(self, index, stride=SPAWN_STRIDE):
+        """
+        Deriva una subsecuencia saltando index * stride pasos desde la semilla de este flujo.
+
+        El mismo índice produce siempre la misma subsecuencia, sin importar el estado actual del flujo
+        ni el orden en que se deriven. Las subsecuencias de índices distintos son tramos disjuntos del
+        ciclo (lcg_period) mientras cada una consuma a lo sumo stride números.
+
+        Args:
+            index (int): Índice no negativo de la subsecuencia.
+            stride (int): Números reservados para cada subsecuencia.
+
+        Returns:
+            RandomStream: Nuevo flujo con los mismos parámetros.
+        """
+        if index < 0 or stride < 1:
+            raise ValueError("El índice debe ser no negativo y el tramo positivo")
+        if (index + 1) * stride > lcg_period(self.a, self.c, self.m, self.seed % self.m):
+            raise ValueError("La subsecuencia excede el periodo del generador y se solaparía con otras")
+        jump_a, jump_c = affine_power(self.a, self.c, self.m, index * stride)
+        return RandomStream(self.a, self.c, self.m, (jump_a * self.seed + jump_c) % self.m)
+
+
+def generator_lock(generator):
+    """
+    Devuelve el cerrojo que protege el estado de un generador.
+
+    Args:
+        generator (CongruencialLineal): Generador a proteger.
+
+    Returns:
+        Un cerrojo si el generador es un RandomStream, o un contexto vacío en otro caso.
+    """
+    return generator.lock if isinstance(generator, RandomStream) else nullcontext()
+
+
+def affine_power(a, c, m, k):
+    """
+    Calcula los coeficientes de aplicar k veces la recurrencia x -> (a * x + c) mod m.
+
+    Args:
+        a (int): Factor multiplicativo.
+        c (int): Término aditivo.
+        m (int): Módulo.
+        k (int): Cantidad de aplicaciones.
+
+    Returns:
+        tuple: Par (A, C) tal que x_k = (A * x_0 + C) mod m.
+    """
+    result_a, result_c = 1 % m, 0
+    base_a, base_c = a % m, c % m
+    while k > 0:
+        if k & 1:
+            result_a, result_c = (base_a * result_a) % m, (base_a * result_c + base_c) % m
+        base_a, base_c = (base_a * base_a) % m, (base_a * base_c + base_c) % m
+        k >>= 1
+    return result_a, result_c
+
+
+def _prime_factors(n):
+    factors = set()
+    p = 2
+    while p * p <= n:
+        while n % p == 0:
+            factors.add(p)
+            n //= p
+        p += 1
+    if n > 1:
+        factors.add(n)
+    return factors
+
+
+@lru_cache(maxsize=256)
+def lcg_period(a, c, m, seed):
+    """
+    Calcula la longitud del ciclo que recorre la secuencia a partir de una semilla.
+
+    Solo es m cuando se cumple Hull-Dobell; con los parámetros de random_walk (a % 4 == 3) es m / 2.
+    La longitud divide al orden del grupo afín módulo m, m * phi(m), así que se obtiene quitando
+    factores primos mientras el salto correspondiente siga devolviendo la semilla.
+
+    Args:
+        a (int): Factor multiplicativo, coprimo con m.
+        c (int): Término aditivo.
+        m (int): Módulo.
+        seed (int): Estado inicial.
+
+    Returns:
+        int: Menor k > 0 tal que el estado vuelve a seed tras k pasos.
+    """
+    if gcd(a, m) != 1:
+        raise ValueError("El factor multiplicativo debe ser coprimo con el módulo")
+    seed %= m
+    phi = m
+    factors = _prime_factors(m)
+    for p in factors:
+        phi = phi // p * (p - 1)
+    period = m * phi
+    for p in factors | _prime_factors(phi):
+        while period % p == 0:
+            jump_a, jump_c = affine_power(a, c, m, period // p)
+            if (jump_a * seed + jump_c) % m != seed:
+                break
+            period //= p
+    return period
+
+
+def check_period(generator, n):
+    """
+    Comprueba que n números consecutivos del generador no den la vuelta a su ciclo.
+
+    Args:
+        generator (CongruencialLineal): Generador a partir de su estado actual.
+        n (int): Cantidad de números que se reservan.
+
+    Raises:
+        ValueError: Si n supera la longitud del ciclo y los números se repetirían.
+    """
+    if n > lcg_period(generator.a, generator.c, generator.m, generator.xn % generator.m):
+        raise ValueError("El conjunto excede el periodo del generador y las subsecuencias se solaparían")
+
+
+def lcg_states(a, c, m, starts, n):
+    """
+    Calcula los n estados siguientes de la recurrencia para uno o varios estados iniciales.
+
+    El bloque se llena duplicando: conocidos los primeros L estados, los L siguientes se
+    obtienen aplicando el salto de L pasos, por lo que basta con O(log n) operaciones vectorizadas.
+
+    Args:
+        a (int): Factor multiplicativo.
+        c (int): Término aditivo.
+        m (int): Módulo.
+        starts (int | numpy.ndarray): Estado(s) inicial(es), ya reducidos módulo m.
+        n (int): Cantidad de estados a generar por cada estado inicial.
+
+    Returns:
+        numpy.ndarray: Arreglo de forma starts.shape + (n,) con los estados x_1, ..., x_n.
+    """
+    # Con m <= 2**32 los productos caben en uint64; si no, se usan enteros de Python
+    dtype = np.uint64 if m <= 2 ** 32 else object
+    starts = np.asarray(starts).astype(dtype)
+    states = np.empty(starts.shape + (n,), dtype=dtype)
+    if n == 0:
+        return states
+    states[..., 0] = (starts * (a % m) + (c % m)) % m
+    filled = 1
+    while filled < n:
+        count = min(filled, n - filled)
+        jump_a, jump_c = affine_power(a, c, m, filled)
+        states[..., filled:filled + count] = (states[..., :count] * jump_a + jump_c) % m
+        filled += count
+    return states
+
+
+def states_to_numbers(states, m):
+    """
+    Convierte estados de la secuencia en números pseudoaleatorios igual que generate_number.
+
+    Args:
+        states (numpy.ndarray): Estados generados por lcg_states.
+        m (int): Módulo.
+
+    Returns:
+        numpy.ndarray: Números pseudoaleatorios float64.
+    """
+    if states.dtype == object:
+        # Para módulos grandes se usa la división entera de Python para conservar el redondeo exacto
+        return (states / (m - 1)).astype(np.float64)
+    return states.astype(np.float64) / (m - 1)
@@ -1,7 +1,8 @@
+import itertools
+import threading
 import numpy as np
-from decimal import Decimal
-from scipy.special import comb
-from random_generator import CongruencialLineal
+from profiling import span
+from random_generator import CongruencialLineal, RandomStream, generator_lock
 
 # Configuración de parámetros para el generador congruencial lineal
 seed = 42  # Semilla inicial
@@ -10,24 +11,146 @@ c = 11  # Constante c
 g = 30  # Constante g (Periodo 1073741823)
 a = 1 + 2 * k  # Constante a
 m = 2 ** g  # Módulo
-next_step_generator = CongruencialLineal(a, c, m, seed)  # Generador para el próximo paso
+next_step_generator = RandomStream(a, c, m, seed)  # Generador para el próximo paso
+_seed_lock = threading.Lock()  # Protege la semilla global entre hilos
+
+# Desplazamientos por dimensión, en el orden de los intervalos de ri: con k desplazamientos un
+# movimiento ri elige el i-ésimo si (i - 1) / k < ri <= i / k (ver StepTable)
+MOVE_DELTAS = {
+    1: np.array([[-1], [1]], dtype=np.int8),
+    2: np.array([[1, 0], [-1, 0], [0, 1], [0, -1]], dtype=np.int8),
+    3: np.array([[1, 0, 0], [-1, 0, 0], [0, 1, 0], [0, -1, 0], [0, 0, 1], [0, 0, -1]], dtype=np.int8),
+}
+MAX_STEP_CODES = 127  # Máximo de desplazamientos de una tabla, para que los códigos quepan en int8
+FIRST_PASSAGE_MIN_CHUNK = 1024  # Tamaño del primer bloque de movimientos en first_passage
+FIRST_PASSAGE_MAX_CHUNK = 2 ** 20  # Tamaño máximo de bloque en first_passage
+USE_JIT = False  # Usar los núcleos compilados de jit_kernels si numba está instalado (compila al primer uso)
+
+
+class StepTable:
+    def __init__(self, deltas, probabilities=None):
+        """
+        Constructor de la clase StepTable: distribución de los pasos de una caminata en cualquier
+        dimensión, dada por los desplazamientos posibles y sus probabilidades.
+
+        Un movimiento ri se convierte en el código i si thresholds[i - 1] < ri <= thresholds[i],
+        donde thresholds son las probabilidades acumuladas; con pasos equiprobables los umbrales son
+        i / k. Los desplazamientos de peso nulo se descartan: su intervalo sería vacío salvo en el
+        borde, y ri = 0 elegiría el primero aunque su probabilidad sea 0.
+
+        Args:
+            deltas: Desplazamientos posibles, de forma (k, dim), con 1 <= k <= MAX_STEP_CODES.
+            probabilities: Probabilidad o peso de cada desplazamiento (None para pasos equiprobables).
+        """
+        deltas = np.array(deltas, dtype=np.int64)
+        if deltas.ndim == 1:
+            deltas = deltas[:, np.newaxis]
+        if deltas.ndim != 2 or not 1 <= len(deltas) <= MAX_STEP_CODES or deltas.shape[1] == 0:
+            raise ValueError(f"La tabla debe tener entre 1 y {MAX_STEP_CODES} desplazamientos de forma (k, dim)")
+        count = len(deltas)
+        if probabilities is None:
+            self.probabilities = np.full(shape=count, fill_value=1 / count)
+            self.thresholds = np.arange(1, count) / count
+        else:
+            weights = np.asarray(probabilities, dtype=np.float64)
+            if weights.shape != (count,) or np.any(weights < 0) or not weights.sum() > 0:
+                raise ValueError("Se necesita un peso no negativo por desplazamiento, con suma positiva")
+            deltas, weights = deltas[weights > 0], weights[weights > 0]
+            self.probabilities = weights / weights.sum()
+            self.thresholds = np.cumsum(weights)[:-1] / weights.sum()
+        self.deltas = deltas.astype(np.int8) if np.abs(deltas).max() <= np.iinfo(np.int8).max else deltas
+        self.dim = deltas.shape[1]
+
+    @classmethod
+    def lattice(cls, dim, probabilities=None):
+        """
+        Crea la tabla de pasos a los vecinos más cercanos, en el orden +x, -x, +y, -y, ... (en 1D
+        el orden es -1, +1, como en random_walk_1d).
+
+        Args:
+            dim (int): Dimensión de la caminata.
+            probabilities: Peso de cada dirección en ese orden (None para pasos equiprobables).
+
+        Returns:
+            StepTable: Tabla de 2 * dim desplazamientos.
+        """
+        if dim == 1:
+            deltas = [[-1], [1]]
+        else:
+            deltas = np.zeros(shape=(2 * dim, dim), dtype=np.int64)
+            for axis in range(dim):
+                deltas[2 * axis, axis] = 1
+                deltas[2 * axis + 1, axis] = -1
+        return cls(deltas, probabilities)
+
+    @classmethod
+    def moore(cls, dim, probabilities=None):
+        """
+        Crea la tabla de pasos a los 3 ** dim - 1 vecinos, incluyendo las diagonales.
+
+        Args:
+            dim (int): Dimensión de la caminata (a lo sumo 4, por el límite de códigos).
+            probabilities: Peso de cada desplazamiento, en el orden de itertools.product.
+
+        Returns:
+            StepTable: Tabla de desplazamientos en {-1, 0, 1} ** dim sin el nulo.
+        """
+        deltas = [delta for delta in itertools.product((-1, 0, 1), repeat=dim) if any(delta)]
+        return cls(deltas, probabilities)
+
+    def codes(self, moves):
+        """
+        Convierte movimientos en códigos de desplazamiento con numpy.searchsorted sobre el bloque.
+
+        Args:
+            moves (numpy.ndarray): Movimientos generados en [0, 1].
+
+        Returns:
+            numpy.ndarray: Códigos int8, índices de fila en deltas.
+        """
+        return np.searchsorted(self.thresholds, moves, side='left').astype(np.int8)
 
 
-def generate_moves(steps):
+_lattice_tables = {}  # Tablas de vecinos más cercanos ya creadas, por dimensión
+
+
+def step_table(dim):
     """
-        Genera una lista de números pseudoaleatorios utilizando el generador congruencial lineal.
+        Devuelve la tabla de pasos de una caminata.
+
+        Args:
+            dim (int | StepTable): Dimensión (vecinos más cercanos equiprobables) o una tabla.
+
+        Returns:
+            StepTable: La tabla recibida, o la de vecinos más cercanos de esa dimensión.
+    """
+    if isinstance(dim, StepTable):
+        return dim
+    table = _lattice_tables.get(dim)
+    if table is None:
+        # En 1, 2 y 3 dimensiones se usan exactamente MOVE_DELTAS y sus umbrales i / k
+        table = StepTable(MOVE_DELTAS[dim]) if dim in MOVE_DELTAS else StepTable.lattice(dim)
+        _lattice_tables[dim] = table
+    return table
+
+
+def generate_moves(steps, stream=None):
+    """
+        Genera un arreglo de números pseudoaleatorios utilizando el generador congruencial lineal.
 
         Args:
             steps (int): Número de pasos a generar.
+            stream (RandomStream): Flujo del que se toman los números. Si es None se usa un generador
+                nuevo con la semilla global, que luego se cambia.
 
         Returns:
-            list: Lista de números pseudoaleatorios.
+            numpy.ndarray: Arreglo de números pseudoaleatorios.
     """
-    global seed, a, c, m
-    generator = CongruencialLineal(a, c, m, seed)
-    ri_values = [generator.generate_number() for _ in range(steps)]
-    change_seed()
-    return ri_values
+    generator = stream if stream is not None else legacy_generator()
+    with span("rng", steps) as stage:
+        moves = generator.generate_block(steps)
+        stage.add(nbytes=moves.nbytes)
+    return moves
 
 
 def change_seed():
@@ -35,7 +158,187 @@ def change_seed():
         Cambia la semilla global aumentándola en 10.
     """
     global seed
-    seed += 10
+    with _seed_lock:
+        seed += 10
+
+
+def legacy_generator():
+    """
+        Crea un generador con la semilla global y la cambia, como hacía generate_moves originalmente.
+
+        Returns:
+            CongruencialLineal: Generador con la semilla global previa al cambio.
+    """
+    global seed
+    with _seed_lock:
+        generator = CongruencialLineal(a, c, m, seed)
+        seed += 10
+    return generator
+
+
+def create_stream(stream_seed):
+    """
+        Crea un flujo de números independiente del estado global con los parámetros del módulo.
+
+        Args:
+            stream_seed (int): Semilla del flujo.
+
+        Returns:
+            RandomStream: Flujo que pueden recibir las funciones de caminata.
+    """
+    return RandomStream(a, c, m, stream_seed)
+
+
+def moves_to_codes(moves, dim):
+    """
+        Convierte un arreglo de movimientos en códigos de dirección usando la tabla de umbrales.
+
+        Args:
+            moves (numpy.ndarray): Movimientos generados en [0, 1].
+            dim (int | StepTable): Dimensión de la caminata o tabla de pasos.
+
+        Returns:
+            numpy.ndarray: Códigos int8, índices de fila en step_table(dim).deltas.
+    """
+    with span("move_mapping", len(moves)) as stage:
+        codes = step_table(dim).codes(moves)
+        stage.add(nbytes=codes.nbytes)
+    return codes
+
+
+def codes_to_positions(codes, dim, source):
+    """
+        Acumula los desplazamientos de un arreglo de códigos de dirección.
+
+        Args:
+            codes (numpy.ndarray): Códigos de dirección generados por moves_to_codes.
+            dim (int | StepTable): Dimensión de la caminata o tabla de pasos.
+            source (tuple): Posición inicial con dim coordenadas.
+
+        Returns:
+            numpy.ndarray: Posiciones int64 de forma (len(codes) + 1, dim), incluyendo el origen.
+    """
+    table = step_table(dim)
+    with span("path_accumulation", len(codes)) as stage:
+        positions = np.empty(shape=(len(codes) + 1, table.dim), dtype=np.int64)
+        stage.add(nbytes=positions.nbytes)
+        positions[0] = source
+        np.cumsum(table.deltas[codes], axis=0, dtype=np.int64, out=positions[1:])
+        positions[1:] += positions[0]
+        return positions
+
+
+def walk_positions(steps, dim, source, stream=None):
+    """
+        Realiza una caminata aleatoria vectorizada con los movimientos de generate_moves.
+
+        Args:
+            steps (int): Número de pasos en la caminata.
+            dim (int | StepTable): Dimensión de la caminata o tabla de pasos.
+            source (tuple): Posición inicial con dim coordenadas.
+            stream (RandomStream): Flujo de movimientos (None para usar la semilla global).
+
+        Returns:
+            numpy.ndarray: Posiciones int64 de forma (steps + 1, dim).
+    """
+    moves = generate_moves(steps, stream)
+    return codes_to_positions(moves_to_codes(moves, dim), dim, source)
+
+
+def first_passage(dim, source, target_position, generator=None, max_steps=None, stop_event=None,
+                  return_path=True, compact=False, progress=None):
+    """
+        Busca el primer paso en que una caminata aleatoria alcanza una posición objetivo.
+
+        Los movimientos se generan en bloques vectorizados de tamaño creciente y el primer acierto
+        de cada bloque se localiza con operaciones sobre arreglos; con USE_JIT y numba instalado se
+        usa en su lugar el bucle compilado de jit_kernels, con el mismo resultado. El generador queda
+        en el mismo estado que si se hubieran consumido los movimientos uno a uno.
+
+        El cerrojo del generador se mantiene durante toda la búsqueda, así que las búsquedas que
+        comparten un RandomStream (por ejemplo next_step_generator) se ejecutan una tras otra; sin
+        max_steps solo stop_event libera el generador antes de llegar. Las tareas concurrentes deben
+        recibir cada una su propio flujo (create_stream o RandomStream.spawn).
+
+        Args:
+            dim (int | StepTable): Dimensión de la caminata o tabla de pasos.
+            source (tuple): Posición inicial con dim coordenadas.
+            target_position (tuple): Posición objetivo con dim coordenadas.
+            generator (CongruencialLineal): Generador de movimientos (por defecto next_step_generator).
+            max_steps (int): Número máximo de pasos a simular (None para no limitar).
+            stop_event (threading.Event): Evento de cancelación, se revisa entre bloques.
+            return_path (bool): Si es False solo se conserva la posición actual y no la trayectoria.
+            compact (bool): Si es True la trayectoria se devuelve como walk_path.WalkPath.
+            progress (callable): Función que recibe las posiciones int64 de forma (n, dim) de cada
+                bloque recorrido, por ejemplo para mostrar el avance (None para omitirla).
+
+        Returns:
+            tuple: (pasos, posiciones) donde pasos es el tiempo de llegada o None si la búsqueda se
+            truncó por max_steps o stop_event, y posiciones es un arreglo int64 de forma (n + 1, dim)
+            con la trayectoria recorrida, un WalkPath si compact es True, o None si return_path es False.
+    """
+    if generator is None:
+        generator = next_step_generator
+    search = _first_passage
+    if USE_JIT:
+        import jit_kernels
+        if jit_kernels.jit_supported(generator):
+            search = jit_kernels.first_passage_codes
+    with generator_lock(generator), span("first_passage") as stage:
+        hitting_time, codes = search(dim, source, target_position, generator, max_steps, stop_event, return_path,
+                                     progress, stage)
+    if not return_path:
+        return hitting_time, None
+    if compact:
+        from walk_path import WalkPath
+        return hitting_time, WalkPath(codes, dim, source)
+    return hitting_time, codes_to_positions(codes, dim, source)
+
+
+def _first_passage(dim, source, target_position, generator, max_steps, stop_event, return_path, progress=None,
+                   stage=None):
+    width = step_table(dim).dim
+    position = np.array(source, dtype=np.int64).reshape(width)
+    target = np.array(target_position, dtype=np.int64).reshape(width)
+    # Durante la búsqueda la trayectoria se guarda como códigos int8
+    chunks = [np.empty(shape=0, dtype=np.int8)] if return_path else None
+    hitting_time = 0 if np.array_equal(position, target) else None
+    steps_done = 0
+    chunk_size = FIRST_PASSAGE_MIN_CHUNK
+
+    while hitting_time is None:
+        if max_steps is not None and steps_done >= max_steps:
+            break
+        if stop_event is not None and stop_event.is_set():
+            break
+        size = chunk_size if max_steps is None else min(chunk_size, max_steps - steps_done)
+        start_state = generator.xn
+        with span("rng", size) as rng:
+            moves = generator.generate_block(size)
+            rng.add(nbytes=moves.nbytes)
+        codes = moves_to_codes(moves, dim)
+        positions = codes_to_positions(codes, dim, position)[1:]
+        with span("hit_search", size):
+            hits = np.flatnonzero(np.all(positions == target, axis=1))
+        if len(hits) > 0:
+            used = int(hits[0]) + 1
+            codes = codes[:used]
+            positions = positions[:used]
+            # Se devuelven al generador los movimientos no consumidos
+            generator.xn = start_state
+            generator.jump(used)
+            hitting_time = steps_done + used
+        steps_done += len(positions)
+        if stage is not None:
+            stage.add(len(positions), codes.nbytes if return_path else 0)
+        position = positions[-1]
+        if return_path:
+            chunks.append(codes)
+        if progress is not None:
+            progress(positions)
+        chunk_size = min(chunk_size * 2, FIRST_PASSAGE_MAX_CHUNK)
+
+    return hitting_time, np.concatenate(chunks) if return_path else None
 
 
 def generate_next_move():
@@ -50,215 +353,192 @@ def generate_next_move():
     return ri_value
 
 
-def random_walk_1d(steps, source):
+def random_walk_1d(steps, source, stream=None):
     """
         Realiza una caminata aleatoria 1D.
 
         Args:
             steps (int): Número de pasos en la caminata.
             source (int): Posición inicial.
+            stream (RandomStream): Flujo de movimientos (None para usar la semilla global).
 
         Returns:
             numpy.ndarray: Posiciones en la caminata aleatoria.
     """
-    path = np.zeros(shape=steps + 1)
-    path[0] = source
-    step = source
-    moves = generate_moves(steps)
-    for i in range(0, steps):
-        step = process_1d(moves[i], step)
-        path[i + 1] = step
-    return path
+    positions = walk_positions(steps, 1, (source,), stream)
+    return positions[:, 0].astype(np.float64)
 
 
-def go_to_1d(source, target_position):
+def go_to_1d(source, target_position, max_steps=None, stop_event=None, stream=None, progress=None,
+             return_time=False):
     """
         Realiza una caminata aleatoria 1D desde una posición inicial hasta una posición objetivo.
 
         Args:
             source (int): Posición inicial.
             target_position (int): Posición objetivo.
+            max_steps (int): Número máximo de pasos (None para no limitar).
+            stop_event (threading.Event): Evento para cancelar la búsqueda.
+            stream (RandomStream): Flujo de movimientos (None para usar next_step_generator).
+            progress (callable): Recibe las posiciones de cada bloque recorrido (None para omitirla).
+            return_time (bool): Si es True se devuelve también el tiempo de llegada.
 
         Returns:
-            numpy.ndarray: Posiciones en la caminata aleatoria.
+            numpy.ndarray | tuple: Posiciones en la caminata aleatoria (truncadas si no se alcanzó el
+            objetivo), o (tiempo de llegada o None si la búsqueda se truncó, posiciones) con return_time.
     """
-    change_seed()
-    step = source
-    path = [source]
-    while step != target_position:
-        move = generate_next_move()
-        step = process_1d(move, step)
-        path.append(step)
-    return np.array(path)
+    if stream is None:
+        change_seed()
+    hitting_time, path = first_passage(1, (source,), (target_position,), stream, max_steps, stop_event,
+                                       progress=progress)
+    path = path[:, 0]
+    return (hitting_time, path) if return_time else path
 
 
-def process_1d(move, step):
+def random_walk_2d(steps, source, stream=None):
     """
-        Realiza un paso en la caminata aleatoria 1D.
+        Realiza una caminata aleatoria 2D.
 
         Args:
-            move (float): Movimiento generado.
-            step (int): Posición actual.
+            steps (int): Número de pasos en la caminata.
+            source (tuple): Posición inicial en forma de tupla (x, y).
+            stream (RandomStream): Flujo de movimientos (None para usar la semilla global).
 
         Returns:
-            int: Nueva posición después del paso.
+            numpy.ndarray: Posiciones en la caminata aleatoria en el eje x, y.
     """
-    if move > 0.5:
-        step += 1
-    else:
-        step -= 1
-    return step
+    positions = walk_positions(steps, 2, source, stream).astype(np.float64)
+    return positions[:, 0].copy(), positions[:, 1].copy()
 
 
-# noinspection DuplicatedCode
-def random_walk_2d(steps, source):
+def go_to_2d(source, target_position, max_steps=None, stop_event=None, stream=None, progress=None,
+             return_time=False):
     """
-        Realiza una caminata aleatoria 2D.
+        Realiza una caminata aleatoria 2D desde una posición inicial hasta una posición objetivo.
 
         Args:
-            steps (int): Número de pasos en la caminata.
             source (tuple): Posición inicial en forma de tupla (x, y).
+            target_position (tuple): Posición objetivo en forma de tupla (x, y).
+            max_steps (int): Número máximo de pasos (None para no limitar).
+            stop_event (threading.Event): Evento para cancelar la búsqueda.
+            stream (RandomStream): Flujo de movimientos (None para usar next_step_generator).
+            progress (callable): Recibe las posiciones de cada bloque recorrido (None para omitirla).
+            return_time (bool): Si es True se devuelve también el tiempo de llegada.
 
         Returns:
-            numpy.ndarray: Posiciones en la caminata aleatoria en el eje x, y.
+            tuple: Posiciones en la caminata aleatoria en el eje x, y, o (tiempo de llegada o None si la
+            búsqueda se truncó, posiciones) con return_time.
     """
-    x_positions = np.zeros(shape=steps + 1)
-    y_positions = np.zeros(shape=steps + 1)
-    moves = generate_moves(steps)
-    position = np.array(source)
-    x_positions[0] = position[0]
-    y_positions[0] = position[1]
-
-    for i in range(0, steps):
-        x_step, y_step = process_2d(moves[i])
-        position = position + [x_step, y_step]
-        x_positions[i + 1] = position[0]
-        y_positions[i + 1] = position[1]
+    if stream is None:
+        change_seed()
+    hitting_time, path = first_passage(2, source, target_position, stream, max_steps, stop_event, progress=progress)
+    path = path[:, 0].copy(), path[:, 1].copy()
+    return (hitting_time, path) if return_time else path
 
-    return x_positions, y_positions
 
-
-def process_2d(move):
+def random_walk_3d(steps, source, stream=None):
     """
-       Realiza un paso en la caminata aleatoria 2D.
+        Realiza una caminata aleatoria 3D.
 
-       Args:
-           move (float): Movimiento generado.
+        Args:
+            steps (int): Número de pasos en la caminata.
+            source (tuple): Posición inicial en forma de tupla (x, y, z).
+            stream (RandomStream): Flujo de movimientos (None para usar la semilla global).
 
-       Returns:
-           tuple: Par de desplazamientos en los ejes x, y.
+        Returns:
+            numpy.ndarray: Posiciones en la caminata aleatoria en los ejes x, y, z.
     """
-    x_step = 0
-    y_step = 0
-    if move <= 0.25:
-        x_step = 1
-    elif 0.25 < move <= 0.5:
-        x_step = -1
-    elif 0.5 < move <= 0.75:
-        y_step = 1
-    else:
-        y_step = -1
-    return x_step, y_step
+    positions = walk_positions(steps, 3, source, stream).astype(np.float64)
+    return positions[:, 0].copy(), positions[:, 1].copy(), positions[:, 2].copy()
 
 
-def go_to_2d(source, target_position):
+def go_to_3d(source, target_position, max_steps=None, stop_event=None, stream=None, progress=None,
+             return_time=False):
     """
-        Realiza una caminata aleatoria 2D desde una posición inicial hasta una posición objetivo.
+        Realiza una caminata aleatoria 3D desde una posición inicial hasta una posición objetivo.
 
         Args:
-            source (tuple): Posición inicial en forma de tupla (x, y).
-            target_position (tuple): Posición objetivo en forma de tupla (x, y).
+            source (tuple): Posición inicial en forma de tupla (x, y, z).
+            target_position (tuple): Posición objetivo en forma de tupla (x, y, z).
+            max_steps (int): Número máximo de pasos (None para no limitar).
+            stop_event (threading.Event): Evento para cancelar la búsqueda.
+            stream (RandomStream): Flujo de movimientos (None para usar next_step_generator).
+            progress (callable): Recibe las posiciones de cada bloque recorrido (None para omitirla).
+            return_time (bool): Si es True se devuelve también el tiempo de llegada.
 
         Returns:
-            numpy.ndarray: Posiciones en la caminata aleatoria en el eje x, y.
+            tuple: Posiciones en la caminata aleatoria en los ejes x, y, z, o (tiempo de llegada o None
+            si la búsqueda se truncó, posiciones) con return_time.
     """
-    change_seed()
-    x_positions = [source[0]]
-    y_positions = [source[1]]
-    position = np.array(source)
-    while position[0] != target_position[0] or position[1] != target_position[1]:
-        move = generate_next_move()
-        x_step, y_step = process_2d(move)
-        position = position + [x_step, y_step]
-        x_positions.append(position[0])
-        y_positions.append(position[1])
-    return np.array(x_positions), np.array(y_positions)
+    if stream is None:
+        change_seed()
+    hitting_time, path = first_passage(3, source, target_position, stream, max_steps, stop_event, progress=progress)
+    path = path[:, 0].copy(), path[:, 1].copy(), path[:, 2].copy()
+    return (hitting_time, path) if return_time else path
 
 
-def random_walk_3d(steps, source):
+def random_walk_nd(steps, source, table=None, stream=None):
     """
-        Realiza una caminata aleatoria 3D.
+        Realiza una caminata aleatoria en cualquier dimensión y con cualquier distribución de pasos.
 
         Args:
             steps (int): Número de pasos en la caminata.
-            source (tuple): Posición inicial en forma de tupla (x, y, z).
+            source (tuple): Posición inicial; su longitud es la dimensión.
+            table (StepTable): Tabla de pasos (None para vecinos más cercanos equiprobables).
+            stream (RandomStream): Flujo de movimientos (None para usar la semilla global).
 
         Returns:
-            numpy.ndarray: Posiciones en la caminata aleatoria en los ejes x, y, z.
+            numpy.ndarray: Posiciones int64 de forma (steps + 1, dim).
     """
-    x_positions = np.zeros(shape=steps + 1)
-    y_positions = np.zeros(shape=steps + 1)
-    z_positions = np.zeros(shape=steps + 1)
-    moves = generate_moves(steps)
-    position = np.array(source)
-    x_positions[0] = position[0]
-    y_positions[0] = position[1]
-    z_positions[0] = position[2]
-
-    for i in range(0, steps):
-        x_step, y_step, z_step = process_3d(moves[i])
-        position = position + [x_step, y_step, z_step]
-        x_positions[i + 1] = position[0]
-        y_positions[i + 1] = position[1]
-        z_positions[i + 1] = position[2]
-
-    return x_positions, y_positions, z_positions
-
-
-def process_3d(move):
-    x_step = 0
-    y_step = 0
-    z_step = 0
-    if move <= (1 / 6):
-        x_step = 1
-    elif (1 / 6) < move <= (2 / 6):
-        x_step = -1
-    elif (2 / 6) < move <= (3 / 6):
-        y_step = 1
-    elif (3 / 6) < move <= (4 / 6):
-        y_step = -1
-    elif (4 / 6) < move <= (5 / 6):
-        z_step = 1
-    else:
-        z_step = -1
-    return x_step, y_step, z_step
-
-
-def go_to_3d(source, target_position):
+    source = np.array(source, dtype=np.int64).reshape(-1)
+    table = step_table(len(source) if table is None else table)
+    return walk_positions(steps, table, source, stream)
+
+
+def go_to_nd(source, target_position, table=None, max_steps=None, stop_event=None, stream=None, progress=None,
+             return_time=False):
     """
-        Realiza una caminata aleatoria 3D desde una posición inicial hasta una posición objetivo.
+        Realiza una caminata aleatoria en cualquier dimensión hasta una posición objetivo.
 
         Args:
-            source (tuple): Posición inicial en forma de tupla (x, y, z).
-            target_position (tuple): Posición objetivo en forma de tupla (x, y, z).
+            source (tuple): Posición inicial; su longitud es la dimensión.
+            target_position (tuple): Posición objetivo.
+            table (StepTable): Tabla de pasos (None para vecinos más cercanos equiprobables).
+            max_steps (int): Número máximo de pasos (None para no limitar).
+            stop_event (threading.Event): Evento para cancelar la búsqueda.
+            stream (RandomStream): Flujo de movimientos (None para usar next_step_generator).
+            progress (callable): Recibe las posiciones de cada bloque recorrido (None para omitirla).
+            return_time (bool): Si es True se devuelve también el tiempo de llegada.
 
         Returns:
-            numpy.ndarray: Posiciones en la caminata aleatoria en los ejes x, y, z.
+            numpy.ndarray | tuple: Posiciones int64 de forma (n + 1, dim) (truncadas si no se alcanzó el
+            objetivo), o (tiempo de llegada o None si la búsqueda se truncó, posiciones) con return_time.
     """
-    change_seed()
-    x_positions = [source[0]]
-    y_positions = [source[1]]
-    z_positions = [source[2]]
-    position = np.array(source)
+    source = np.array(source, dtype=np.int64).reshape(-1)
+    table = step_table(len(source) if table is None else table)
+    if stream is None:
+        change_seed()
+    hitting_time, path = first_passage(table, source, target_position, stream, max_steps, stop_event,
+                                       progress=progress)
+    return (hitting_time, path) if return_time else path
+
 
-    while position[0] != target_position[0] or position[1] != target_position[1] or position[2] != target_position[2]:
-        move = generate_next_move()
-        x_step, y_step, z_step = process_3d(move)
-        position = position + [x_step, y_step, z_step]
-        x_positions.append(position[0])
-        y_positions.append(position[1])
-        z_positions.append(position[2])
-    return np.array(x_positions), np.array(y_positions), np.array(z_positions)
+def calculate_probability(steps, source, destination, dim):
+    """
+        Calcula la probabilidad de calculate_1d/2d/3d_probability para cualquiera de las tres dimensiones.
+
+        Args:
+            steps (int): Número total de pasos en la caminata.
+            source (int | tuple): Posición inicial.
+            destination (int | tuple): Posición objetivo.
+            dim (int): Dimensión de la caminata (1, 2 o 3).
+
+        Returns:
+            Decimal | int: Probabilidad de alcanzar la posición objetivo.
+    """
+    import probability  # Carga scipy y decimal solo cuando se piden probabilidades
+    with span("probability"):
+        return probability.decimal_walk_probability(steps, source, destination, dim)
 
 
 def calculate_1d_probability(steps, source, destination):
@@ -273,12 +553,7 @@ def calculate_1d_probability(steps, source, destination):
         Returns:
             Decimal: Probabilidad de alcanzar la posición objetivo.
     """
-    distance = abs(destination - source)
-    if (steps - distance) % 2 == 0:
-        return Decimal(comb(steps, distance)) * (((Decimal(1) / Decimal(2)) ** Decimal(distance)) *
-                                                 ((Decimal(1) / Decimal(2)) ** Decimal(steps - distance)))
-    else:
-        return 0
+    return calculate_probability(steps, source, destination, 1)
 
 
 def calculate_2d_probability(steps, source, destination):
@@ -293,12 +568,7 @@ def calculate_2d_probability(steps, source, destination):
         Returns:
             Decimal: Probabilidad de alcanzar la posición objetivo.
     """
-    distance = get_manhattan_distance(source, destination)
-    if (steps - distance) % 2 == 0:
-        return Decimal(comb(steps, distance)) * (((Decimal(1) / Decimal(4)) ** Decimal(distance)) *
-                                                 ((Decimal(3) / Decimal(4)) ** Decimal(steps - distance)))
-    else:
-        return 0
+    return calculate_probability(steps, source, destination, 2)
 
 
 def calculate_3d_probability(steps, source, destination):
@@ -313,12 +583,7 @@ def calculate_3d_probability(steps, source, destination):
         Returns:
             Decimal: Probabilidad de alcanzar la posición objetivo.
     """
-    distance = get_manhattan_distance(source, destination)
-    if (steps - distance) % 2 == 0:
-        return Decimal(comb(steps, distance)) * (((Decimal(1) / Decimal(6)) ** Decimal(distance)) *
-                                                 ((Decimal(5) / Decimal(6)) ** Decimal(steps - distance)))
-    else:
-        return 0
+    return calculate_probability(steps, source, destination, 3)
 
 
 def get_manhattan_distance(point1, point2):
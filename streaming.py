@@ -0,0 +1,204 @@
+import math
+import numpy as np
+import occupancy
+import random_walk
+
+STREAM_CHUNK_SIZE = 2 ** 20  # Pasos por bloque en iter_walk
+
+
+def iter_walk(dim, source, chunk_size=STREAM_CHUNK_SIZE, steps=None, stream=None):
+    """
+        Genera una caminata aleatoria por bloques de posiciones con memoria constante.
+
+        El primer bloque empieza con la posición inicial, así que la concatenación de todos los
+        bloques es igual a walk_positions(steps, dim, source) para el mismo generador.
+
+        Args:
+            dim (int | StepTable): Dimensión de la caminata o tabla de pasos.
+            source (tuple): Posición inicial con dim coordenadas.
+            chunk_size (int): Pasos por bloque.
+            steps (int): Número total de pasos (None para una caminata sin fin).
+            stream (RandomStream): Flujo de movimientos (None para usar la semilla global).
+
+        Yields:
+            numpy.ndarray: Posiciones int64 de forma (n, dim).
+    """
+    generator = stream if stream is not None else random_walk.legacy_generator()
+    position = np.array(source, dtype=np.int64).reshape(random_walk.step_table(dim).dim)
+    steps_done = 0
+    first = True
+    while steps is None or steps_done < steps or first:
+        length = chunk_size if steps is None else min(chunk_size, steps - steps_done)
+        codes = random_walk.moves_to_codes(generator.generate_block(length), dim)
+        positions = random_walk.codes_to_positions(codes, dim, position)
+        position = positions[-1]
+        steps_done += length
+        yield positions if first else positions[1:]
+        first = False
+
+
+def reduce_walk(chunks, reducers):
+    """
+        Pasa cada bloque de posiciones por una lista de reductores sin conservarlo.
+
+        Args:
+            chunks (iterable): Bloques de posiciones, por ejemplo de iter_walk.
+            reducers (list): Reductores con los métodos update(chunk) y result().
+
+        Returns:
+            list: Resultado de cada reductor.
+    """
+    for chunk in chunks:
+        for reducer in reducers:
+            reducer.update(chunk)
+    return [reducer.result() for reducer in reducers]
+
+
+class RunningExtrema:
+    def __init__(self):
+        """
+        Constructor de la clase RunningExtrema: mínimo y máximo de cada eje.
+        """
+        self.minimum = None
+        self.maximum = None
+
+    def update(self, chunk):
+        if len(chunk) == 0:
+            return
+        self._combine(chunk.min(axis=0), chunk.max(axis=0))
+
+    def _combine(self, low, high):
+        self.minimum = low if self.minimum is None else np.minimum(self.minimum, low)
+        self.maximum = high if self.maximum is None else np.maximum(self.maximum, high)
+
+    def merge(self, other):
+        """
+        Combina los extremos de otro acumulador (de otro tramo o de otras caminatas).
+
+        Args:
+            other (RunningExtrema): Acumulador a combinar.
+        """
+        if other.minimum is not None:
+            self._combine(other.minimum, other.maximum)
+
+    def result(self):
+        """
+        Returns:
+            tuple: (mínimos, máximos) por eje.
+        """
+        return self.minimum, self.maximum
+
+
+class OccupancyCounter(occupancy.OccupancyCounter):
+    def __init__(self, dim=None):
+        """
+        Constructor de la clase OccupancyCounter: visitas a cada sitio en una malla densa que crece
+        para cubrir la caja envolvente de la caminata. Conserva la interfaz original de este módulo
+        sobre occupancy.OccupancyCounter, sin pasar nunca al conteo disperso.
+
+        Args:
+            dim (int): Dimensión de la caminata (None para tomarla del primer bloque).
+        """
+        super().__init__(dim or 1, max_dense_sites=math.inf)
+        self.dim = dim
+
+    def update(self, chunk):
+        chunk = np.asarray(chunk, dtype=np.int64)
+        if len(chunk) == 0:
+            return
+        self._set_dim(chunk.shape[1])
+        super().update(chunk)
+
+    def merge(self, other):
+        if other.dim is not None:
+            self._set_dim(other.dim)
+        super().merge(other)
+
+    def sites(self):
+        if self.dim is None:
+            return np.empty(shape=(0, 0), dtype=np.int64), np.empty(shape=0, dtype=np.int64)
+        return super().sites()
+
+    def _set_dim(self, dim):
+        if self.dim is None:
+            self.dim = dim
+            self.bits = 63 // dim
+
+    def result(self):
+        """
+        Returns:
+            tuple: (origen, conteos) donde conteos[i, ...] son las visitas al sitio origen + (i, ...).
+        """
+        if self.counts is None:
+            return None, None
+        # La malla puede tener margen alrededor de la caja visitada
+        box = tuple(slice(start, end + 1) for start, end in zip(self.low - self.origin, self.high - self.origin))
+        return self.low, self.counts[box]
+
+
+class MSDAccumulator:
+    def __init__(self, lags):
+        """
+        Constructor de la clase MSDAccumulator: desplazamiento cuadrático medio promediado en el
+        tiempo, mean(|x(t + lag) - x(t)| ** 2), para una lista de retardos.
+
+        Args:
+            lags (list): Retardos (enteros positivos).
+        """
+        self.lags = np.asarray(lags, dtype=np.int64)
+        self.sums = np.zeros(shape=len(self.lags), dtype=np.int64)  # Enteros para combinar sin redondeo
+        self.counts = np.zeros(shape=len(self.lags), dtype=np.int64)
+        self.head = None  # Primeras posiciones, para combinar con el tramo anterior
+        self.tail = None  # Últimas posiciones necesarias para el mayor retardo
+
+    def update(self, chunk):
+        if len(chunk) == 0:
+            return
+        longest = int(self.lags.max(initial=0))
+        if self.head is None or len(self.head) < longest:
+            head = chunk if self.head is None else np.concatenate([self.head, chunk])
+            self.head = head[:longest]
+        self.tail = self._pairs(self.tail, chunk, self.sums, self.counts)
+
+    def _pairs(self, tail, chunk, sums, counts, crossing=False):
+        # Suma los pares cuyo extremo final está en chunk (con crossing, solo los que empiezan en tail)
+        previous = 0 if tail is None else len(tail)
+        window = chunk if tail is None else np.concatenate([tail, chunk])
+        for i, lag in enumerate(self.lags):
+            first_end = max(lag, previous)
+            last_end = min(previous + lag, len(window)) if crossing else len(window)
+            if first_end >= last_end:
+                continue
+            difference = window[first_end:last_end] - window[first_end - lag:last_end - lag]
+            sums[i] += (difference ** 2).sum()
+            counts[i] += len(difference)
+        return window[-int(self.lags.max(initial=0)):] if len(self.lags) > 0 else None
+
+    def merge(self, other):
+        """
+        Combina el acumulador del tramo siguiente de la misma caminata, cuya primera posición es la
+        que sigue a la última de este tramo. Los pares que cruzan el límite se calculan con las
+        últimas posiciones de este tramo y las primeras del otro, así que el resultado es exacto.
+
+        Args:
+            other (MSDAccumulator): Acumulador del tramo siguiente, con los mismos retardos.
+        """
+        if other.head is None:
+            return
+        self.sums += other.sums
+        self.counts += other.counts
+        if self.head is None:
+            self.head, self.tail = other.head, other.tail
+            return
+        self._pairs(self.tail, other.head, self.sums, self.counts, crossing=True)
+        longest = int(self.lags.max(initial=0))
+        self.head = np.concatenate([self.head, other.head])[:longest]
+        self.tail = np.concatenate([self.tail, other.tail])[-longest:]
+
+    def result(self):
+        """
+        Returns:
+            numpy.ndarray: Desplazamiento cuadrático medio para cada retardo (nan si no hubo pares).
+        """
+        with np.errstate(invalid="ignore", divide="ignore"):
+            return self.sums / self.counts
@@ -0,0 +1,26 @@
+import os
+import sys
+import pytest
+
+# Los módulos del proyecto están en la raíz del repositorio, sin paquete
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import random_walk  # noqa: E402
+from random_generator import CongruencialLineal  # noqa: E402
+
+
+@pytest.fixture
+def make_generator():
+    # Generadores con los parámetros de random_walk; m permite probar módulos grandes
+    def factory(seed=42, m=random_walk.m):
+        return CongruencialLineal(random_walk.a, random_walk.c, m, seed)
+    return factory
+
+
+@pytest.fixture
+def make_path(make_generator):
+    # Trayectoria de referencia calculada con walk_positions
+    def factory(steps, dim, source=None, seed=42):
+        source = (0,) * dim if source is None else source
+        return random_walk.walk_positions(steps, dim, source, make_generator(seed))
+    return factory
@@ -0,0 +1,77 @@
+import io
+import json
+import numpy as np
+import pytest
+import batch
+import random_walk
+from ensemble import simulate_ensemble
+
+JOBS = [
+    {"id": "a", "dim": 2, "steps": 500, "source": [1, -1], "seed": 7},
+    {"dim": 1, "target": [5], "walkers": 3, "max_steps": 2000},
+]
+
+
+def test_read_jobs_from_json_csv_and_stdin(tmp_path, monkeypatch):
+    expected = [batch.normalize_job(job, index) for index, job in enumerate(JOBS)]
+    json_path = tmp_path / "jobs.json"
+    json_path.write_text(json.dumps({"jobs": JOBS}))
+    assert batch.read_jobs(str(json_path)) == expected
+
+    csv_path = tmp_path / "jobs.csv"
+    csv_path.write_text("id,dim,steps,target,source,seed,walkers,max_steps\n"
+                        "a,2,500,,1;-1,7,,\n"
+                        ",1,,5,,,3,2000\n")
+    from_csv = batch.read_jobs(str(csv_path))
+    assert from_csv[0] == expected[0]
+    assert from_csv[1] == dict(expected[1], id=1)
+
+    monkeypatch.setattr("sys.stdin", io.StringIO(json.dumps(JOBS)))
+    assert batch.read_jobs("-") == expected
+
+
+@pytest.mark.parametrize("job", [
+    {"dim": 2, "steps": 10, "color": "red"},
+    {"dim": 4, "steps": 10},
+    {"steps": 10},
+    {"dim": 2},
+    {"dim": 2, "steps": 10, "target": [1, 1]},
+    {"dim": 2, "target": [1, 1, 1]},
+    {"dim": 3, "steps": 10, "source": "1;2"},
+    {"dim": 1, "steps": 10, "walkers": 0},
+    {"dim": 1, "steps": -1},
+])
+def test_normalize_job_rejects_bad_jobs(job):
+    with pytest.raises(ValueError):
+        batch.normalize_job(job)
+
+
+def test_single_walk_job_matches_walk_positions(make_path):
+    result = batch.run_job(batch.normalize_job({"dim": 3, "steps": 4000, "source": [2, 0, -1], "seed": 9}))
+    path = make_path(4000, 3, (2, 0, -1), seed=9)
+    sites, visits = np.unique(path, axis=0, return_counts=True)
+    assert result["endpoint"] == path[-1].tolist()
+    assert result["minimum"] == path.min(axis=0).tolist() and result["maximum"] == path.max(axis=0).tolist()
+    assert result["distinct_sites"] == len(sites)
+    assert result["most_visits"] == visits.max()
+    assert result["simulated_steps"] == 4000
+
+
+def test_ensemble_job_matches_simulate_ensemble(make_generator):
+    result = batch.run_job(batch.normalize_job({"dim": 2, "steps": 300, "walkers": 25, "seed": 5}))
+    stats = simulate_ensemble(25, 300, 2, (0, 0), "stats", make_generator(5))
+    assert result["mean_endpoint"] == stats["mean_endpoint"].tolist()
+    assert result["msd"] == stats["msd"][-1]
+    assert result["return_fraction"] == stats["return_fraction"]
+    assert result["simulated_steps"] == 25 * 300
+
+
+def test_target_job_matches_first_passage(make_generator):
+    job = batch.normalize_job({"dim": 1, "target": [4], "walkers": 4, "max_steps": 3000, "seed": 3})
+    result = batch.run_job(job)
+    generator = make_generator(3)
+    expected = [random_walk.first_passage(1, (0,), (4,), generator, 3000, return_path=False)[0] for _ in range(4)]
+    assert result["hitting_times"] == expected
+    hits = [value for value in expected if value is not None]
+    assert result["hit_fraction"] == len(hits) / 4
+    assert result["simulated_steps"] == sum(value if value is not None else 3000 for value in expected)
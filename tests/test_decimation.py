@@ -0,0 +1,41 @@
+import numpy as np
+import pytest
+from decimation import m4_decimate, spatial_decimate
+
+
+@pytest.mark.parametrize("n, buckets", [(10000, 100), (10007, 64), (100, 30)])
+def test_m4_keeps_bucket_extremes(n, buckets, make_path):
+    values = make_path(n, 1)[:n, 0]
+    indices, kept = m4_decimate(values, buckets, offset=50)
+    assert np.array_equal(kept, values[indices - 50])
+    assert np.all(np.diff(indices) > 0)
+    if n <= 4 * buckets:
+        assert len(indices) == n
+        return
+    assert len(indices) <= 4 * buckets
+    local = indices - 50
+    size = -(-n // buckets)
+    for start in range(0, n, size):
+        bucket = values[start:start + size]
+        inside = local[(local >= start) & (local < start + len(bucket))]
+        assert start in inside and start + len(bucket) - 1 in inside
+        assert values[inside].min() == bucket.min() and values[inside].max() == bucket.max()
+
+
+@pytest.mark.parametrize("dim", [2, 3])
+@pytest.mark.parametrize("resolution, max_points", [(50, 200_000), (400, 300), (1000, 50), (1000, 2 + 2 * 3)])
+def test_spatial_decimation_keeps_endpoints_and_extremes(dim, resolution, max_points, make_path):
+    points = make_path(20000, dim)
+    indices = spatial_decimate(points, resolution, max_points=max_points)
+    assert len(indices) <= max_points
+    assert np.all(np.diff(indices) > 0)
+    assert indices[0] == 0 and indices[-1] == len(points) - 1
+    kept = points[indices]
+    assert np.array_equal(kept.min(axis=0), points.min(axis=0))
+    assert np.array_equal(kept.max(axis=0), points.max(axis=0))
+
+
+def test_spatial_decimation_drops_points_within_a_cell():
+    points = np.array([[0, 0], [0, 1], [1, 0], [9, 9], [10, 10], [0, 0]])
+    # Con celdas de 5.5 los puntos 1 y 2 no salen de la celda inicial; el 4 es el máximo de ambos ejes
+    assert spatial_decimate(points, 2, bounds=((0, 0), (11, 11))).tolist() == [0, 3, 4, 5]
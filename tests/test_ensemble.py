@@ -0,0 +1,40 @@
+import numpy as np
+import pytest
+import random_walk
+from ensemble import simulate_ensemble, walker_start_states
+
+
+@pytest.mark.parametrize("dim", [1, 2, 3])
+def test_paths_use_consecutive_subsequences(dim, make_generator):
+    n_walkers, steps = 7, 300
+    table = random_walk.step_table(dim)
+    moves = make_generator().generate_block(n_walkers * steps).reshape(n_walkers, steps)
+    expected = np.cumsum(table.deltas[table.codes(moves)], axis=1, dtype=np.int64)
+    paths = simulate_ensemble(n_walkers, steps, dim, (0,) * dim, "paths", make_generator())
+    assert np.array_equal(paths[:, 1:], expected)
+    assert np.array_equal(simulate_ensemble(n_walkers, steps, dim, (0,) * dim, generator=make_generator()),
+                          expected[:, -1])
+
+
+def test_stats_match_paths(make_generator):
+    paths = simulate_ensemble(50, 200, 2, (0, 0), "paths", make_generator())
+    stats = simulate_ensemble(50, 200, 2, (0, 0), "stats", make_generator())
+    assert np.allclose(stats["msd"], (paths ** 2).sum(axis=2).mean(axis=0))
+    assert stats["return_fraction"] == np.all(paths[:, 1:] == 0, axis=2).any(axis=1).mean()
+
+
+@pytest.mark.parametrize("output", ["endpoints", "paths", "stats"])
+def test_empty_ensemble_is_rejected(output, make_generator):
+    generator = make_generator()
+    with pytest.raises(ValueError):
+        simulate_ensemble(0, 100, 2, (0, 0), output, generator)
+    assert generator.xn == 42
+
+
+def test_walkers_beyond_the_real_period_are_rejected(make_generator):
+    generator = make_generator()
+    half = random_walk.m // 2
+    assert walker_start_states(generator, 2, half).tolist() == [42, 42]
+    with pytest.raises(ValueError):
+        simulate_ensemble(2, half, 1, (0,), generator=generator)
+    assert generator.xn == 42
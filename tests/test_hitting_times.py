@@ -0,0 +1,42 @@
+import numpy as np
+import pytest
+import random_walk
+from ensemble import simulate_ensemble
+from hitting_times import NOT_HIT, estimate_hitting_times, first_hit_matrix, hit_within
+
+
+def brute_force(paths, targets):
+    first_hits = np.full(shape=(len(paths), len(targets)), fill_value=NOT_HIT, dtype=np.int64)
+    for walker, path in enumerate(paths):
+        for index, target in enumerate(targets):
+            hits = np.flatnonzero(np.all(path == target, axis=1))
+            if len(hits) > 0:
+                first_hits[walker, index] = hits[0]
+    return first_hits
+
+
+def test_first_hit_matrix_matches_paths(make_generator):
+    targets = [(1, 0), (0, 0), (3, -2), (1, 0), (-40, 40)]
+    paths = simulate_ensemble(40, 500, 2, (0, 0), "paths", make_generator())
+    first_hits = first_hit_matrix(40, 500, 2, (0, 0), targets, make_generator())
+    assert np.array_equal(first_hits, brute_force(paths, np.array(targets)))
+
+
+def test_hit_fractions_and_within(make_generator):
+    targets = [(2,), (-3,)]
+    paths = simulate_ensemble(60, 200, 1, (0,), "paths", make_generator(7))
+    expected = brute_force(paths, np.array(targets))
+    result = estimate_hitting_times(60, 200, 1, (0,), targets, make_generator(7))
+    assert np.array_equal(result["first_hits"], expected)
+    assert np.allclose(result["hit_fraction"], (expected != NOT_HIT).mean(axis=0))
+    within = hit_within(expected, [10, 200])
+    assert np.allclose(within[:, 0], ((expected != NOT_HIT) & (expected <= 10)).mean(axis=0))
+    assert result["histograms"].sum(axis=1).tolist() == (expected != NOT_HIT).sum(axis=0).tolist()
+
+
+@pytest.mark.parametrize("n_walkers, steps", [(0, 100), (2, random_walk.m // 2)])
+def test_invalid_ensembles_are_rejected(n_walkers, steps, make_generator):
+    generator = make_generator()
+    with pytest.raises(ValueError):
+        first_hit_matrix(n_walkers, steps, 1, (0,), [(1,)], generator)
+    assert generator.xn == 42
@@ -0,0 +1,17 @@
+import import_budget
+
+IMPORT_TEST_SCALE = 2.0  # Margen sobre los presupuestos para máquinas de integración cargadas
+
+
+def test_simulation_modules_do_not_load_heavy_dependencies():
+    _, loaded = import_budget.measure_import("random_walk", runs=1)
+    assert "random_walk" in loaded
+    assert not {"scipy", "matplotlib", "plotly", "decimal"} & loaded
+
+
+def test_import_budgets():
+    results = import_budget.check_budgets(scale=IMPORT_TEST_SCALE)
+    assert [module for module, *_ in results] == list(import_budget.IMPORT_BUDGETS_MS)
+    for module, milliseconds, budget, heavy, passed in results:
+        assert heavy == [], module
+        assert passed, f"{module}: {milliseconds} ms > {budget} ms"
@@ -0,0 +1,38 @@
+import os
+import subprocess
+import sys
+import numpy as np
+import pytest
+import random_walk
+from walk_path import SeekableWalk
+
+
+def test_default_calls_do_not_import_numba():
+    code = ("import sys, random_walk, walk_path; random_walk.go_to_2d((0, 0), (3, 1), max_steps=1000); "
+            "walk_path.SeekableWalk(1000, 2, (0, 0)).position_at(500); print('numba' in sys.modules)")
+    output = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True, check=True,
+                            cwd=os.path.dirname(os.path.abspath(random_walk.__file__))).stdout
+    assert output.strip() == "False"
+
+
+@pytest.mark.parametrize("m", [random_walk.m, 2 ** 31 - 1])
+def test_jit_matches_numpy_engine(monkeypatch, m, make_generator):
+    pytest.importorskip("numba")
+    import jit_kernels
+    for dim in (1, 2, 3):
+        generator, compiled = make_generator(m=m), make_generator(m=m)
+        expected = random_walk.moves_to_codes(generator.generate_block(5000), dim)
+        assert np.array_equal(jit_kernels.walk_codes(compiled, 5000, dim), expected)
+        assert compiled.xn == generator.xn
+
+    monkeypatch.setattr(random_walk, "USE_JIT", True)
+    generator, compiled = make_generator(m=m), make_generator(m=m)
+    monkeypatch.setattr(random_walk, "USE_JIT", False)
+    expected = random_walk.first_passage(2, (0, 0), (6, -4), generator, max_steps=10 ** 6)
+    monkeypatch.setattr(random_walk, "USE_JIT", True)
+    result = random_walk.first_passage(2, (0, 0), (6, -4), compiled, max_steps=10 ** 6)
+    assert result[0] == expected[0] and np.array_equal(result[1], expected[1])
+    assert compiled.xn == generator.xn
+    seekable = SeekableWalk(3000, 3, (0, 0, 0), make_generator(m=m), checkpoint_interval=256)
+    assert np.array_equal(seekable.slice(0, 3001), random_walk.walk_positions(3000, 3, (0, 0, 0),
+                                                                               make_generator(m=m)))
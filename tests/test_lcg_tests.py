@@ -0,0 +1,44 @@
+import numpy as np
+import pytest
+import lcg_tests
+
+
+class NumpyStates:
+    # Estados de 32 bits independientes, con la interfaz de CongruencialLineal que usa run_battery
+    m = 2 ** 32
+
+    def __init__(self, seed):
+        self.rng = np.random.default_rng(seed)
+
+    def generate_xn_block(self, n):
+        return self.rng.integers(0, self.m, size=n, dtype=np.uint64)
+
+
+@pytest.mark.parametrize("samples", [0, 5, lcg_tests.LCG_TEST_MIN_SAMPLES - 1])
+def test_too_few_samples_are_rejected(samples, make_generator):
+    with pytest.raises(ValueError):
+        lcg_tests.run_battery(make_generator(), samples)
+
+
+def test_independent_bits_pass():
+    results = lcg_tests.run_battery(NumpyStates(1), 200000, low_bits=8)
+    assert all(result["passed"] for result in results.values())
+    assert len([name for name in results if name.startswith(lcg_tests.LOW_BIT_PREFIX)]) == 8
+
+
+def test_lcg_low_bits_are_flagged_but_do_not_fail_the_run(capsys, make_generator):
+    results = lcg_tests.run_battery(make_generator(), 200000, low_bits=8)
+    low_bits = [result for name, result in results.items() if name.startswith(lcg_tests.LOW_BIT_PREFIX)]
+    assert len(low_bits) == 8 and not any(result["passed"] for result in low_bits)
+    assert all(result["statistic"] == 1.0 for result in low_bits)
+    assert lcg_tests.main(["-n", "200000", "--low-bits", "8"]) == 0
+    assert "informativo" in capsys.readouterr().out
+
+
+def test_results_do_not_depend_on_block_size(monkeypatch, make_generator):
+    expected = lcg_tests.run_battery(make_generator(), 50000, low_bits=8)
+    monkeypatch.setattr(lcg_tests, "LCG_TEST_BLOCK", 6 * 1001)
+    results = lcg_tests.run_battery(make_generator(), 50000, low_bits=8)
+    assert results.keys() == expected.keys()
+    for name, result in results.items():
+        assert result["statistic"] == pytest.approx(expected[name]["statistic"], rel=1e-9), name
@@ -0,0 +1,107 @@
+import numpy as np
+import pytest
+import random_walk
+from ensemble import iter_ensemble, simulate_ensemble
+from hitting_times import NOT_HIT
+from observables import (EnsembleReturns, EnsembleSites, ReturnCounter, ensemble_observables, summarize,
+                         walk_accumulators)
+
+
+def assert_same_summary(result, expected):
+    assert result.keys() == expected.keys()
+    for name, value in expected.items():
+        if isinstance(value, dict):
+            assert result[name] == value
+        elif value is None:
+            assert result[name] is None
+        else:
+            assert np.array_equal(result[name], value)
+
+
+def test_split_return_counts_match_single_pass():
+    path = np.array([[0, 0], [1, 0], [0, 0], [1, 0], [0, 0], [0, 1], [0, 0]])
+    single = ReturnCounter((0, 0))
+    single.update(path)
+    first, second = ReturnCounter((0, 0)), ReturnCounter((0, 0), start=4)
+    first.update(path[:4])
+    second.update(path[4:])
+    second.merge(first)
+    assert single.result() == second.result() == (3, 2)
+
+
+@pytest.mark.parametrize("splits", [[4], [1, 500, 501], [2999]])
+def test_merged_walk_accumulators_match_single_pass(splits, make_generator):
+    path = random_walk.walk_positions(3000, 2, (0, 0), make_generator())
+    single = walk_accumulators(2, (0, 0), lags=(1, 7, 100))
+    for accumulator in single.values():
+        accumulator.update(path)
+
+    bounds = [0] + splits + [len(path)]
+    parts = []
+    for start, stop in zip(bounds[:-1], bounds[1:]):
+        part = walk_accumulators(2, (0, 0), lags=(1, 7, 100), start=start)
+        for accumulator in part.values():
+            accumulator.update(path[start:stop])
+        parts.append(part)
+    merged = parts[0]  # MSDAccumulator combina cada tramo con el siguiente
+    for part in parts[1:]:
+        for name, accumulator in merged.items():
+            accumulator.merge(part[name])
+    assert_same_summary(summarize(merged), summarize(single))
+
+
+def brute_force(paths, origin):
+    at_origin = np.all(paths[:, 1:] == origin, axis=2)
+    first = np.where(at_origin.any(axis=1), np.argmax(at_origin, axis=1) + 1, NOT_HIT)
+    distinct = [len(np.unique(path, axis=0)) for path in paths]
+    return at_origin.sum(axis=1), first, np.array(distinct)
+
+
+@pytest.mark.parametrize("dim", [1, 2, 3])
+def test_ensemble_observables_match_paths(dim, make_generator):
+    origin = (0,) * dim
+    paths = simulate_ensemble(30, 400, dim, origin, "paths", make_generator())
+    result = ensemble_observables(30, 400, dim, origin, make_generator())
+    returns, first, distinct = brute_force(paths, np.array(origin))
+    assert np.array_equal(result["returns"], returns)
+    assert np.array_equal(result["first_return"], first)
+    assert np.array_equal(result["distinct_sites"], distinct)
+    assert result["return_fraction"] == (first != NOT_HIT).mean()
+    assert np.allclose(result["msd"], (paths ** 2).sum(axis=2).mean(axis=0))
+
+
+def test_ensemble_accumulators_merge_and_unpacked_keys(make_generator):
+    chunks = list(iter_ensemble(12, 600, 2, (0, 0), make_generator()))
+    single_returns, single_sites = EnsembleReturns(12, (0, 0)), EnsembleSites(12, 600, (0, 0))
+    unpacked = EnsembleSites(12, 600, (0, 0))
+    unpacked.packed = False
+    unpacked.keys = unpacked._keys(np.zeros(shape=(12, 1, 2), dtype=np.int64))
+    late_returns, late_sites = EnsembleReturns(12, (0, 0)), EnsembleSites(12, 600, (0, 0))
+    walk = np.concatenate([chunk for _, chunk in chunks], axis=1)
+    for start, stop, returns, sites in ((0, 250, single_returns, single_sites),
+                                        (250, 600, late_returns, late_sites)):
+        returns.update(walk[:, start:stop], start)
+        sites.update(walk[:, start:stop], start)
+    single = EnsembleReturns(12, (0, 0)), EnsembleSites(12, 600, (0, 0))
+    single[0].update(walk)
+    single[1].update(walk)
+    unpacked.update(walk)
+    late_returns.merge(single_returns)
+    late_sites.merge(single_sites)
+    assert all(np.array_equal(a, b) for a, b in zip(late_returns.result(), single[0].result()))
+    assert np.array_equal(late_sites.result(), single[1].result())
+    assert np.array_equal(unpacked.result(), single[1].result())
+
+
+def test_zero_step_ensembles_have_zero_msd(make_generator):
+    result = ensemble_observables(5, 0, 2, (1, 1), make_generator())
+    stats = simulate_ensemble(5, 0, 2, (1, 1), "stats", make_generator())
+    assert result["msd"].tolist() == stats["msd"].tolist() == [0.0]
+    assert result["return_fraction"] == stats["return_fraction"] == 0.0
+
+
+def test_stats_output_matches_observables(make_generator):
+    result = ensemble_observables(40, 700, 3, (0, 0, 0), make_generator())
+    stats = simulate_ensemble(40, 700, 3, (0, 0, 0), "stats", make_generator())
+    assert np.array_equal(stats["msd"], result["msd"])
+    assert stats["return_fraction"] == result["return_fraction"]
@@ -0,0 +1,53 @@
+import numpy as np
+import pytest
+from occupancy import OccupancyCounter, occupancy_1d
+
+
+def expected_sites(path):
+    return np.unique(path, axis=0, return_counts=True)
+
+
+def test_occupancy_1d_matches_unique(make_path):
+    path = make_path(10000, 1)[:, 0]
+    sites, counts = occupancy_1d(path)
+    expected, expected_counts = np.unique(path, return_counts=True)
+    assert np.array_equal(sites, expected) and np.array_equal(counts, expected_counts)
+
+
+@pytest.mark.parametrize("dim", [1, 2, 3])
+@pytest.mark.parametrize("max_dense_sites", [2 ** 24, 50, 0])
+def test_counter_matches_unique(dim, max_dense_sites, make_path):
+    path = make_path(30000, dim)
+    counter = OccupancyCounter(dim, max_dense_sites)
+    for start in range(0, len(path), 2500):
+        counter.update(path[start:start + 2500])
+    sites, counts = counter.sites()
+    expected, expected_counts = expected_sites(path)
+    assert np.array_equal(sites, expected) and np.array_equal(counts, expected_counts)
+    assert counter.distinct_sites() == len(expected)
+    assert counter.most_visited()[1] == expected_counts.max()
+
+
+@pytest.mark.parametrize("max_dense_sites", [2 ** 24, 300])
+def test_merge_equals_single_pass(max_dense_sites, make_path):
+    path = make_path(40000, 2)
+    single = OccupancyCounter(2, max_dense_sites)
+    single.update(path)
+    parts = [OccupancyCounter(2, max_dense_sites) for _ in range(3)]
+    for part, chunk in zip(parts, np.array_split(path, 3)):
+        part.update(chunk)
+    parts[2].merge(parts[0])
+    parts[2].merge(parts[1])
+    sites, counts = parts[2].sites()
+    expected, expected_counts = single.sites()
+    assert np.array_equal(sites, expected) and np.array_equal(counts, expected_counts)
+    assert parts[2].total == single.total == len(path)
+
+
+def test_scattered_chunk_in_large_grid():
+    counter = OccupancyCounter(2)
+    counter.update(np.array([[0, 0], [2000, 2000]]))
+    counter.update(np.array([[5, 7], [1500, 3], [5, 7]]))
+    sites, counts = counter.sites()
+    assert sites.tolist() == [[0, 0], [5, 7], [1500, 3], [2000, 2000]]
+    assert counts.tolist() == [1, 2, 1, 1]
@@ -0,0 +1,69 @@
+import numpy as np
+import pytest
+import parallel
+import random_walk
+from ensemble import simulate_ensemble
+
+
+def test_parallel_walk_matches_single_process(monkeypatch, make_generator):
+    monkeypatch.setattr(parallel, "PARALLEL_SEGMENT", 1000)  # Varios tramos por proceso
+    expected = random_walk.walk_positions(5000, 2, (1, 2), make_generator())
+    assert np.array_equal(parallel.parallel_walk_positions(5000, 2, (1, 2), 2, make_generator()), expected)
+
+
+@pytest.mark.parametrize("workers", [1, 2, 3])
+def test_parallel_ensemble_matches_single_process(monkeypatch, workers, make_generator):
+    monkeypatch.setattr(parallel, "PARALLEL_SEGMENT", 400)  # Varias tareas por proceso
+    reference = make_generator()
+    expected = simulate_ensemble(11, 200, 2, (1, -1), generator=reference)
+    generator = make_generator()
+    assert np.array_equal(parallel.parallel_ensemble(11, 200, 2, (1, -1), workers, generator), expected)
+    assert generator.xn == reference.xn
+
+
+def test_parallel_ensemble_rejects_overlapping_walkers(make_generator):
+    generator = make_generator()
+    with pytest.raises(ValueError):
+        parallel.parallel_ensemble(2, random_walk.m // 2, 1, (0,), 1, generator)
+    assert generator.xn == 42
+
+
+@pytest.mark.parametrize("workers", [1, 2, 3])
+@pytest.mark.parametrize("target, max_steps", [((6, -4), None), ((1000, 1000), 5000)])
+def test_parallel_first_passage_matches_single_process(workers, target, max_steps, make_generator):
+    reference = make_generator()
+    expected_time, expected_path = random_walk.first_passage(2, (0, 0), target, reference, max_steps)
+    generator = make_generator()
+    hitting_time, path = parallel.parallel_first_passage(2, (0, 0), target, workers, generator, max_steps,
+                                                         return_path=True)
+    assert hitting_time == expected_time
+    assert np.array_equal(path, expected_path)
+    assert generator.xn == reference.xn
+    if max_steps is not None:
+        assert hitting_time is None and len(path) == max_steps + 1
+
+
+class _BrokenShared:
+    def __getitem__(self, key):
+        raise IndexError("tramo fuera de rango")
+
+
+class _FakeMemory:
+    def __init__(self):
+        self.closed = False
+
+    def close(self):
+        self.closed = True
+
+
+@pytest.mark.parametrize("task, args", [
+    (parallel._walk_segment_task, (10, 0, 10, 2, "nombre")),
+    (parallel._search_codes_task, (10, 0, 10, 2, "nombre")),
+])
+def test_task_errors_are_not_masked(monkeypatch, task, args):
+    memory = _FakeMemory()
+    monkeypatch.setattr(parallel, "_attach_shared", lambda name, shape, dtype: (memory, _BrokenShared()))
+    params = (random_walk.a, random_walk.c, random_walk.m, 42)
+    with pytest.raises(IndexError):
+        task(params, *args)
+    assert memory.closed
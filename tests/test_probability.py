@@ -0,0 +1,109 @@
+from decimal import Decimal
+from fractions import Fraction
+from math import comb
+import numpy as np
+import pytest
+import probability
+import random_walk
+
+
+def baseline_probability(steps, source, destination, dim):
+    # Fórmula de calculate_*_probability antes de probability.py
+    distance = int(probability.walk_distances(source, destination, dim))
+    if (steps - distance) % 2 != 0:
+        return 0
+    return Decimal(comb(steps, distance)) * (((Decimal(1) / Decimal(2 * dim)) ** Decimal(distance)) *
+                                             ((Decimal(2 * dim - 1) / Decimal(2 * dim)) ** Decimal(steps - distance)))
+
+
+CASES = [
+    (1, 0, 1, 1), (40, 3, -7, 1), (501, 0, 250, 1),
+    (10, (0, 0), (3, -1), 2), (550, (0, 0), (250, 300), 2),
+    (9, (0, 0, 0), (1, 2, -2), 3), (85, (0, 0, 0), (45, 23, 17), 3),
+]
+
+
+@pytest.mark.parametrize("steps, source, destination, dim", CASES)
+def test_decimal_probability_matches_baseline(steps, source, destination, dim):
+    expected = baseline_probability(steps, source, destination, dim)
+    result = probability.decimal_walk_probability(steps, source, destination, dim)
+    assert abs(result - expected) <= abs(expected) * Decimal("1e-25")
+    exact = probability.exact_walk_probability(steps, source, destination, dim)
+    assert isinstance(exact, Fraction)
+    assert abs(Decimal(exact.numerator) / Decimal(exact.denominator) - expected) <= abs(expected) * Decimal("1e-25")
+
+
+@pytest.mark.parametrize("dim, destination", [(1, 80), (2, (30, -50)), (3, (10, 20, -30))])
+def test_log_space_above_exact_steps(dim, destination):
+    steps = probability.EXACT_DECIMAL_STEPS + 1000
+    source = 0 if dim == 1 else (0,) * dim
+    exact = probability.exact_walk_probability(steps, source, destination, dim)
+    result = probability.decimal_walk_probability(steps, source, destination, dim)
+    expected = Decimal(exact.numerator) / Decimal(exact.denominator)
+    assert abs(result - expected) <= expected * Decimal("1e-10")
+    assert probability.walk_probability(steps, source, destination, dim) == pytest.approx(float(expected), rel=1e-10)
+
+
+def test_vectorized_probability_matches_scalar():
+    destinations = np.array([[0, 0], [3, -1], [2, 2], [7, 0], [40, 0], [1, 1]])
+    steps = np.array([[10], [12]])
+    result = probability.walk_probability(steps, (0, 0), destinations, 2)
+    assert result.shape == (2, len(destinations))
+    for i, n in enumerate(steps[:, 0]):
+        for j, destination in enumerate(destinations):
+            expected = float(probability.exact_walk_probability(int(n), (0, 0), tuple(destination), 2))
+            assert result[i, j] == pytest.approx(expected, rel=1e-12, abs=0)
+
+
+@pytest.mark.parametrize("steps, source, destination, dim", [
+    (5, 0, 2, 1), (10, (0, 0), (3, 0), 2), (7, (1, 1, 1), (1, 1, 1), 3), (4, 0, 6, 1),
+    (probability.EXACT_DECIMAL_STEPS + 1, (0, 0), (0, 0), 2),
+])
+def test_unreachable_destinations_have_zero_probability(steps, source, destination, dim):
+    assert probability.decimal_walk_probability(steps, source, destination, dim) == 0
+    assert probability.exact_walk_probability(steps, source, destination, dim) == 0
+    assert probability.walk_probability(steps, source, destination, dim) == 0.0
+    assert probability.log_walk_probability(steps, source, destination, dim) == -np.inf
+
+
+@pytest.mark.parametrize("dim, steps", [(1, 60), (2, 25), (3, 9)])
+def test_lattice_methods_agree(dim, steps):
+    direct = probability.lattice_distribution(steps, dim, "direct")
+    fft = probability.lattice_distribution(steps, dim, "fft")
+    assert direct.shape == fft.shape == (2 * steps + 1,) * dim
+    assert np.max(np.abs(direct - fft)) < 1e-12
+    displacement = sum(np.indices(direct.shape)) - steps * dim
+    wrong_parity = displacement % 2 != steps % 2
+    for grid in (direct, fft):
+        assert grid.sum() == pytest.approx(1.0, abs=1e-12)
+        assert np.all(grid[wrong_parity] == 0.0)
+
+
+def test_lattice_probability_reads_the_grid():
+    steps = 6
+    grid = probability.lattice_distribution(steps, 2)
+    source = (3, -2)
+    destinations = np.array([[3, -2], [4, -1], [9, -2], [3, 5], [5, -2]])
+    result = probability.lattice_probability(grid, source, destinations, 2)
+    for destination, value in zip(destinations, result):
+        offset = destination - source
+        inside = np.all(np.abs(offset) <= steps)
+        assert value == (grid[tuple(offset + steps)] if inside else 0.0)
+    assert result[3] == 0.0  # Fuera de la malla
+    assert probability.lattice_probability(probability.lattice_distribution(4, 1), 0, 2, 1) == \
+        pytest.approx(comb(4, 1) / 2 ** 4)
+
+
+def test_lattice_histogram_sums_to_one():
+    endpoints = np.array([[1, 0], [1, 0], [0, -1], [-2, 1]])
+    histogram = probability.lattice_histogram(endpoints, 3, (0, 0))
+    assert histogram.shape == (7, 7)
+    assert histogram.sum() == pytest.approx(1.0)
+    assert histogram[4, 3] == 0.5 and histogram[3, 2] == 0.25 and histogram[1, 4] == 0.25
+
+
+def test_random_walk_probabilities_use_the_engine():
+    assert random_walk.calculate_1d_probability(40, 3, -7) == probability.decimal_walk_probability(40, 3, -7, 1)
+    assert random_walk.calculate_2d_probability(10, (0, 0), (3, -1)) == \
+        probability.decimal_walk_probability(10, (0, 0), (3, -1), 2)
+    assert random_walk.calculate_3d_probability(9, (0, 0, 0), (1, 2, -3)) == 0
@@ -0,0 +1,56 @@
+import json
+import threading
+import random_walk
+from profiling import Profiler
+
+
+def test_spans_accumulate_calls_and_steps():
+    profiler = Profiler()
+    for _ in range(3):
+        with profiler.span("outer", 10) as stage:
+            stage.add(5, nbytes=100)
+            with profiler.span("inner", 1, nbytes=8):
+                pass
+    report = profiler.report()
+    assert report["outer"]["calls"] == 3 and report["outer"]["steps"] == 45
+    assert report["inner"]["calls"] == 3 and report["inner"]["steps"] == 3
+    assert report["outer"]["bytes"] == 300 and report["inner"]["bytes"] == 24
+    assert set(report["outer"]) == {"calls", "seconds", "max_seconds", "steps", "bytes", "steps_per_second"}
+    assert json.loads(profiler.to_json()) == report
+    assert "outer" in profiler.summary(limit=1)
+
+
+def test_spans_from_several_threads():
+    profiler = Profiler()
+
+    @profiler.profiled("work")
+    def work():
+        with profiler.span("step", 1):
+            pass
+
+    threads = [threading.Thread(target=lambda: [work() for _ in range(100)]) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert profiler.report()["work"]["calls"] == 400 and profiler.report()["step"]["steps"] == 400
+
+
+def test_disabled_profiler_records_nothing():
+    profiler = Profiler(enabled=False)
+    with profiler.span("stage", 10):
+        pass
+    assert profiler.report() == {}
+
+
+def test_engine_spans_report_array_bytes(monkeypatch):
+    profiler = Profiler()
+    monkeypatch.setattr(random_walk, "span", profiler.span)
+    moves = random_walk.generate_moves(1000, random_walk.create_stream(42))
+    codes = random_walk.moves_to_codes(moves, 2)
+    positions = random_walk.codes_to_positions(codes, 2, (0, 0))
+    report = profiler.report()
+    assert report["rng"]["bytes"] == moves.nbytes
+    assert report["move_mapping"]["bytes"] == codes.nbytes
+    assert report["path_accumulation"]["bytes"] == positions.nbytes
+    assert "MiB" in profiler.summary()
@@ -0,0 +1,84 @@
+import numpy as np
+import pytest
+from random_generator import (CongruencialLineal, RandomStream, affine_power, lcg_period, lcg_states,
+                              states_to_numbers)
+
+A, C, M = 1 + 2 * 15686546789, 11, 2 ** 30
+
+
+def test_generate_block_matches_scalar_numbers():
+    scalar = CongruencialLineal(A, C, M, 42)
+    block = CongruencialLineal(A, C, M, 42)
+    expected = [scalar.generate_number() for _ in range(5000)]
+    assert block.generate_block(5000).tolist() == expected
+    assert block.xn == scalar.xn
+
+
+def test_generate_block_large_modulus_uses_exact_division():
+    m = 2 ** 64
+    scalar = CongruencialLineal(6364136223846793005, 1442695040888963407, m, 7)
+    block = CongruencialLineal(6364136223846793005, 1442695040888963407, m, 7)
+    expected = [scalar.generate_number() for _ in range(300)]
+    assert block.generate_block(300).tolist() == expected
+    assert block.xn == scalar.xn
+
+
+def test_jump_matches_stepping():
+    for k in (0, 1, 2, 1023, 123457):
+        stepped = CongruencialLineal(A, C, M, 5)
+        for _ in range(k):
+            stepped.generate_xn()
+        jumped = CongruencialLineal(A, C, M, 5)
+        assert jumped.jump(k) == stepped.xn
+
+
+def test_affine_power_composes():
+    a1, c1 = affine_power(A, C, M, 300)
+    a2, c2 = affine_power(A, C, M, 700)
+    a3, c3 = affine_power(A, C, M, 1000)
+    assert ((a2 * a1) % M, (a2 * c1 + c2) % M) == (a3, c3)
+
+
+def test_lcg_states_for_several_starts():
+    starts = np.array([1, 99, 12345], dtype=np.uint64)
+    states = lcg_states(A, C, M, starts, 50)
+    for row, start in zip(states, starts):
+        generator = CongruencialLineal(A, C, M, int(start))
+        assert row.tolist() == [generator.generate_xn() for _ in range(50)]
+    assert np.array_equal(states_to_numbers(states, M), states.astype(np.float64) / (M - 1))
+
+
+def test_spawn_partitions_the_sequence():
+    stream = RandomStream(A, C, M, 42)
+    stream.generate_block(100)  # El estado actual no afecta a las subsecuencias
+    stride = 1000
+    reference = CongruencialLineal(A, C, M, 42).generate_xn_block(4 * stride)
+    for index in (2, 0, 3):
+        child = stream.spawn(index, stride)
+        assert child.generate_xn_block(stride).tolist() == reference[index * stride:(index + 1) * stride].tolist()
+    assert stream.spawn(1, stride).generate_xn_block(10).tolist() == \
+        stream.spawn(1, stride).generate_xn_block(10).tolist()
+
+
+def test_spawn_rejects_overlapping_indices():
+    stream = RandomStream(A, C, M, 42)
+    with pytest.raises(ValueError):
+        stream.spawn(-1)
+    period = M // 2  # a % 4 == 3: el ciclo es la mitad del módulo
+    with pytest.raises(ValueError):
+        stream.spawn(period // 1000, 1000)
+    stream.spawn(period // 1000 - 1, 1000)
+    jump_a, jump_c = affine_power(A, C, M, period)
+    assert (jump_a * 42 + jump_c) % M == 42  # El índice 1 con este tramo repetiría el índice 0
+    with pytest.raises(ValueError):
+        stream.spawn(1, period)
+
+
+def test_lcg_period_matches_brute_force():
+    assert lcg_period(A, C, M, 42) == M // 2
+    for a, c, m in [(5, 3, 64), (3, 1, 64), (7, 2, 64), (4, 1, 9), (13, 6, 100)]:
+        for seed in range(0, m, 7):
+            x, k = (a * seed + c) % m, 1
+            while x != seed:
+                x, k = (a * x + c) % m, k + 1
+            assert lcg_period(a, c, m, seed) == k
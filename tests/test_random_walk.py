@@ -0,0 +1,144 @@
+import numpy as np
+import pytest
+import random_walk
+from random_generator import CongruencialLineal
+
+# Implementación escalar original (baseline), usada como referencia bit a bit
+
+
+def reference_process_1d(move, step):
+    return step + 1 if move > 0.5 else step - 1
+
+
+def reference_process_2d(move):
+    if move <= 0.25:
+        return 1, 0
+    if move <= 0.5:
+        return -1, 0
+    if move <= 0.75:
+        return 0, 1
+    return 0, -1
+
+
+def reference_process_3d(move):
+    for index, threshold in enumerate((1 / 6, 2 / 6, 3 / 6, 4 / 6, 5 / 6)):
+        if move <= threshold:
+            break
+    else:
+        index = 5
+    step = [0, 0, 0]
+    step[index // 2] = 1 if index % 2 == 0 else -1
+    return tuple(step)
+
+
+def reference_walk(steps, dim, source, seed):
+    generator = CongruencialLineal(random_walk.a, random_walk.c, random_walk.m, seed)
+    moves = [generator.generate_number() for _ in range(steps)]
+    position = list(source)
+    path = [tuple(position)]
+    for move in moves:
+        if dim == 1:
+            position[0] = reference_process_1d(move, position[0])
+        else:
+            delta = reference_process_2d(move) if dim == 2 else reference_process_3d(move)
+            position = [p + d for p, d in zip(position, delta)]
+        path.append(tuple(position))
+    return np.array(path, dtype=np.float64)
+
+
+@pytest.fixture
+def global_seed(monkeypatch):
+    monkeypatch.setattr(random_walk, "seed", 42)
+    return 42
+
+
+def test_random_walk_1d_matches_reference(global_seed):
+    path = random_walk.random_walk_1d(20000, 3)
+    assert path.dtype == np.float64
+    assert np.array_equal(path, reference_walk(20000, 1, (3,), global_seed)[:, 0])
+    assert random_walk.seed == global_seed + 10
+
+
+def test_random_walk_2d_matches_reference(global_seed):
+    x, y = random_walk.random_walk_2d(20000, (1, -2))
+    expected = reference_walk(20000, 2, (1, -2), global_seed)
+    assert np.array_equal(x, expected[:, 0]) and np.array_equal(y, expected[:, 1])
+
+
+def test_random_walk_3d_matches_reference(global_seed):
+    x, y, z = random_walk.random_walk_3d(20000, (0, 0, 5))
+    expected = reference_walk(20000, 3, (0, 0, 5), global_seed)
+    assert np.array_equal(np.column_stack([x, y, z]), expected)
+
+
+def test_threshold_boundaries_match_reference():
+    # Valores exactamente en los umbrales: el intervalo es (t[i - 1], t[i]]
+    for dim, process in ((2, reference_process_2d), (3, reference_process_3d)):
+        table = random_walk.step_table(dim)
+        moves = np.concatenate([table.thresholds, [0.0, 1.0], np.nextafter(table.thresholds, 1)])
+        deltas = table.deltas[table.codes(moves)]
+        assert [tuple(row) for row in deltas.tolist()] == [process(move) for move in moves]
+    codes = random_walk.step_table(1).codes(np.array([0.0, 0.5, np.nextafter(0.5, 1), 1.0]))
+    assert random_walk.step_table(1).deltas[codes, 0].tolist() == [-1, -1, 1, 1]
+
+
+def test_stream_walk_does_not_touch_global_seed(global_seed):
+    path = random_walk.random_walk_1d(100, 0, random_walk.create_stream(7))
+    assert random_walk.seed == global_seed
+    assert np.array_equal(path, reference_walk(100, 1, (0,), 7)[:, 0])
+
+
+def reference_go_to(dim, source, target, generator, max_steps=None):
+    position = list(source)
+    path = [tuple(position)]
+    while tuple(position) != tuple(target) and (max_steps is None or len(path) <= max_steps):
+        move = generator.generate_number()
+        if dim == 1:
+            position[0] = reference_process_1d(move, position[0])
+        else:
+            delta = reference_process_2d(move) if dim == 2 else reference_process_3d(move)
+            position = [p + d for p, d in zip(position, delta)]
+        path.append(tuple(position))
+    return np.array(path, dtype=np.float64)
+
+
+@pytest.fixture
+def global_stream(monkeypatch, global_seed):
+    stream = random_walk.RandomStream(random_walk.a, random_walk.c, random_walk.m, global_seed)
+    monkeypatch.setattr(random_walk, "next_step_generator", stream)
+    return stream
+
+
+@pytest.mark.parametrize("dim, target", [(1, (40,)), (2, (6, -4)), (3, (1, 0, 0))])
+def test_go_to_matches_reference(global_stream, global_seed, dim, target):
+    source = (0,) * dim
+    expected = reference_go_to(dim, source, target, CongruencialLineal(random_walk.a, random_walk.c,
+                                                                       random_walk.m, global_seed))
+    go_to = {1: random_walk.go_to_1d, 2: random_walk.go_to_2d, 3: random_walk.go_to_3d}[dim]
+    hitting_time, path = go_to(source[0] if dim == 1 else source, target[0] if dim == 1 else target,
+                               return_time=True)
+    path = np.column_stack(path) if dim > 1 else path[:, np.newaxis]
+    assert np.array_equal(path, expected)
+    assert hitting_time == len(expected) - 1
+    assert random_walk.seed == global_seed + 10
+
+
+def test_go_to_truncated_search_has_no_time():
+    stream = random_walk.create_stream(3)
+    hitting_time, (x, y) = random_walk.go_to_2d((0, 0), (500, 500), max_steps=1000, stream=stream,
+                                                return_time=True)
+    assert hitting_time is None
+    assert len(x) == 1001
+    expected = reference_go_to(2, (0, 0), (500, 500), random_walk.create_stream(3), max_steps=1000)
+    assert np.array_equal(np.column_stack([x, y]), expected)
+    assert random_walk.go_to_1d(0, 0, stream=stream, return_time=True)[0] == 0
+
+
+def test_zero_weight_steps_are_never_taken():
+    table = random_walk.StepTable.lattice(2, [0, 1, 0, 3])
+    assert table.deltas.tolist() == [[-1, 0], [0, -1]]
+    assert table.probabilities.tolist() == [0.25, 0.75]
+    moves = np.array([0.0, 0.25, np.nextafter(0.25, 1), 1.0])
+    assert table.deltas[table.codes(moves)].tolist() == [[-1, 0], [-1, 0], [0, -1], [0, -1]]
+    with pytest.raises(ValueError):
+        random_walk.StepTable([[1], [-1]], [0, 0])
@@ -0,0 +1,36 @@
+import numpy as np
+import random_walk
+import streaming
+
+
+def test_chunks_concatenate_to_walk_positions(make_path):
+    chunks = list(streaming.iter_walk(2, (3, -1), chunk_size=777, steps=5000, stream=random_walk.create_stream(42)))
+    assert np.array_equal(np.concatenate(chunks), make_path(5000, 2, (3, -1)))
+
+
+def test_legacy_occupancy_counter_result_format(make_path):
+    path = make_path(20000, 2)
+    counter = streaming.OccupancyCounter()
+    for start in range(0, len(path), 3000):
+        counter.update(path[start:start + 3000])
+    origin, counts = counter.result()
+    assert np.array_equal(origin, path.min(axis=0))
+    assert counts.shape == tuple(path.max(axis=0) - path.min(axis=0) + 1)
+    sites, visits = np.unique(path, axis=0, return_counts=True)
+    assert np.array_equal(counts[tuple((sites - origin).T)], visits)
+    assert counts.sum() == len(path)
+
+
+def test_empty_legacy_counter_without_dim(make_path):
+    empty = streaming.OccupancyCounter()
+    sites, counts = empty.sites()
+    assert sites.shape == (0, 0) and len(counts) == 0
+    assert empty.result() == (None, None)
+    counter = streaming.OccupancyCounter()
+    counter.merge(empty)
+    path = make_path(500, 3)
+    filled = streaming.OccupancyCounter()
+    filled.update(path)
+    counter.merge(filled)
+    assert counter.dim == 3
+    assert np.array_equal(counter.result()[1], filled.result()[1])
@@ -0,0 +1,42 @@
+import numpy as np
+import pytest
+import random_walk
+from walk_cache import WalkCache, cache_key
+from walk_path import WalkPath
+
+
+def test_cache_key_serializes_step_tables():
+    moore = random_walk.StepTable.moore(2)
+    assert cache_key("walk", moore) == cache_key("walk", random_walk.StepTable.moore(2))
+    assert cache_key("walk", moore) != cache_key("walk", random_walk.step_table(2))
+    with pytest.raises(TypeError):
+        cache_key(object())
+
+
+def test_walks_are_prefixes_and_extensions(tmp_path, make_generator):
+    cache = WalkCache(directory=str(tmp_path))
+    long_walk = cache.walk(3000, 2, (0, 0), 7)
+    assert np.array_equal(long_walk.positions(), WalkPath.generate(3000, 2, (0, 0), make_generator(7)).positions())
+    assert np.array_equal(cache.walk(1000, 2, (0, 0), 7).positions(), long_walk.positions(0, 1001))
+    longer = cache.walk(5000, 2, (0, 0), 7)
+    assert np.array_equal(longer.positions(), WalkPath.generate(5000, 2, (0, 0), make_generator(7)).positions())
+
+
+def test_disk_hits_are_promoted_to_memory(tmp_path, monkeypatch):
+    WalkCache(directory=str(tmp_path)).walk(2000, 3, (0, 0, 0), 11)
+    cache = WalkCache(directory=str(tmp_path))
+    loads = []
+    original = cache._load
+    monkeypatch.setattr(cache, "_load", lambda key: loads.append(key) or original(key))
+    first = cache.walk(2000, 3, (0, 0, 0), 11)
+    second = cache.walk(1500, 3, (0, 0, 0), 11)
+    assert len(loads) == 1
+    assert np.array_equal(second.positions(), first.positions(0, 1501))
+
+
+def test_custom_tables_are_cached_in_memory(tmp_path, make_generator):
+    cache = WalkCache(directory=str(tmp_path))
+    moore = random_walk.StepTable.moore(2)
+    walk = cache.walk(1000, moore, (0, 0), 5)
+    assert np.array_equal(walk.positions(), WalkPath.generate(1000, moore, (0, 0), make_generator(5)).positions())
+    assert cache.walk(500, moore, (0, 0), 5).steps == 500
@@ -0,0 +1,100 @@
+import threading
+import numpy as np
+import pytest
+import random_walk
+import walk_path
+from walk_path import WalkPath
+
+
+def test_generate_reports_progress_and_stops(monkeypatch):
+    monkeypatch.setattr(walk_path, "WALK_CHECKPOINT_CHUNK", 1000)
+    chunks = []
+    walk = WalkPath.generate(3500, 2, (2, 2), random_walk.create_stream(9), progress=chunks.append)
+    assert [len(chunk) for chunk in chunks] == [1000, 1000, 1000, 500]
+    assert np.array_equal(np.concatenate(chunks), walk.positions(1))
+    assert np.array_equal(walk.positions(), random_walk.walk_positions(3500, 2, (2, 2), random_walk.create_stream(9)))
+
+    stop = threading.Event()
+    stop.set()
+    assert WalkPath.generate(3500, 2, (2, 2), random_walk.create_stream(9), stop_event=stop) is None
+
+
+@pytest.mark.parametrize("dim", [1, 2, 3])
+def test_walk_path_matches_walk_positions(dim, make_generator, make_path):
+    source = tuple(range(1, dim + 1))
+    expected = make_path(5000, dim, source)
+    walk = WalkPath.generate(5000, dim, source, make_generator(), checkpoint_interval=256)
+    assert np.array_equal(walk.positions(), expected)
+    assert np.array_equal(walk.positions(700, 2300), expected[700:2300])
+    narrow = walk.positions(dtype=np.int32)
+    assert narrow.dtype == np.int32 and np.array_equal(narrow, expected)
+    for step in (0, 1, 255, 256, 257, 4999, 5000):
+        assert np.array_equal(walk.position_at(step), expected[step])
+    with pytest.raises(IndexError):
+        walk.position_at(5001)
+    for index in range(dim):
+        assert np.array_equal(walk.axis(index, 10, 90), expected[10:90, index])
+    arrays = walk.to_arrays()
+    if dim == 1:
+        assert arrays.dtype == np.float64 and np.array_equal(arrays, expected[:, 0])
+    else:
+        assert len(arrays) == dim
+        assert all(np.array_equal(arrays[index], expected[:, index]) for index in range(dim))
+
+
+def test_prefix_and_extended_reuse_the_walk(make_generator, make_path):
+    expected = make_path(5000, 2, (1, -1))
+    walk = WalkPath.generate(5000, 2, (1, -1), make_generator(), checkpoint_interval=256)
+    empty = walk.prefix(0)
+    assert empty.steps == 0 and np.array_equal(empty.positions(), expected[:1])
+    head = walk.prefix(3000)
+    assert np.array_equal(head.positions(), expected[:3001])
+    assert np.shares_memory(head.codes, walk.codes)
+    for start in (head, empty):
+        grown = start.extended(walk.codes[start.steps:])
+        assert np.array_equal(grown.positions(), expected)
+        assert np.array_equal(grown.checkpoints, walk.checkpoints)
+
+
+def test_seekable_walk_matches_full_walk(make_generator):
+    expected = random_walk.walk_positions(10000, 2, (1, 1), make_generator())
+    generator = make_generator()
+    walk = walk_path.SeekableWalk(10000, 2, (1, 1), generator, checkpoint_interval=512)
+    reference = make_generator()
+    reference.jump(10000)
+    assert generator.xn == reference.xn
+    for step in (0, 1, 511, 512, 513, 9999, 10000):
+        assert np.array_equal(walk.position_at(step), expected[step])
+    assert np.array_equal(walk.slice(700, 2300), expected[700:2300])
+    assert np.array_equal(walk.slice(9990, 20000), expected[9990:])
+    assert np.array_equal(walk.window(3, 9).positions(), expected[3:9])
+
+
+def test_empty_slices(make_generator):
+    walk = walk_path.SeekableWalk(1000, 3, (0, 0, 0), make_generator(), checkpoint_interval=64)
+    for start, stop in ((10, 10), (10, 5), (1001, 2000)):
+        assert walk.slice(start, stop).shape == (0, 3)
+    with pytest.raises(ValueError):
+        walk.window(10, 10)
+
+
+def test_cancelled_walk_advances_generator_only_by_its_steps(monkeypatch, make_generator):
+    monkeypatch.setattr(walk_path, "WALK_CHECKPOINT_CHUNK", 1024)
+    stop = threading.Event()
+    calls = []
+    original = walk_path._walk_codes
+
+    def codes_then_stop(generator, steps, table):
+        calls.append(steps)
+        if len(calls) == 2:
+            stop.set()
+        return original(generator, steps, table)
+
+    monkeypatch.setattr(walk_path, "_walk_codes", codes_then_stop)
+    generator = make_generator()
+    walk = walk_path.SeekableWalk(10000, 1, (0,), generator, checkpoint_interval=256, stop_event=stop)
+    assert walk.steps == 2048
+    reference = make_generator()
+    reference.jump(2048)
+    assert generator.xn == reference.xn
+    assert np.array_equal(walk.slice(0, 2049), random_walk.walk_positions(2048, 1, (0,), make_generator()))
@@ -0,0 +1,54 @@
+import json
+import os
+import numpy as np
+import pytest
+import random_walk
+from walk_path import WalkPath
+from walk_store import CODES_FILE, META_FILE, WalkWriter, open_walk, save_walk
+
+
+def test_generated_walk_round_trips(tmp_path, make_generator, make_path):
+    with WalkWriter(str(tmp_path), 2, (1, -1), make_generator(), checkpoint_interval=64) as writer:
+        writer.generate(5000, chunk_size=700)
+    walk, meta = open_walk(str(tmp_path))
+    assert np.array_equal(walk.positions(), make_path(5000, 2, (1, -1)))
+    assert meta["seed"] == 42 and meta["steps"] == 5000
+
+
+def test_interrupted_writer_can_be_resumed(tmp_path, make_generator, make_path):
+    writer = WalkWriter(str(tmp_path), 3, (0, 0, 0), make_generator(), checkpoint_interval=100)
+    assert os.path.exists(os.path.join(str(tmp_path), META_FILE))
+    writer.generate(3000, chunk_size=1000)
+    # Simula una caída a mitad del bloque siguiente, sin llamar a close
+    writer.codes_file.write(b"\x05" * 123)
+    writer.codes_file.flush()
+    walk, meta = open_walk(str(tmp_path))
+    assert meta["steps"] == 3000
+    assert np.array_equal(walk.positions(), make_path(3000, 3, (0, 0, 0)))
+    del walk
+
+    with WalkWriter.resume(str(tmp_path)) as resumed:
+        resumed.generate(2000, chunk_size=1000)
+    walk, meta = open_walk(str(tmp_path))
+    assert np.array_equal(walk.positions(), make_path(5000, 3, (0, 0, 0)))
+    assert os.path.getsize(os.path.join(str(tmp_path), CODES_FILE)) == 5000
+
+
+def test_save_walk_records_seed(tmp_path, make_generator, make_path):
+    generator = make_generator(1234)
+    walk = WalkPath.from_moves(generator.generate_block(4000), 1, (0,))
+    save_walk(str(tmp_path), walk, generator)
+    with open(os.path.join(str(tmp_path), META_FILE)) as meta_file:
+        meta = json.load(meta_file)
+    assert meta["seed"] == 1234 and meta["state"] == generator.xn
+    with WalkWriter.resume(str(tmp_path)) as writer:
+        writer.generate(1000)
+    assert np.array_equal(open_walk(str(tmp_path))[0].positions(), make_path(5000, 1, (0,), seed=1234))
+
+
+def test_writer_accepts_only_lattice_tables(tmp_path, make_generator):
+    with WalkWriter(str(tmp_path / "lattice"), random_walk.step_table(2), (0, 0), make_generator()) as writer:
+        writer.generate(10)
+    assert open_walk(str(tmp_path / "lattice"))[1]["dim"] == 2
+    with pytest.raises(ValueError):
+        WalkWriter(str(tmp_path / "moore"), random_walk.StepTable.moore(2), (0, 0), make_generator())
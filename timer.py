@@ -3,10 +3,12 @@ import time  # Importa el módulo time
 
 
 class TimerApp:
-    def __init__(self, master):
-        # Constructor de la clase TimerApp, recibe un widget master como argumento
+    def __init__(self, master, profiler=None):
+        # Constructor de la clase TimerApp, recibe un widget master y opcionalmente un perfilador
+        # (profiling.Profiler) cuyas etapas se muestran junto al tiempo total
         self.start_time = 0  # Tiempo de inicio inicializado a 0
         self.master = master  # Widget principal de la aplicación
+        self.profiler = profiler  # Perfilador con el desglose por etapa
         self.master.title("Timer")  # Título de la ventana
 
         self.elapsed_time = 0  # Tiempo transcurrido inicializado a 0
@@ -16,6 +18,10 @@ class TimerApp:
         self.time_label = tk.Label(master, text="Tiempo transcurrido: 0.0 segundos")
         self.time_label.grid(row=2, column=5, columnspan=2, padx=10, pady=10)  # Ubicación de la etiqueta en la interfaz
 
+        # Etiqueta con el tiempo de cada etapa (generación, mapeo de movimientos, gráficas, ...)
+        self.stages_label = tk.Label(master, text="", justify=tk.LEFT)
+        self.stages_label.grid(row=7, column=0, columnspan=7, padx=10, pady=5, sticky="w")
+
     def start_stop_timer(self):
         # Método para iniciar o detener el temporizador
         if not self.running:
@@ -35,6 +41,7 @@ class TimerApp:
             self.elapsed_time = current_time - self.start_time  # Se calcula el tiempo transcurrido
             # Se actualiza la etiqueta con el tiempo transcurrido
             self.time_label.config(text="Tiempo transcurrido: {:.2f} segundos".format(self.elapsed_time))
+            self.update_stages()  # Se actualiza también el desglose por etapa
             # Se programa una llamada recursiva para actualizar el tiempo cada 200 milisegundos
             self.master.after(200, self.update_time)
 
@@ -44,3 +51,11 @@ class TimerApp:
         # Se actualiza la etiqueta para mostrar "Tiempo transcurrido: 0.0 segundos"
         self.time_label.config(text="Tiempo transcurrido: 0.0 segundos")
         self.running = False  # Se marca el temporizador como detenido
+        if self.profiler is not None:
+            self.profiler.reset()  # Se descartan las mediciones del cálculo anterior
+        self.update_stages()
+
+    def update_stages(self):
+        # Método para mostrar el desglose por etapa del perfilador
+        if self.profiler is not None:
+            self.stages_label.config(text=self.profiler.summary(limit=8))
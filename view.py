@@ -1,26 +1,51 @@
 import tkinter as tk
-from tkinter import messagebox
-import matplotlib.pyplot as plt
-import plotly.graph_objects as go
-from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg
+from tkinter import filedialog, messagebox
 import numpy as np
+import decimation
+import occupancy
 import random_walk
+from profiling import default_profiler, profiled, span
+from walk_cache import default_cache
+from walk_path import WalkPath
 from timer import TimerApp
 import threading
+import queue
 
 # Inicialización de variables globales
 running_threads = []  # Lista para almacenar hilos en ejecución
-stop_event = threading.Event()  # Evento para detener todos los hilos
+stop_event = threading.Event()  # Evento para detener el cálculo en curso (uno nuevo por cálculo)
+result_queue = queue.Queue()  # Mensajes (cálculo, tipo, datos) de los hilos hacia la interfaz
+current_job = 0  # Identificador del cálculo en curso; los mensajes de cálculos anteriores se descartan
+current_dim = 1  # Dimensión del cálculo en curso
+current_target = False  # Si el cálculo en curso busca una posición objetivo
 
 path_1d = []  # Almacenar la caminata aleatoria 1D
 xs, ys, zs = [], [], []  # Almacenar las posiciones para caminatas 2D y 3D
 
+PLOT_BUCKETS_1D = 1000  # Cubetas de la reducción M4, del orden del ancho de la gráfica en píxeles
+PLOT_RESOLUTION_2D = 500  # Celdas por eje al reducir la trayectoria 2D
+PLOT_RESOLUTION_3D = 200  # Celdas por eje al reducir la trayectoria 3D
+QUEUE_POLL_MS = 50  # Milisegundos entre revisiones de la cola de mensajes
+LIVE_MAX_POINTS = 20_000  # Puntos máximos de la vista previa mientras se genera la caminata
+
+live_points = None  # Puntos reducidos de la vista previa: (paso, posición) en 1D, (x, y) en 2D
+live_steps = 0  # Pasos recibidos por la vista previa
+live_figure, live_line = None, None
+
+# matplotlib y plotly tardan en importarse; se cargan al usarse para que la ventana aparezca antes
+plt = None  # matplotlib.pyplot
+FigureCanvasTkAgg, NavigationToolbar2Tk = None, None
+go = None  # plotly.graph_objects
+plotly_thread = None  # Hilo que importa plotly en segundo plano
+
 
 # Función para detener todos los hilos en ejecución
 def stop_all_threads():
-    global running_threads
+    global running_threads, current_job
     reset_timer()  # Reiniciar el temporizador
-    stop_event.set()  # Establecer el evento de parada
+    stop_event.set()  # Establecer el evento de parada; los hilos lo revisan entre bloques
+    current_job += 1  # Descartar los mensajes que aún envíen los hilos detenidos
+    running_threads = [thread for thread in running_threads if thread.is_alive()]
 
 
 # Funciones para iniciar, detener y reiniciar un temporizador (presumiblemente definidas en otro lugar)
@@ -36,24 +61,79 @@ def reset_timer():
     timer_app.reset_timer()  # Llamar al método reset_timer de TimerApp
 
 
+# Funciones para cargar las bibliotecas de gráficas la primera vez que se necesitan
+@profiled("load_matplotlib")
+def load_matplotlib():
+    global plt, FigureCanvasTkAgg, NavigationToolbar2Tk
+    if plt is None:
+        import matplotlib.pyplot as pyplot
+        from matplotlib.backends import backend_tkagg
+        FigureCanvasTkAgg, NavigationToolbar2Tk = backend_tkagg.FigureCanvasTkAgg, backend_tkagg.NavigationToolbar2Tk
+        plt = pyplot
+
+
+@profiled("load_plotly")
+def load_plotly():
+    global go
+    if go is None:
+        import plotly.graph_objects as graph_objects
+        go = graph_objects
+
+
+def preload_plotly():
+    global plotly_thread
+    if go is None and plotly_thread is None:
+        plotly_thread = threading.Thread(target=load_plotly, daemon=True)
+        plotly_thread.start()
+
+
 # Función para trazar la caminata aleatoria 1D
+@profiled("plot_1d")
 def plot_1d(path):
+    load_matplotlib()
     plt.figure(1)
-    plt.plot(path)
+    with span("plot_preparation", len(path)) as stage:
+        steps, positions = decimation.m4_decimate(path, PLOT_BUCKETS_1D)
+        stage.add(nbytes=steps.nbytes + positions.nbytes)
+    line, = plt.plot(steps, positions)
     plt.xlabel('Paso')
     plt.ylabel('Posición')
     plt.title('Trayectoria de la rana')
+    # Al hacer zoom se vuelve a reducir solo el tramo visible, con todo su detalle
+    plt.gca().callbacks.connect('xlim_changed', lambda ax: redecimate_1d(ax, line, path))
 
     canvas1 = FigureCanvasTkAgg(plt.gcf(), master=root)
     canvas1.draw()
     canvas1.get_tk_widget().grid(row=4, column=0, padx=10, pady=10, columnspan=3)
+    add_toolbar(canvas1, column=0, columnspan=3)
+
+
+def redecimate_1d(ax, line, path):
+    start, stop = ax.get_xlim()
+    start = max(int(np.floor(start)), 0)
+    stop = min(int(np.ceil(stop)) + 1, len(path))
+    if start < stop:
+        line.set_data(*decimation.m4_decimate(path[start:stop], PLOT_BUCKETS_1D, offset=start))
+
+
+# Función para agregar la barra de navegación (zoom y desplazamiento) debajo de una gráfica
+def add_toolbar(canvas, column, columnspan):
+    toolbar = NavigationToolbar2Tk(canvas, root, pack_toolbar=False)
+    toolbar.update()
+    toolbar.grid(row=5, column=column, columnspan=columnspan)
 
 
 # Función para trazar la caminata aleatoria 2D
 
+@profiled("plot_2d")
 def plot_2d(x, y):
+    load_matplotlib()
     fig, ax = plt.subplots(figsize=(5, 5))
-    ax.plot(x, y)
+    with span("plot_preparation", len(x)) as stage:
+        points = np.column_stack([x, y])
+        kept = decimation.spatial_decimate(points, PLOT_RESOLUTION_2D)
+        stage.add(nbytes=points.nbytes + kept.nbytes)
+    line, = ax.plot(x[kept], y[kept])
     plt.title('Trayectoria de la rana')
 
     ax.axhline(0, color='black', linestyle='--', linewidth=0.5)  # Línea horizontal en y=0
@@ -61,16 +141,32 @@ def plot_2d(x, y):
     ax.plot(x[-1], y[-1], 'ro')  # 'ro' para un punto rojo
     ax.annotate(f'({x[-1]}, {y[-1]})', (x[-1], y[-1]), textcoords="offset points", xytext=(-10, 10), ha='center')
 
+    ax.callbacks.connect('xlim_changed', lambda axes: redecimate_2d(axes, line, points))
+    ax.callbacks.connect('ylim_changed', lambda axes: redecimate_2d(axes, line, points))
+
     canvas1 = FigureCanvasTkAgg(plt.gcf(), master=root)
     canvas1.draw()
     canvas1.get_tk_widget().grid(row=4, column=0, padx=10, pady=10, columnspan=7)
+    add_toolbar(canvas1, column=0, columnspan=7)
+
+
+def redecimate_2d(ax, line, points):
+    (x_min, x_max), (y_min, y_max) = ax.get_xlim(), ax.get_ylim()
+    kept = decimation.spatial_decimate(points, PLOT_RESOLUTION_2D, bounds=((x_min, y_min), (x_max, y_max)))
+    line.set_data(points[kept, 0], points[kept, 1])
 
 
 # Función para trazar la caminata aleatoria 3D
+@profiled("plot_3d")
 def plot_3d(x, y, z):
-    time = np.array(range(0, len(x)))
+    if plotly_thread is not None:
+        plotly_thread.join()  # plotly se empezó a importar al iniciar el cálculo
+    load_plotly()
+    with span("plot_preparation", len(x)) as stage:
+        time = decimation.spatial_decimate(np.column_stack([x, y, z]), PLOT_RESOLUTION_3D)
+        stage.add(nbytes=time.nbytes)
     fig = go.Figure(data=go.Scatter3d(
-        x=x, y=y, z=z,
+        x=x[time], y=y[time], z=z[time],
         marker=dict(
             size=4,
             color=time,
@@ -87,8 +183,12 @@ def plot_3d(x, y, z):
 
 
 # Función para trazar la frecuencia de valores en una caminata aleatoria
+@profiled("plot_frequency")
 def plot_frequency(path):
-    unique_values, counts = np.unique(path, return_counts=True)
+    load_matplotlib()
+    with span("occupancy", len(path)) as stage:
+        unique_values, counts = occupancy.occupancy_1d(path)
+        stage.add(nbytes=unique_values.nbytes + counts.nbytes)
     plt.figure(2)
     plt.bar(unique_values, counts)
     plt.xlabel('Valor')
@@ -103,16 +203,21 @@ def plot_frequency(path):
 # Función para reiniciar las gráficas
 def restart_plots():
     stop_all_threads()  # Detener todos los hilos
+    clear_live_plot()
     label_total_steps.config(text=f"Se alcanzó el objetivo en 0 pasos")
-    plt.close('all')  # Cerrar todas las gráficas
-    for widget in root.grid_slaves(row=4):  # Encuentra los widgets en la fila 4 (donde se encuentran las gráficas)
-        widget.grid_forget()  # Olvida los widgets de la cuadrícula
+    if plt is not None:
+        plt.close('all')  # Cerrar todas las gráficas
+    for row in (4, 5):  # Filas de las gráficas (4) y de sus barras de navegación (5)
+        for widget in root.grid_slaves(row=row):
+            widget.grid_forget()  # Olvida los widgets de la cuadrícula
 
 
 # Función para calcular la caminata aleatoria según la dimensión seleccionada
 def calculate(dim):
-    global stop_event
-    stop_event.clear()  # Limpiar el evento de detención
+    global stop_event, current_job, current_dim, current_target
+    stop_event.set()  # Detener el cálculo anterior, que libera el generador compartido
+    stop_event = threading.Event()  # Evento de detención propio de este cálculo
+    current_job += 1
     reset_timer()  # Reiniciar el temporizador
     label_total_steps.config(text=f"Se alcanzó el objetivo en 0 pasos")  # Actualizar la etiqueta de pasos
 
@@ -130,44 +235,50 @@ def calculate(dim):
         start_stop_timer()  # Iniciar el temporizador
 
         option = option_var.get()  # Obtener la opción seleccionada (Pasos u Objetivo)
+        current_dim = dim + 1
+        current_target = option != "Pasos"
+        job = (current_job, stop_event)
         if option == "Pasos":
+            start_live_plot((x_position, y_position, z_position)[:dim + 1])
             if dim == 0:
-                thread = threading.Thread(target=generate_random_walk_1d, args=(steps, x_position))
+                thread = threading.Thread(target=generate_random_walk_1d, args=(*job, steps, x_position))
                 thread.start()
                 running_threads.append(thread)
             elif dim == 1:
-                thread = threading.Thread(target=generate_random_walk_2d, args=(steps, x_position, y_position))
+                thread = threading.Thread(target=generate_random_walk_2d, args=(*job, steps, x_position, y_position))
                 thread.start()
                 running_threads.append(thread)
             else:
                 thread = threading.Thread(target=generate_random_walk_3d,
-                                          args=(steps, x_position, y_position, z_position))
+                                          args=(*job, steps, x_position, y_position, z_position))
                 thread.start()
                 running_threads.append(thread)
         else:
+            start_live_plot((0, 0, 0)[:dim + 1])
             if dim == 0:
-                thread = threading.Thread(target=generate_random_target_1d, args=(x_position,))
+                thread = threading.Thread(target=generate_random_target_1d, args=(*job, x_position))
                 thread.start()
                 running_threads.append(thread)
-                probability = random_walk.calculate_1d_probability(abs(x_position), 0, x_position)
+                probability = default_cache.probability(abs(x_position), 0, x_position, 1)
                 label_probability.config(text=f"La probabilidad de llegar a la posición {x_position} en "
                                               f"{abs(x_position)} pasos es {probability}")
             elif dim == 1:
-                thread = threading.Thread(target=generate_random_target_2d, args=(x_position, y_position))
+                thread = threading.Thread(target=generate_random_target_2d, args=(*job, x_position, y_position))
                 thread.start()
                 running_threads.append(thread)
                 min_steps = random_walk.get_manhattan_distance((0, 0), (x_position, y_position))
-                probability = random_walk.calculate_2d_probability(min_steps, (0, 0), (x_position, y_position))
+                probability = default_cache.probability(min_steps, (0, 0), (x_position, y_position), 2)
                 label_probability.config(
                     text=f"La probabilidad de llegar a la posición ( {x_position}, {y_position} ) en {min_steps} "
                          f"pasos es {probability}")
             else:
-                thread = threading.Thread(target=generate_random_target_3d, args=(x_position, y_position, z_position))
+                thread = threading.Thread(target=generate_random_target_3d,
+                                          args=(*job, x_position, y_position, z_position))
                 thread.start()
                 running_threads.append(thread)
                 min_steps = random_walk.get_manhattan_distance((0, 0, 0), (x_position, y_position, z_position))
-                probability = random_walk.calculate_3d_probability(min_steps, (0, 0, 0), (x_position,
-                                                                                          y_position, z_position))
+                probability = default_cache.probability(min_steps, (0, 0, 0), (x_position, y_position, z_position),
+                                                        3)
                 label_probability.config(
                     text=f"La probabilidad de llegar a la posición ( {x_position}, {y_position}, {z_position} ) en "
                          f"{min_steps} pasos es {probability}")
@@ -176,63 +287,161 @@ def calculate(dim):
         messagebox.showerror("Error", "Por favor, ingresa valores numéricos válidos.")
 
 
-# Funciones para generar la caminata aleatoria y el objetivo de manera asíncrona
-def generate_random_walk_1d(steps, x_position):
-    global path_1d
-    path_1d = random_walk.random_walk_1d(steps, x_position)
-    root.event_generate("<<RandomWalkGenerated>>")
+# Funciones para generar la caminata aleatoria y el objetivo de manera asíncrona. Los hilos no tocan
+# la interfaz: publican en result_queue los bloques de posiciones y el resultado final
+def publish_chunks(job):
+    return lambda positions: result_queue.put((job, "chunk", positions))
 
 
-def generate_random_target_1d(x_target):
-    global path_1d
-    path_1d = random_walk.go_to_1d(0, x_target)
-    root.event_generate("<<RandomWalkGenerated>>")
-    label_total_steps.config(text=f"Se alcanzó el objetivo en {len(path_1d) - 1} pasos")
+@profiled("walk_generation")
+def generate_random_walk_1d(job, stop, steps, x_position):
+    walk = WalkPath.generate(steps, 1, (x_position,), progress=publish_chunks(job), stop_event=stop)
+    if walk is not None:
+        result_queue.put((job, "done", walk.to_arrays()))
 
 
-def generate_random_walk_2d(steps, x_position, y_position):
-    global xs, ys
-    xs, ys = random_walk.random_walk_2d(steps, (x_position, y_position))
-    root.event_generate("<<2DRandomWalkGenerated>>")
+@profiled("target_search")
+def generate_random_target_1d(job, stop, x_target):
+    path = random_walk.go_to_1d(0, x_target, stop_event=stop, progress=publish_chunks(job))
+    if not stop.is_set():
+        result_queue.put((job, "done", path))
 
 
-def generate_random_target_2d(x_target, y_target):
-    global xs, ys
-    xs, ys = random_walk.go_to_2d((0, 0), (x_target, y_target))
-    root.event_generate("<<2DRandomWalkGenerated>>")
-    label_total_steps.config(text=f"Se alcanzó el objetivo en {len(xs) - 1} pasos")
+@profiled("walk_generation")
+def generate_random_walk_2d(job, stop, steps, x_position, y_position):
+    walk = WalkPath.generate(steps, 2, (x_position, y_position), progress=publish_chunks(job), stop_event=stop)
+    if walk is not None:
+        result_queue.put((job, "done", walk.to_arrays()))
 
 
-def generate_random_walk_3d(steps, x_position, y_position, z_position):
-    global xs, ys, zs
-    xs, ys, zs = random_walk.random_walk_3d(steps, (x_position, y_position, z_position))
-    root.event_generate("<<3DRandomWalkGenerated>>")
+@profiled("target_search")
+def generate_random_target_2d(job, stop, x_target, y_target):
+    path = random_walk.go_to_2d((0, 0), (x_target, y_target), stop_event=stop, progress=publish_chunks(job))
+    if not stop.is_set():
+        result_queue.put((job, "done", path))
 
 
-def generate_random_target_3d(x_target, y_target, z_target):
-    global xs, ys, zs
-    xs, ys, zs = random_walk.go_to_3d((0, 0, 0), (x_target, y_target, z_target))
-    root.event_generate("<<3DRandomWalkGenerated>>")
-    label_total_steps.config(text=f"Se alcanzó el objetivo en {len(xs) - 1} pasos")
+@profiled("walk_generation")
+def generate_random_walk_3d(job, stop, steps, x_position, y_position, z_position):
+    walk = WalkPath.generate(steps, 3, (x_position, y_position, z_position), progress=publish_chunks(job),
+                             stop_event=stop)
+    if walk is not None:
+        result_queue.put((job, "done", walk.to_arrays()))
 
 
-# Manejadores de eventos para trazar las caminatas aleatorias después de ser generadas
-def on_random_walk_generated(event):
-    start_stop_timer()
-    plot_1d(path_1d)
-    plot_frequency(path_1d)
+@profiled("target_search")
+def generate_random_target_3d(job, stop, x_target, y_target, z_target):
+    path = random_walk.go_to_3d((0, 0, 0), (x_target, y_target, z_target), stop_event=stop,
+                                progress=publish_chunks(job))
+    if not stop.is_set():
+        result_queue.put((job, "done", path))
 
 
-def on_2d_random_walk_generated(event):
-    global xs, ys
+# Vaciado periódico de la cola en el hilo principal de Tk
+def drain_queue():
+    chunks = []
+    while True:
+        try:
+            job, kind, data = result_queue.get_nowait()
+        except queue.Empty:
+            break
+        if job != current_job:
+            continue  # Mensaje de un cálculo cancelado o reemplazado
+        if kind == "chunk":
+            chunks.append(data)
+        else:
+            chunks = []
+            on_walk_finished(data)
+    if chunks:
+        update_live_plot(chunks)
+    root.after(QUEUE_POLL_MS, drain_queue)
+
+
+# Vista previa incremental mientras se genera la caminata (la 3D solo muestra el avance)
+def start_live_plot(source):
+    global live_points, live_steps, live_figure, live_line
+    clear_live_plot()
+    live_steps = 0
+    live_points = np.array([[0, source[0]]] if len(source) == 1 else [source[:2]], dtype=np.int64)
+    label_progress.config(text=f"Pasos simulados: 0, posición actual: {tuple(source)}")
+    label_progress.grid(row=6, column=0, columnspan=7, padx=10, pady=5)
+    if len(source) == 3:
+        preload_plotly()  # Se importa mientras se genera la caminata
+        return
+    load_matplotlib()
+    live_figure, ax = plt.subplots(figsize=(5, 5))
+    live_line, = ax.plot(live_points[:, 0], live_points[:, 1])
+    ax.set_title('Trayectoria de la rana (en curso)')
+    canvas = FigureCanvasTkAgg(live_figure, master=root)
+    canvas.draw()
+    canvas.get_tk_widget().grid(row=4, column=0, padx=10, pady=10, columnspan=7)
+
+
+def update_live_plot(chunks):
+    global live_points, live_steps
+    for chunk in chunks:
+        first = live_steps + 1  # Paso de la primera posición del bloque
+        live_steps += len(chunk)
+        if live_line is None:
+            continue
+        if current_dim == 1:
+            steps, positions = decimation.m4_decimate(chunk[:, 0], PLOT_BUCKETS_1D, offset=first)
+            points = np.column_stack([steps, positions])
+        else:
+            points = chunk[decimation.spatial_decimate(chunk[:, :2], PLOT_RESOLUTION_2D)]
+        live_points = np.concatenate([live_points, points])
+    if len(live_points) > LIVE_MAX_POINTS:
+        if current_dim == 1:
+            kept, _ = decimation.m4_decimate(live_points[:, 1], PLOT_BUCKETS_1D)
+        else:
+            kept = decimation.spatial_decimate(live_points, PLOT_RESOLUTION_2D, max_points=LIVE_MAX_POINTS)
+        live_points = live_points[kept]
+    label_progress.config(text=f"Pasos simulados: {live_steps}, posición actual: {tuple(chunks[-1][-1].tolist())}")
+    if live_line is not None:
+        live_line.set_data(live_points[:, 0], live_points[:, 1])
+        live_line.axes.relim()
+        live_line.axes.autoscale_view()
+        live_figure.canvas.draw_idle()
+
+
+def clear_live_plot():
+    global live_figure, live_line
+    if live_figure is not None:
+        for widget in root.grid_slaves(row=4):
+            widget.grid_forget()
+        plt.close(live_figure)
+    live_figure, live_line = None, None
+    label_progress.grid_forget()
+
+
+# Manejador del resultado final: reemplaza la vista previa por las gráficas completas
+def on_walk_finished(data):
+    global path_1d, xs, ys, zs
+    clear_live_plot()
     start_stop_timer()
-    plot_2d(xs, ys)
+    if current_dim == 1:
+        path_1d = data
+        plot_1d(path_1d)
+        plot_frequency(path_1d)
+        total_steps = len(path_1d) - 1
+    elif current_dim == 2:
+        xs, ys = data
+        plot_2d(xs, ys)
+        total_steps = len(xs) - 1
+    else:
+        xs, ys, zs = data
+        plot_3d(xs, ys, zs)
+        total_steps = len(xs) - 1
+    if current_target:
+        label_total_steps.config(text=f"Se alcanzó el objetivo en {total_steps} pasos")
+    timer_app.update_stages()  # Desglose final, incluyendo las gráficas
 
 
-def on_3d_random_walk_generated(event):
-    global xs, ys, zs
-    start_stop_timer()
-    plot_3d(xs, ys, zs)
+# Función para guardar como JSON el desglose por etapa del último cálculo
+def export_profile():
+    path = filedialog.asksaveasfilename(defaultextension=".json", filetypes=[("JSON", "*.json")])
+    if path:
+        default_profiler.to_json(path)
 
 
 # Manejadores de eventos para actualizar la interfaz cuando se selecciona una dimensión u opción
@@ -278,7 +487,7 @@ def option_selected(event):
 # Crea la ventana principal
 root = tk.Tk()
 root.title("Caminatas aleatorias")
-timer_app = TimerApp(root)
+timer_app = TimerApp(root, default_profiler)
 
 # Crear el menú desplegable para seleccionar la dimensión
 dimension_var = tk.StringVar(root)
@@ -324,11 +533,13 @@ button_calculate.grid(row=2, column=0, columnspan=2, padx=10, pady=5)
 button_restart_plots = tk.Button(root, text="Reiniciar Gráficas", command=restart_plots)
 button_restart_plots.grid(row=2, column=3, columnspan=2, padx=10, pady=5)
 
+button_export_profile = tk.Button(root, text="Exportar perfil", command=export_profile)
+button_export_profile.grid(row=2, column=2, padx=10, pady=5)
+
 label_probability = tk.Label(root, text="Probabilidad:")
 label_total_steps = tk.Label(root, text=f"Se alcanzó el objetivo en 0 pasos")
+label_progress = tk.Label(root, text="Pasos simulados: 0")
 
 # Ejecuta el bucle principal de la aplicación
-root.bind("<<RandomWalkGenerated>>", on_random_walk_generated)
-root.bind("<<2DRandomWalkGenerated>>", on_2d_random_walk_generated)
-root.bind("<<3DRandomWalkGenerated>>", on_3d_random_walk_generated)
+root.after(QUEUE_POLL_MS, drain_queue)
 root.mainloop()
@@ -0,0 +1,230 @@
+import hashlib
+import json
+import os
+import shutil
+import threading
+from collections import OrderedDict
+import numpy as np
+import random_walk
+from profiling import span
+from random_generator import CongruencialLineal
+from walk_path import WALK_CHECKPOINT_CHUNK, WalkPath
+from walk_store import META_FILE, WalkWriter, open_walk, save_walk
+
+CACHE_MEMORY_BYTES = 256 * 2 ** 20  # Capacidad por defecto del nivel en memoria
+CACHE_DISK_BYTES = 4 * 2 ** 30  # Capacidad por defecto del nivel en disco
+PROBABILITY_ENTRY_BYTES = 256  # Tamaño contabilizado para cada probabilidad guardada
+
+
+def cache_key(*parts):
+    """
+        Calcula la clave de contenido de una consulta a partir de todas sus entradas.
+
+        Args:
+            parts: Valores que determinan el resultado (se serializan como JSON; una StepTable se
+                representa por sus umbrales y desplazamientos).
+
+        Returns:
+            str: Resumen hexadecimal SHA-256.
+    """
+    text = json.dumps(parts, default=_key_value)
+    return hashlib.sha256(text.encode()).hexdigest()
+
+
+def _key_value(value):
+    if isinstance(value, random_walk.StepTable):
+        return {"thresholds": value.thresholds.tolist(), "deltas": value.deltas.tolist()}
+    value = np.asarray(value)
+    if value.dtype == object:
+        raise TypeError(f"No se puede usar {type(value.item()).__name__} en una clave de caché")
+    return value.tolist()
+
+
+class LRUCache:
+    def __init__(self, max_bytes):
+        """
+        Constructor de la clase LRUCache: diccionario acotado por tamaño que descarta primero las
+        entradas usadas hace más tiempo.
+
+        Args:
+            max_bytes (int): Suma máxima de los tamaños de las entradas.
+        """
+        self.max_bytes = max_bytes
+        self.total_bytes = 0
+        self.entries = OrderedDict()
+        self.lock = threading.Lock()
+
+    def get(self, key):
+        with self.lock:
+            if key not in self.entries:
+                return None
+            self.entries.move_to_end(key)
+            return self.entries[key][0]
+
+    def put(self, key, value, nbytes):
+        with self.lock:
+            if key in self.entries:
+                self.total_bytes -= self.entries.pop(key)[1]
+            if nbytes > self.max_bytes:
+                return
+            self.entries[key] = (value, nbytes)
+            self.total_bytes += nbytes
+            while self.total_bytes > self.max_bytes:
+                _, (_, evicted_bytes) = self.entries.popitem(last=False)
+                self.total_bytes -= evicted_bytes
+
+    def clear(self):
+        with self.lock:
+            self.entries.clear()
+            self.total_bytes = 0
+
+
+class WalkCache:
+    def __init__(self, max_memory_bytes=CACHE_MEMORY_BYTES, directory=None, max_disk_bytes=CACHE_DISK_BYTES):
+        """
+        Constructor de la clase WalkCache: caché de caminatas y probabilidades indexada por todas las
+        entradas que las determinan (parámetros del generador, semilla, dimensión y origen).
+
+        Cada caminata se guarda una sola vez por flujo: una consulta más corta se sirve con un
+        prefijo y una más larga extiende la guardada generando solo los pasos que faltan.
+
+        Args:
+            max_memory_bytes (int): Capacidad del nivel en memoria.
+            directory (str): Directorio del nivel en disco (None para desactivarlo).
+            max_disk_bytes (int): Capacidad del nivel en disco.
+        """
+        self.memory = LRUCache(max_memory_bytes)
+        self.directory = directory
+        self.max_disk_bytes = max_disk_bytes
+        self.lock = threading.RLock()
+        if directory is not None:
+            os.makedirs(directory, exist_ok=True)
+
+    def walk(self, steps, dim, source, seed, a=random_walk.a, c=random_walk.c, m=random_walk.m, progress=None,
+             stop_event=None):
+        """
+        Devuelve la caminata de steps pasos generada con CongruencialLineal(a, c, m, seed).
+
+        Args:
+            steps (int): Número de pasos en la caminata.
+            dim (int | StepTable): Dimensión de la caminata o tabla de pasos.
+            source (tuple): Posición inicial con dim coordenadas.
+            seed (int): Semilla del generador.
+            a (int): Factor multiplicativo.
+            c (int): Término aditivo.
+            m (int): Módulo.
+            progress (callable): Recibe las posiciones int64 de forma (n, dim) de cada bloque generado
+                (None para omitirla); no se llama si la caminata ya estaba guardada.
+            stop_event (threading.Event): Evento de cancelación, se revisa entre bloques.
+
+        Returns:
+            WalkPath: Trayectoria igual a WalkPath.generate con ese generador, o None si se canceló.
+        """
+        source = [int(value) for value in np.array(source).reshape(random_walk.step_table(dim).dim)]
+        key = cache_key("walk", a, c, m, seed, dim, source)
+        with self.lock:
+            cached = self.memory.get(key)
+            if cached is None:
+                cached = self._load(key)
+                if cached is not None:
+                    self.memory.put(key, cached, cached.nbytes)  # Las consultas siguientes no leen el disco
+            if cached is not None and cached.steps >= steps:
+                return cached.prefix(steps)
+
+            done = cached.steps if cached is not None else 0
+            generator = CongruencialLineal(a, c, m, seed)
+            generator.jump(done)
+            codes = np.empty(shape=steps - done, dtype=np.int8)
+            position = cached.position_at(done) if cached is not None else np.array(source, dtype=np.int64)
+            for start in range(0, steps - done, WALK_CHECKPOINT_CHUNK):
+                if stop_event is not None and stop_event.is_set():
+                    return None
+                length = min(WALK_CHECKPOINT_CHUNK, steps - done - start)
+                with span("rng", length) as stage:
+                    moves = generator.generate_block(length)
+                    stage.add(nbytes=moves.nbytes)
+                codes[start:start + length] = random_walk.moves_to_codes(moves, dim)
+                if progress is not None:
+                    positions = random_walk.codes_to_positions(codes[start:start + length], dim, position)[1:]
+                    position = positions[-1]
+                    progress(positions)
+            walk = cached.extended(codes) if cached is not None else WalkPath(codes, dim, source)
+            self.memory.put(key, walk, walk.nbytes)
+            self._store(key, walk, codes, generator, cached is not None)
+            return walk
+
+    def probability(self, steps, source, destination, dim):
+        """
+        Devuelve la probabilidad de calculate_*_probability guardándola para consultas repetidas.
+
+        Args:
+            steps (int): Número total de pasos en la caminata.
+            source (int | tuple): Posición inicial.
+            destination (int | tuple): Posición objetivo.
+            dim (int): Dimensión de la caminata (1, 2 o 3).
+
+        Returns:
+            Decimal | int: Probabilidad de alcanzar la posición objetivo.
+        """
+        key = cache_key("probability", steps, source, destination, dim)
+        value = self.memory.get(key)
+        if value is None:
+            value = random_walk.calculate_probability(steps, source, destination, dim)
+            self.memory.put(key, value, PROBABILITY_ENTRY_BYTES)
+        return value
+
+    def clear(self):
+        """
+        Vacía ambos niveles de la caché.
+        """
+        with self.lock:
+            self.memory.clear()
+            if self.directory is not None:
+                for name in os.listdir(self.directory):
+                    shutil.rmtree(os.path.join(self.directory, name), ignore_errors=True)
+
+    def _load(self, key):
+        if self.directory is None:
+            return None
+        path = os.path.join(self.directory, key)
+        if not os.path.exists(os.path.join(path, META_FILE)):
+            return None
+        os.utime(os.path.join(path, META_FILE))  # Marca la entrada como usada recientemente
+        walk, _ = open_walk(path)
+        return walk
+
+    def _store(self, key, walk, codes, generator, extend):
+        # El formato en disco solo admite la tabla de vecinos más cercanos; las demás quedan en memoria
+        if self.directory is None or walk.table is not random_walk.step_table(walk.dim):
+            return
+        path = os.path.join(self.directory, key)
+        writer = WalkWriter.resume(path) if extend and os.path.exists(os.path.join(path, META_FILE)) else None
+        if writer is not None and writer.steps == walk.steps - len(codes):
+            writer.generator = generator
+            writer.write_codes(codes)
+            writer.close()
+        else:
+            if writer is not None:
+                writer.close()
+            save_walk(path, walk, generator)
+        self._evict(keep=key)
+
+    def _evict(self, keep):
+        entries = []
+        for name in os.listdir(self.directory):
+            path = os.path.join(self.directory, name)
+            meta_path = os.path.join(path, META_FILE)
+            if not os.path.exists(meta_path):
+                continue
+            size = sum(os.path.getsize(os.path.join(path, file)) for file in os.listdir(path))
+            entries.append((os.path.getmtime(meta_path), size, name))
+        total = sum(size for _, size, _ in entries)
+        for _, size, name in sorted(entries):
+            if total <= self.max_disk_bytes:
+                break
+            if name != keep:
+                shutil.rmtree(os.path.join(self.directory, name), ignore_errors=True)
+                total -= size
+
+
+default_cache = WalkCache()  # Caché compartida por la interfaz gráfica
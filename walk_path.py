@@ -0,0 +1,349 @@
+import numpy as np
+import random_walk
+from random_generator import CongruencialLineal, generator_lock
+
+WALK_CHECKPOINT_INTERVAL = 2 ** 16  # Pasos entre posiciones guardadas en un WalkPath
+WALK_CHECKPOINT_CHUNK = 2 ** 22  # Pasos procesados a la vez al calcular los puntos de control
+
+
+class WalkPath:
+    def __init__(self, codes, dim, source, checkpoint_interval=WALK_CHECKPOINT_INTERVAL, checkpoints=None):
+        """
+        Constructor de la clase WalkPath: una trayectoria guardada como códigos de dirección int8
+        con posiciones de control cada checkpoint_interval pasos. Las posiciones se reconstruyen
+        bajo demanda, por lo que cada paso ocupa un byte en lugar de 8 * dim.
+
+        Args:
+            codes (numpy.ndarray): Códigos de dirección (índices de fila en step_table(dim).deltas).
+            dim (int | StepTable): Dimensión de la caminata o tabla de pasos.
+            source (tuple): Posición inicial con dim coordenadas.
+            checkpoint_interval (int): Pasos entre posiciones de control.
+            checkpoints (numpy.ndarray): Posiciones de control ya calculadas (None para calcularlas).
+        """
+        self.codes = np.asarray(codes, dtype=np.int8)
+        self.table = random_walk.step_table(dim)
+        self.dim = self.table.dim
+        self.source = np.array(source, dtype=np.int64).reshape(self.dim)
+        self.checkpoint_interval = checkpoint_interval
+        if checkpoints is None:
+            checkpoints = compute_checkpoints(self.codes, self.table, self.source, checkpoint_interval)
+        self.checkpoints = checkpoints
+
+    @classmethod
+    def from_moves(cls, moves, dim, source, checkpoint_interval=WALK_CHECKPOINT_INTERVAL):
+        """
+        Crea una trayectoria a partir de movimientos en [0, 1].
+
+        Args:
+            moves (numpy.ndarray): Movimientos generados.
+            dim (int | StepTable): Dimensión de la caminata o tabla de pasos.
+            source (tuple): Posición inicial con dim coordenadas.
+            checkpoint_interval (int): Pasos entre posiciones de control.
+
+        Returns:
+            WalkPath: Trayectoria compacta.
+        """
+        return cls(random_walk.moves_to_codes(moves, dim), dim, source, checkpoint_interval)
+
+    @classmethod
+    def generate(cls, steps, dim, source, stream=None, checkpoint_interval=WALK_CHECKPOINT_INTERVAL, progress=None,
+                 stop_event=None):
+        """
+        Realiza una caminata aleatoria con los movimientos de generate_moves y la guarda compacta.
+
+        Args:
+            steps (int): Número de pasos en la caminata.
+            dim (int | StepTable): Dimensión de la caminata o tabla de pasos.
+            source (tuple): Posición inicial con dim coordenadas.
+            stream (RandomStream): Flujo de movimientos (None para usar la semilla global).
+            checkpoint_interval (int): Pasos entre posiciones de control.
+            progress (callable): Recibe las posiciones int64 de forma (n, dim) de cada bloque generado
+                (None para omitirla).
+            stop_event (threading.Event): Evento de cancelación, se revisa entre bloques.
+
+        Returns:
+            WalkPath: Trayectoria compacta, con las mismas posiciones que random_walk_1d/2d/3d, o None
+            si se canceló.
+        """
+        generator = stream if stream is not None else random_walk.legacy_generator()
+        codes = np.empty(shape=steps, dtype=np.int8)
+        position = np.array(source, dtype=np.int64).reshape(random_walk.step_table(dim).dim)
+        for start in range(0, steps, WALK_CHECKPOINT_CHUNK):
+            if stop_event is not None and stop_event.is_set():
+                return None
+            length = min(WALK_CHECKPOINT_CHUNK, steps - start)
+            codes[start:start + length] = random_walk.moves_to_codes(generator.generate_block(length), dim)
+            if progress is not None:
+                positions = random_walk.codes_to_positions(codes[start:start + length], dim, position)[1:]
+                position = positions[-1]
+                progress(positions)
+        return cls(codes, dim, source, checkpoint_interval)
+
+    @property
+    def steps(self):
+        """
+        Returns:
+            int: Número de pasos de la trayectoria.
+        """
+        return len(self.codes)
+
+    @property
+    def nbytes(self):
+        """
+        Returns:
+            int: Memoria ocupada por los códigos y las posiciones de control.
+        """
+        return self.codes.nbytes + self.checkpoints.nbytes
+
+    def __len__(self):
+        return self.steps + 1
+
+    def prefix(self, steps):
+        """
+        Devuelve los primeros pasos de la trayectoria sin copiar los datos.
+
+        Args:
+            steps (int): Número de pasos del prefijo (<= self.steps).
+
+        Returns:
+            WalkPath: Trayectoria con los primeros steps pasos.
+        """
+        return WalkPath(self.codes[:steps], self.table, self.source, self.checkpoint_interval,
+                        self.checkpoints[:steps // self.checkpoint_interval + 1])
+
+    def extended(self, codes):
+        """
+        Devuelve una trayectoria nueva con pasos agregados al final, reutilizando los puntos de control.
+
+        Args:
+            codes (numpy.ndarray): Códigos de dirección a agregar.
+
+        Returns:
+            WalkPath: Trayectoria extendida.
+        """
+        all_codes = np.concatenate([self.codes, np.asarray(codes, dtype=np.int8)])
+        last = len(self.checkpoints) - 1
+        tail = compute_checkpoints(all_codes[last * self.checkpoint_interval:], self.table, self.checkpoints[last],
+                                   self.checkpoint_interval)
+        checkpoints = np.concatenate([self.checkpoints[:last], tail])
+        return WalkPath(all_codes, self.table, self.source, self.checkpoint_interval, checkpoints)
+
+    def position_at(self, step):
+        """
+        Calcula la posición tras un número de pasos, partiendo del punto de control anterior.
+
+        Args:
+            step (int): Paso consultado (0 <= step <= steps).
+
+        Returns:
+            numpy.ndarray: Posición int64 con dim coordenadas.
+        """
+        if not 0 <= step <= self.steps:
+            raise IndexError(f"Paso fuera de la trayectoria: {step}")
+        checkpoint = step // self.checkpoint_interval
+        start = checkpoint * self.checkpoint_interval
+        deltas = self.table.deltas[self.codes[start:step]]
+        return self.checkpoints[checkpoint] + deltas.sum(axis=0, dtype=np.int64)
+
+    def positions(self, start=0, stop=None, dtype=np.int64):
+        """
+        Materializa las posiciones de los pasos start, ..., stop - 1.
+
+        Args:
+            start (int): Primer paso.
+            stop (int): Paso final (excluido); None para llegar al final.
+            dtype: Tipo entero del resultado (por ejemplo numpy.int32 para ahorrar memoria).
+
+        Returns:
+            numpy.ndarray: Posiciones de forma (stop - start, dim).
+        """
+        stop = len(self) if stop is None else min(stop, len(self))
+        if start >= stop:
+            return np.empty(shape=(0, self.dim), dtype=dtype)
+        positions = np.empty(shape=(stop - start, self.dim), dtype=dtype)
+        positions[0] = self.position_at(start)
+        np.cumsum(self.table.deltas[self.codes[start:stop - 1]], axis=0, dtype=dtype,
+                  out=positions[1:])
+        positions[1:] += positions[0]
+        return positions
+
+    def axis(self, index, start=0, stop=None, dtype=np.int64):
+        """
+        Materializa las posiciones de un solo eje.
+
+        Args:
+            index (int): Eje (0 para x, 1 para y, 2 para z).
+            start (int): Primer paso.
+            stop (int): Paso final (excluido); None para llegar al final.
+            dtype: Tipo entero del resultado.
+
+        Returns:
+            numpy.ndarray: Posiciones del eje.
+        """
+        return self.positions(start, stop, dtype)[:, index].copy()
+
+    def to_arrays(self, dtype=np.float64):
+        """
+        Materializa la trayectoria con el formato de random_walk_1d/2d/3d.
+
+        Args:
+            dtype: Tipo del resultado (float64 como las funciones originales).
+
+        Returns:
+            numpy.ndarray | tuple: Posiciones en 1D, o una tupla con un arreglo por eje en 2D/3D.
+        """
+        positions = self.positions().astype(dtype)
+        if self.dim == 1:
+            return positions[:, 0]
+        return tuple(positions[:, axis].copy() for axis in range(self.dim))
+
+
+class SeekableWalk:
+    def __init__(self, steps, dim, source, generator=None, checkpoint_interval=WALK_CHECKPOINT_INTERVAL,
+                 stop_event=None):
+        """
+        Constructor de la clase SeekableWalk: una caminata de la que solo se guardan las posiciones
+        cada checkpoint_interval pasos y el estado inicial del generador. Una consulta salta el
+        generador hasta el punto de control anterior con CongruencialLineal.jump y vuelve a generar
+        a lo sumo checkpoint_interval pasos, por lo que la memoria no depende de la longitud.
+
+        Args:
+            steps (int): Número de pasos de la caminata.
+            dim (int | StepTable): Dimensión de la caminata o tabla de pasos.
+            source (tuple): Posición inicial con dim coordenadas.
+            generator (CongruencialLineal): Generador de movimientos (None para usar la semilla
+                global). Queda avanzado self.steps pasos, como al generar la caminata completa; su
+                cerrojo se mantiene durante el cálculo inicial.
+            checkpoint_interval (int): Pasos entre posiciones de control.
+            stop_event (threading.Event): Evento de cancelación del cálculo inicial; si se activa,
+                la caminata (y el avance del generador) se acorta hasta el último bloque calculado.
+        """
+        if generator is None:
+            generator = random_walk.legacy_generator()
+        self.table = random_walk.step_table(dim)
+        self.dim = self.table.dim
+        self.source = np.array(source, dtype=np.int64).reshape(self.dim)
+        self.checkpoint_interval = checkpoint_interval
+
+        # Pasada inicial por bloques de puntos de control completos, sin guardar los códigos
+        blocks = [self.source[np.newaxis]]
+        chunk = checkpoint_interval * max(1, WALK_CHECKPOINT_CHUNK // checkpoint_interval)
+        done = 0
+        with generator_lock(generator):
+            self.params = (generator.a, generator.c, generator.m, generator.xn)
+            replay = CongruencialLineal(*self.params)
+            while done < steps:
+                if stop_event is not None and stop_event.is_set():
+                    break
+                length = min(chunk, steps - done)
+                codes = _walk_codes(replay, length, self.table)
+                blocks.append(compute_checkpoints(codes, self.table, blocks[-1][-1], checkpoint_interval)[1:])
+                done += length
+            generator.xn = replay.xn
+        self.steps = done
+        self.checkpoints = np.concatenate(blocks)
+
+    @property
+    def nbytes(self):
+        """
+        Returns:
+            int: Memoria ocupada por las posiciones de control.
+        """
+        return self.checkpoints.nbytes
+
+    def __len__(self):
+        return self.steps + 1
+
+    def _codes(self, start, length):
+        # Códigos de los pasos start + 1, ..., start + length, saltando el generador hasta start
+        generator = CongruencialLineal(*self.params)
+        generator.jump(start)
+        return _walk_codes(generator, length, self.table)
+
+    def position_at(self, step):
+        """
+        Calcula la posición tras un número de pasos, repitiendo a lo sumo checkpoint_interval pasos.
+
+        Args:
+            step (int): Paso consultado (0 <= step <= steps).
+
+        Returns:
+            numpy.ndarray: Posición int64 con dim coordenadas.
+        """
+        if not 0 <= step <= self.steps:
+            raise IndexError(f"Paso fuera de la trayectoria: {step}")
+        checkpoint = step // self.checkpoint_interval
+        start = checkpoint * self.checkpoint_interval
+        deltas = self.table.deltas[self._codes(start, step - start)]
+        return self.checkpoints[checkpoint] + deltas.sum(axis=0, dtype=np.int64)
+
+    def slice(self, start, stop, dtype=np.int64):
+        """
+        Materializa las posiciones de los pasos start, ..., stop - 1.
+
+        Args:
+            start (int): Primer paso.
+            stop (int): Paso final (excluido); se recorta al final de la caminata.
+            dtype: Tipo entero del resultado.
+
+        Returns:
+            numpy.ndarray: Posiciones de forma (stop - start, dim), vacío si stop <= start.
+        """
+        if min(stop, len(self)) <= start:
+            return np.empty(shape=(0, self.dim), dtype=dtype)
+        return self.window(start, stop).positions(dtype=dtype)
+
+    def window(self, start, stop):
+        """
+        Devuelve el tramo de los pasos start, ..., stop - 1 como una trayectoria compacta.
+
+        Args:
+            start (int): Primer paso.
+            stop (int): Paso final (excluido); se recorta al final de la caminata.
+
+        Returns:
+            WalkPath: Trayectoria que parte de la posición en start; el tramo debe tener al menos un
+            paso (stop > start), porque un WalkPath siempre incluye su posición inicial.
+        """
+        stop = min(stop, len(self))
+        if not 0 <= start <= self.steps:
+            raise IndexError(f"Paso fuera de la trayectoria: {start}")
+        if stop <= start:
+            raise ValueError("El tramo no tiene pasos: una trayectoria incluye al menos su posición inicial")
+        codes = self._codes(start, stop - start - 1)
+        return WalkPath(codes, self.table, self.position_at(start), self.checkpoint_interval)
+
+
+def _walk_codes(generator, steps, table):
+    # Con random_walk.USE_JIT se usa el bucle compilado, que da los mismos códigos
+    if random_walk.USE_JIT:
+        import jit_kernels
+        return jit_kernels.walk_codes(generator, steps, table)
+    return random_walk.moves_to_codes(generator.generate_block(steps), table)
+
+
+def compute_checkpoints(codes, dim, source, checkpoint_interval):
+    """
+        Calcula las posiciones en los pasos 0, K, 2K, ... de una trayectoria de códigos.
+
+        Args:
+            codes (numpy.ndarray): Códigos de dirección.
+            dim (int | StepTable): Dimensión de la caminata o tabla de pasos.
+            source (numpy.ndarray): Posición inicial.
+            checkpoint_interval (int): Pasos entre posiciones de control (K).
+
+        Returns:
+            numpy.ndarray: Posiciones int64 de forma (len(codes) // K + 1, dim).
+    """
+    table = random_walk.step_table(dim)
+    blocks = len(codes) // checkpoint_interval
+    checkpoints = np.empty(shape=(blocks + 1, table.dim), dtype=np.int64)
+    checkpoints[0] = source
+    blocks_per_chunk = max(1, WALK_CHECKPOINT_CHUNK // checkpoint_interval)
+    for first in range(0, blocks, blocks_per_chunk):
+        last = min(first + blocks_per_chunk, blocks)
+        chunk = codes[first * checkpoint_interval:last * checkpoint_interval]
+        deltas = table.deltas[chunk].reshape(last - first, checkpoint_interval, table.dim)
+        sums = deltas.sum(axis=1, dtype=np.int64)
+        checkpoints[first + 1:last + 1] = checkpoints[first] + np.cumsum(sums, axis=0)
+    return checkpoints
@@ -0,0 +1,207 @@
+import json
+import os
+import numpy as np
+import random_walk
+from random_generator import CongruencialLineal, affine_power
+from walk_path import WALK_CHECKPOINT_INTERVAL, WalkPath
+
+WALK_STORE_VERSION = 1  # Versión del formato en disco
+WALK_STORE_CHUNK = 2 ** 22  # Pasos generados y escritos a la vez
+CODES_FILE = "codes.bin"  # Códigos de dirección int8, uno por paso
+CHECKPOINTS_FILE = "checkpoints.bin"  # Posiciones int64 cada checkpoint_interval pasos
+META_FILE = "meta.json"  # Metadatos: parámetros del generador, dimensión, origen y estado final
+
+
+class WalkWriter:
+    def __init__(self, path, dim, source, generator=None, checkpoint_interval=WALK_CHECKPOINT_INTERVAL,
+                 _resume=None):
+        """
+        Constructor de la clase WalkWriter: escribe una caminata por bloques en un directorio con
+        los códigos de dirección, las posiciones de control y los metadatos. Los metadatos se
+        escriben al crear la caminata y se actualizan tras cada bloque, así que si el proceso se
+        interrumpe la caminata guardada hasta el último bloque completo se puede abrir y continuar.
+
+        Args:
+            path (str): Directorio de la caminata (se crea si no existe).
+            dim (int | StepTable): Dimensión de la caminata; se admite una tabla solo si es la de
+                vecinos más cercanos de su dimensión.
+            source (tuple): Posición inicial con dim coordenadas.
+            generator (CongruencialLineal): Generador para generate(); su estado inicial se guarda
+                como semilla. Puede ser None si solo se usa write_codes.
+            checkpoint_interval (int): Pasos entre posiciones de control.
+        """
+        table = random_walk.step_table(dim)
+        if table is not random_walk.step_table(table.dim):
+            raise ValueError("Solo se guardan caminatas con la tabla de vecinos más cercanos de su dimensión")
+        dim = table.dim
+        self.path = path
+        self.dim = dim
+        self.generator = generator
+        self.checkpoint_interval = checkpoint_interval
+        if _resume is None:
+            os.makedirs(path, exist_ok=True)
+            self.meta = {
+                "version": WALK_STORE_VERSION,
+                "dim": dim,
+                "source": [int(value) for value in np.array(source).reshape(dim)],
+                "checkpoint_interval": checkpoint_interval,
+                "a": generator.a if generator is not None else None,
+                "c": generator.c if generator is not None else None,
+                "m": generator.m if generator is not None else None,
+                "seed": generator.xn if generator is not None else None,
+                "state": None,
+                "steps": 0,
+            }
+            self.position = np.array(self.meta["source"], dtype=np.int64)
+            self.steps = 0
+            self.codes_file = open(os.path.join(path, CODES_FILE), "wb")
+            self.checkpoints_file = open(os.path.join(path, CHECKPOINTS_FILE), "wb")
+            self.checkpoints_file.write(self.position.tobytes())
+            self._write_meta()
+        else:
+            self.meta, self.position = _resume
+            self.steps = self.meta["steps"]
+            # Se descarta lo escrito después de los últimos metadatos (un bloque interrumpido)
+            checkpoint_count = self.steps // checkpoint_interval + 1
+            self.codes_file = open(os.path.join(path, CODES_FILE), "r+b")
+            self.codes_file.truncate(self.steps)
+            self.codes_file.seek(0, os.SEEK_END)
+            self.checkpoints_file = open(os.path.join(path, CHECKPOINTS_FILE), "r+b")
+            self.checkpoints_file.truncate(checkpoint_count * dim * np.dtype(np.int64).itemsize)
+            self.checkpoints_file.seek(0, os.SEEK_END)
+
+    @classmethod
+    def resume(cls, path):
+        """
+        Reabre una caminata guardada para seguir generándola desde el estado final del generador.
+
+        Args:
+            path (str): Directorio de la caminata.
+
+        Returns:
+            WalkWriter: Escritor posicionado al final de la caminata.
+        """
+        walk, meta = open_walk(path)
+        generator = None
+        if meta["state"] is not None:
+            generator = CongruencialLineal(meta["a"], meta["c"], meta["m"], meta["state"])
+        position = walk.position_at(walk.steps)
+        del walk
+        return cls(path, meta["dim"], meta["source"], generator, meta["checkpoint_interval"], (meta, position))
+
+    def write_codes(self, codes):
+        """
+        Agrega códigos de dirección al final de la caminata.
+
+        Args:
+            codes (numpy.ndarray): Códigos de dirección int8.
+        """
+        codes = np.asarray(codes, dtype=np.int8)
+        if len(codes) == 0:
+            return
+        positions = random_walk.codes_to_positions(codes, self.dim, self.position)
+        # Pasos del bloque que caen en un múltiplo de checkpoint_interval
+        first = -self.steps % self.checkpoint_interval
+        if first == 0:
+            first = self.checkpoint_interval
+        self.checkpoints_file.write(positions[first::self.checkpoint_interval].tobytes())
+        self.codes_file.write(codes.tobytes())
+        self.position = positions[-1]
+        self.steps += len(codes)
+        self._write_meta()
+
+    def _write_meta(self):
+        # Los datos llegan al disco antes que los metadatos que los describen; el reemplazo es atómico
+        for data_file in (self.codes_file, self.checkpoints_file):
+            data_file.flush()
+            os.fsync(data_file.fileno())
+        self.meta["steps"] = self.steps
+        self.meta["state"] = self.generator.xn if self.generator is not None else None
+        meta_path = os.path.join(self.path, META_FILE)
+        with open(meta_path + ".tmp", "w") as meta_file:
+            json.dump(self.meta, meta_file, indent=2)
+        os.replace(meta_path + ".tmp", meta_path)
+
+    def generate(self, steps, chunk_size=WALK_STORE_CHUNK):
+        """
+        Genera y escribe pasos nuevos con el generador del escritor.
+
+        Args:
+            steps (int): Número de pasos a agregar.
+            chunk_size (int): Pasos generados a la vez.
+        """
+        if self.generator is None:
+            raise ValueError("La caminata no tiene un generador asociado")
+        for start in range(0, steps, chunk_size):
+            length = min(chunk_size, steps - start)
+            self.write_codes(random_walk.moves_to_codes(self.generator.generate_block(length), self.dim))
+
+    def close(self):
+        """
+        Guarda los metadatos con el estado final del generador y cierra los archivos.
+        """
+        self._write_meta()
+        self.codes_file.close()
+        self.checkpoints_file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+
+def save_walk(path, walk, generator=None):
+    """
+        Guarda en disco una trayectoria compacta.
+
+        Args:
+            path (str): Directorio de destino.
+            walk (WalkPath): Trayectoria a guardar.
+            generator (CongruencialLineal): Generador que produjo la caminata, ya avanzado hasta su
+                final, para poder continuarla con WalkWriter.resume (opcional). Su semilla se
+                recupera retrocediendo walk.steps pasos cuando a es invertible módulo m.
+    """
+    if walk.table is not random_walk.step_table(walk.dim):
+        raise ValueError("Solo se guardan caminatas con la tabla de vecinos más cercanos de su dimensión")
+    with WalkWriter(path, walk.dim, walk.source, None, walk.checkpoint_interval) as writer:
+        for start in range(0, walk.steps, WALK_STORE_CHUNK):
+            writer.write_codes(walk.codes[start:start + WALK_STORE_CHUNK])
+        if generator is not None:
+            writer.meta.update(a=generator.a, c=generator.c, m=generator.m, seed=_seed_before(generator, walk.steps))
+            writer.generator = generator
+
+
+def _seed_before(generator, steps):
+    # Estado steps pasos antes del actual: se aplica steps veces la recurrencia inversa
+    # x -> a^-1 * (x - c), que existe cuando a es invertible módulo m
+    try:
+        inverse_a = pow(generator.a, -1, generator.m)
+    except ValueError:
+        return None
+    jump_a, jump_c = affine_power(inverse_a, -inverse_a * generator.c, generator.m, steps)
+    return (jump_a * generator.xn + jump_c) % generator.m
+
+
+def open_walk(path):
+    """
+        Abre una caminata guardada sin cargarla en memoria, mediante numpy.memmap.
+
+        Args:
+            path (str): Directorio de la caminata.
+
+        Returns:
+            tuple: (WalkPath respaldado por los archivos, diccionario de metadatos).
+    """
+    with open(os.path.join(path, META_FILE)) as meta_file:
+        meta = json.load(meta_file)
+    dim = meta["dim"]
+    steps = meta["steps"]
+    checkpoint_count = steps // meta["checkpoint_interval"] + 1
+    codes = np.empty(shape=0, dtype=np.int8)
+    if steps > 0:
+        codes = np.memmap(os.path.join(path, CODES_FILE), dtype=np.int8, mode="r", shape=(steps,))
+    checkpoints = np.memmap(os.path.join(path, CHECKPOINTS_FILE), dtype=np.int64, mode="r",
+                            shape=(checkpoint_count, dim))
+    walk = WalkPath(codes, dim, meta["source"], meta["checkpoint_interval"], checkpoints)
+    return walk, meta